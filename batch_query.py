@@ -0,0 +1,84 @@
+import sys
+import argparse
+import contextlib
+
+from models.config import AppConfig
+from services.batch_runner import BatchRunner, load_batch
+from services.ollama_stub import OllamaStubServer
+
+
+def main():
+    """Answer queries from a JSONL file (or stdin) without the interactive loop and write JSONL results."""
+    parser = argparse.ArgumentParser(description="批次問答")
+    parser.add_argument("input", nargs="?", default="-", help="問題 JSONL 檔 (省略或 - 表示標準輸入)")
+    parser.add_argument("-o", "--output", default="-", help="結果 JSONL 檔 (預設為標準輸出)")
+    parser.add_argument("--concurrency", type=int, default=4, help="同時進行的對話數")
+    parser.add_argument("--max-in-flight", type=int, default=0, help="同時送到模型的生成數上限 (0 表示使用 OllamaConfig.max_in_flight)")
+    parser.add_argument("--url", default=None, help="Ollama /api/chat 位址")
+    parser.add_argument("--model", default=None, help="模型名稱")
+    parser.add_argument("--no-intent", action="store_true",
+                        help="停用本地快速回答，所有問題都交給模型 (模型請求不附工具定義，停用後結果不會有工具呼叫)")
+    parser.add_argument("--route", action="store_true", help="依問題複雜度在大小模型間路由 (RouterConfig)")
+    parser.add_argument("--stub", action="store_true", help="啟動本機 Ollama 模擬伺服器並對其測試")
+    parser.add_argument("--stub-ttft", type=float, default=0.2, help="模擬伺服器的首字延遲 (秒)")
+    parser.add_argument("--stub-tokens", type=int, default=60, help="模擬伺服器每次回應的 token 數")
+    args = parser.parse_args()
+
+    if args.input == "-":
+        sessions = load_batch(sys.stdin)
+    else:
+        with open(args.input, encoding="utf-8") as f:
+            sessions = load_batch(f)
+    turns = sum(len(s.turns) for s in sessions)
+
+    config = AppConfig()
+    config.startup.warm_up = False
+    config.intent.enabled = not args.no_intent
+    config.router.enabled = args.route
+    if args.url:
+        config.ollama.api_url = args.url
+    if args.model:
+        config.ollama.model = args.model
+
+    stub = None
+    if args.stub:
+        stub = OllamaStubServer(ttft=args.stub_ttft, tokens_per_response=args.stub_tokens)
+        stub.start()
+        config.ollama.api_url = stub.url
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    def write_result(result):
+        output.write(result.to_json() + "\n")
+        output.flush()
+
+    # Progress messages from the services go to stderr so stdout carries only JSONL
+    with contextlib.redirect_stdout(sys.stderr):
+        print(f"📂 {len(sessions)} 段對話，{turns} 個問題，同時 {args.concurrency} 段")
+        if stub:
+            print(f"🧪 本機模擬伺服器: {stub.url}")
+        runner = BatchRunner(config, concurrency=args.concurrency, max_in_flight=args.max_in_flight or None,
+                             on_result=write_result)
+        try:
+            report = runner.run(sessions)
+        finally:
+            if stub:
+                stub.stop()
+            if output is not sys.stdout:
+                output.close()
+
+        latency = report.latency_percentiles()
+        print(f"\n📊 {len(report.results)} 個問題，{report.errors} 個錯誤，耗時 {report.duration:.1f} 秒")
+        print(f"   吞吐量: {report.queries_per_second:.2f} 問題/秒")
+        print(f"   回應延遲: p50 {latency['p50'] * 1000:.0f} ms，p95 {latency['p95'] * 1000:.0f} ms，p99 {latency['p99'] * 1000:.0f} ms")
+        metrics = runner.get_scheduler_metrics()
+        print(
+            f"   排程器: 最大佇列深度 {metrics['max_queue_depth']}，排隊等待 p50 {metrics['wait_p50'] * 1000:.0f} ms，"
+            f"p95 {metrics['wait_p95'] * 1000:.0f} ms"
+        )
+        if runner.router is not None:
+            runner.router.log()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import time
+import argparse
+
+import numpy as np
+
+from bench_vad_cascade import SAMPLE_RATE, FRAME_SIZE, make_room_audio, load_wav, silero_ms_per_frame
+from models.duty_cycler import DutyCycler
+from models.noise_floor import NoiseFloorEstimator
+from models.vad_cascade import VadCascade
+from services.vad_tuner import load_corpus
+
+
+def load_corpus_audio(corpus_dir, gap, rng):
+    """Concatenate the corpus clips with gap seconds of room noise between them; returns samples and onsets."""
+    pieces = []
+    onsets = []
+    offset = 0.0
+    for clip in load_corpus(corpus_dir):
+        silence, _ = make_room_audio(gap, rng, speech=False)
+        pieces.append(silence)
+        offset += len(silence) / SAMPLE_RATE
+        samples = load_wav(clip.path)
+        pieces.append(samples)
+        onsets.extend(offset + start for start, _ in clip.segments)
+        offset += len(samples) / SAMPLE_RATE
+    return np.concatenate(pieces), onsets
+
+
+def run(samples, cycler_options=None):
+    """Feed the audio through the cascade, optionally behind a DutyCycler; returns the first-scored times."""
+    noise_floor = NoiseFloorEstimator(sample_rate=SAMPLE_RATE)
+    cascade = VadCascade(SAMPLE_RATE, FRAME_SIZE, noise_floor=noise_floor)
+    cycler = None
+    if cycler_options is not None:
+        cycler = DutyCycler(SAMPLE_RATE, FRAME_SIZE, noise_floor=noise_floor, **cycler_options)
+        cycler.start_stream()
+    first_scored = []
+    start = time.process_time()
+    for i in range(len(samples) // FRAME_SIZE):
+        frame = samples[i * FRAME_SIZE:(i + 1) * FRAME_SIZE].tobytes()
+        if cycler is None:
+            noise_floor.update(frame)
+            frames = [frame]
+        else:
+            frames = cycler.process(frame)
+        # Frames handed on after a wake end at the current frame
+        for k, gated in enumerate(frames):
+            scored = cascade.process(gated)
+            if scored:
+                end = i + 1 - (len(frames) - 1 - k)
+                first_scored.append((end - len(scored)) * FRAME_SIZE / SAMPLE_RATE)
+    return cycler, time.process_time() - start, first_scored
+
+
+def onset_start(first_scored, onset):
+    """Earliest scored audio that covers an onset, or None if it was never scored."""
+    covered = [t for t in first_scored if onset - 0.5 <= t <= onset + 0.5]
+    return min(covered) if covered else None
+
+
+def main():
+    """Compare onset coverage and CPU of the VAD cascade with and without idle mode."""
+    parser = argparse.ArgumentParser(description="閒置模式效能測試")
+    parser.add_argument("--corpus", default=None, help="標註語料目錄 (labels.json + WAV，與 tune_vad.py 相同)")
+    parser.add_argument("--gap", type=float, default=20.0, help="語料片段之間插入的環境噪音長度 (秒)")
+    parser.add_argument("--seconds", type=float, default=600.0, help="合成音訊長度 (秒)")
+    parser.add_argument("--idle-after", type=float, nargs="+", default=[2.0, 5.0, 10.0], help="進入閒置前的安靜秒數")
+    parser.add_argument("--stride", type=int, default=4, help="閒置時每幾幀更新一次噪音基準")
+    parser.add_argument("--subsample", type=int, default=4, help="閒置時能量檢查的取樣間隔")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.corpus:
+        samples, onsets = load_corpus_audio(args.corpus, args.gap, rng)
+    else:
+        samples, onsets = make_room_audio(args.seconds, rng)
+    audio_seconds = len(samples) / SAMPLE_RATE
+    print(f"🎧 {audio_seconds:.0f} 秒音訊，{len(onsets)} 個語音起始點")
+
+    _, base_cpu, base_scored = run(samples)
+    baseline = {onset: onset_start(base_scored, onset) for onset in onsets}
+    print(f"   無閒置模式: {base_cpu / audio_seconds * 1000:.2f} ms CPU / 音訊秒，"
+          f"漏接 {sum(1 for t in baseline.values() if t is None)} 個起始點")
+
+    per_frame = silero_ms_per_frame()
+    if per_frame is None:
+        print("ℹ️ 未安裝 torch，略過 Silero 成本估算")
+    for idle_after in args.idle_after:
+        cycler, cpu, scored = run(samples, {
+            "idle_after": idle_after, "stride": args.stride, "subsample": args.subsample
+        })
+        missed = 0
+        delays = []
+        for onset, base in baseline.items():
+            if base is None:
+                continue
+            start = onset_start(scored, onset)
+            if start is None:
+                missed += 1
+            else:
+                delays.append(start - base)
+        covered = len(onsets) - sum(1 for t in baseline.values() if t is None)
+        m = cycler.snapshot()
+        print(
+            f"   idle_after {idle_after:4.1f} 秒: 閒置 {m['idle_fraction']:.0%}，"
+            f"{cpu / audio_seconds * 1000:.2f} ms CPU / 音訊秒 ({base_cpu / max(cpu, 1e-9):.1f}x)，"
+            f"漏接率 {missed / max(covered, 1):.1%}，"
+            f"起始延後 最多 {max(delays, default=0.0) * 1000:.0f} ms，"
+            f"估計節省 {m['saved_cpu_seconds']:.2f} 秒 CPU"
+        )
+        if per_frame is not None:
+            # Without the cascade every awake frame is scored by Silero; idle frames never are
+            print(f"     不用串接閘門時，Silero 每音訊秒少 {per_frame * m['idle_fraction'] * SAMPLE_RATE / FRAME_SIZE:.1f} ms CPU")
+
+
+if __name__ == "__main__":
+    main()
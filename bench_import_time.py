@@ -0,0 +1,100 @@
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# Modules that only voice mode may load
+VOICE_ONLY_MODULES = ["torch", "pyaudio", "speech_recognition", "webrtcvad", "ten_vad"]
+
+# Runs in a fresh interpreter: import the app and build the text-mode speech service
+_PROBE = r"""
+import sys, time, json
+start = time.perf_counter()
+import main
+from models.config import SpeechConfig
+from services.speech_service import SpeechService
+imported = time.perf_counter()
+
+class TextModeSpeechService(SpeechService):
+    def _load_vad_config(self):
+        config = super()._load_vad_config()
+        config['input_mode'] = 'text'
+        return config
+
+TextModeSpeechService(SpeechConfig())
+ready = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "startup": ready - start,
+    "modules": sorted(name for name in sys.modules if name.split('.')[0] in %r),
+}))
+"""
+
+
+def run_probe(root):
+    probe = _PROBE % (VOICE_ONLY_MODULES,)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=root, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def slowest_imports(importtime_log, count):
+    """Packages by cumulative import time, from -X importtime output."""
+    totals = {}
+    for line in importtime_log.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)", line)
+        if match and match.group(2) not in ("main", "site"):
+            package = match.group(2).split('.')[0]
+            totals[package] = max(totals.get(package, 0.0), int(match.group(1)) / 1e6)
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def main():
+    """
+    Measure text-mode startup in fresh interpreters and guard against regressions.
+
+    Fails (exit code 1) if text mode loads any audio backend or if the median
+    startup time exceeds the budget.
+    """
+    parser = argparse.ArgumentParser(description="文字模式啟動時間基準測試")
+    parser.add_argument("--runs", type=int, default=5, help="重複次數")
+    parser.add_argument("--budget", type=float, default=0.5, help="啟動時間上限 (秒)")
+    parser.add_argument("--top", type=int, default=8, help="列出最慢的匯入模組數")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    log = ""
+    for _ in range(args.runs):
+        sample, log = run_probe(root)
+        samples.append(sample)
+
+    import_time = statistics.median(s["import"] for s in samples)
+    startup_time = statistics.median(s["startup"] for s in samples)
+    loaded = samples[-1]["modules"]
+
+    print(f"⏱️ 匯入時間中位數: {import_time * 1000:.0f} ms")
+    print(f"⏱️ 文字模式啟動中位數: {startup_time * 1000:.0f} ms (上限 {args.budget * 1000:.0f} ms)")
+    print("🐢 最慢的匯入:")
+    for name, seconds in slowest_imports(log, args.top):
+        print(f"   {name:<24} {seconds * 1000:7.1f} ms")
+
+    failed = False
+    if loaded:
+        print(f"❌ 文字模式載入了語音模組: {', '.join(loaded)}")
+        failed = True
+    if startup_time > args.budget:
+        print("❌ 啟動時間超過上限")
+        failed = True
+    if not failed:
+        print("✅ 通過")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import time
+import argparse
+
+import numpy as np
+
+from models.resampler import PolyphaseResampler
+
+OUT_RATE = 16000
+FRAME_SIZE = 512
+
+
+def make_signal(rate, seconds):
+    """Speech-band tone mix plus noise, as int16 at the given rate."""
+    t = np.arange(int(rate * seconds)) / rate
+    signal = 0.3 * np.sin(2 * np.pi * 440 * t) + 0.2 * np.sin(2 * np.pi * 3100 * t)
+    signal += 0.02 * np.random.default_rng(0).standard_normal(len(t))
+    return (signal * 32767).astype(np.int16)
+
+
+def run_polyphase(samples, in_rate, frames):
+    resampler = PolyphaseResampler(in_rate, OUT_RATE, max_output=FRAME_SIZE)
+    offset = 0
+    for _ in range(frames):
+        needed = resampler.input_needed(FRAME_SIZE)
+        resampler.push(samples[offset:offset + needed])
+        offset += needed
+        resampler.pull(FRAME_SIZE).tobytes()
+
+
+def run_naive_loop(samples, in_rate, frames):
+    """Same filter, one output sample at a time in Python."""
+    reference = PolyphaseResampler(in_rate, OUT_RATE)
+    phases = reference.phases.astype(np.float64)
+    up, down, taps = reference.up, reference.down, reference.taps
+    history = [0.0] * (taps - 1)
+    position = (taps - 1) * up
+    offset = 0
+    for _ in range(frames):
+        out = []
+        while len(out) < FRAME_SIZE:
+            base, branch = divmod(position, up)
+            while base >= len(history):
+                history.append(samples[offset] / 32768.0)
+                offset += 1
+            coefficients = phases[branch]
+            out.append(sum(coefficients[k] * history[base - k] for k in range(taps)))
+            position += down
+        drop = position // up - (taps - 1)
+        del history[:drop]
+        position -= drop * up
+        np.clip(np.array(out) * 32768.0, -32768, 32767).astype(np.int16).tobytes()
+
+
+def run_naive_convolve(samples, in_rate, frames):
+    """Zero-stuff, full-rate convolution and decimation per frame, with fresh arrays every call."""
+    reference = PolyphaseResampler(in_rate, OUT_RATE)
+    up, down = reference.up, reference.down
+    prototype = reference.phases.T.reshape(-1).astype(np.float64)
+    history = np.zeros(len(prototype) // up, dtype=np.float64)
+    offset = 0
+    phase = 0
+    for _ in range(frames):
+        needed = -(-(FRAME_SIZE * down - phase) // up)
+        chunk = samples[offset:offset + needed].astype(np.float64) / 32768.0
+        offset += needed
+        block = np.concatenate([history, chunk])
+        stuffed = np.zeros(len(block) * up)
+        stuffed[::up] = block
+        filtered = np.convolve(stuffed, prototype)[len(history) * up:len(history) * up + len(chunk) * up]
+        out = filtered[phase::down][:FRAME_SIZE]
+        phase = (phase + FRAME_SIZE * down) - len(chunk) * up
+        history = block[-len(history):]
+        np.clip(out * 32768.0, -32768, 32767).astype(np.int16).tobytes()
+
+
+def run_scipy(samples, in_rate, frames):
+    """scipy.signal.resample_poly per frame (stateless, so it also has edge effects)."""
+    from scipy.signal import resample_poly
+    reference = PolyphaseResampler(in_rate, OUT_RATE)
+    up, down = reference.up, reference.down
+    chunk = FRAME_SIZE * down // up
+    for i in range(frames):
+        block = samples[i * chunk:(i + 1) * chunk].astype(np.float64)
+        np.clip(resample_poly(block, up, down), -32768, 32767).astype(np.int16).tobytes()
+
+
+def measure(func, samples, in_rate, frames):
+    start = time.process_time()
+    func(samples, in_rate, frames)
+    return time.process_time() - start
+
+
+def main():
+    """Compare CPU time per second of captured audio for the resampling approaches."""
+    parser = argparse.ArgumentParser(description="重新取樣效能測試")
+    parser.add_argument("--seconds", type=float, default=10.0, help="每種方法處理的音訊長度 (秒)")
+    parser.add_argument("--loop-seconds", type=float, default=0.5, help="逐樣本 Python 迴圈只處理這麼長的音訊 (秒)")
+    args = parser.parse_args()
+
+    methods = [("polyphase (向量化)", run_polyphase, args.seconds),
+               ("逐樣本 Python 迴圈", run_naive_loop, args.loop_seconds),
+               ("補零 + np.convolve", run_naive_convolve, args.seconds)]
+    try:
+        import scipy.signal  # noqa: F401
+        methods.append(("scipy resample_poly", run_scipy, args.seconds))
+    except ImportError:
+        print("ℹ️ 未安裝 scipy，略過 resample_poly")
+
+    for in_rate in (48000, 44100):
+        print(f"\n🎚️ {in_rate} Hz → {OUT_RATE} Hz，每幀 {FRAME_SIZE} 個輸出樣本")
+        for name, func, seconds in methods:
+            frames = max(1, int(seconds * OUT_RATE / FRAME_SIZE))
+            samples = make_signal(in_rate, frames * FRAME_SIZE / OUT_RATE + 1.0)
+            cpu = measure(func, samples, in_rate, frames)
+            audio_seconds = frames * FRAME_SIZE / OUT_RATE
+            print(f"   {name:<22} {cpu / audio_seconds * 1000:8.2f} ms CPU / 音訊秒")
+
+
+if __name__ == "__main__":
+    main()
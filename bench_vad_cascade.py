@@ -0,0 +1,114 @@
+import time
+import wave
+import argparse
+
+import numpy as np
+
+from models.noise_floor import NoiseFloorEstimator
+from models.vad_cascade import VadCascade
+
+SAMPLE_RATE = 16000
+FRAME_SIZE = 512
+
+
+def make_room_audio(seconds, rng, speech=True):
+    """Quiet room noise with a few voiced bursts and one soft fricative; returns samples and onset times."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    # Room noise is mostly low-frequency (fans, traffic) on top of faint microphone hiss
+    spectrum = np.fft.rfft(rng.normal(0, 1, len(t)))
+    spectrum /= np.sqrt(1.0 + (np.fft.rfftfreq(len(t), 1.0 / SAMPLE_RATE) / 300.0) ** 2)
+    rumble = np.fft.irfft(spectrum, len(t))
+    audio = rumble / rumble.std() * 40 + rng.normal(0, 8, len(t))
+    onsets = []
+    if not speech:
+        return np.clip(audio, -32768, 32767).astype(np.int16), onsets
+    for start in np.arange(5.0, seconds - 3.0, 12.0):
+        span = (t >= start) & (t < start + 1.5)
+        voiced = sum(np.sin(2 * np.pi * 140 * k * t[span]) / k for k in range(1, 12))
+        audio[span] += 1500 * voiced * np.hanning(span.sum())
+        onsets.append(start)
+    start = seconds - 2.5
+    span = (t >= start) & (t < start + 0.3)
+    hiss = np.diff(rng.normal(0, 1, span.sum() + 1))  # High-passed noise, like /s/
+    audio[span] += 180 * hiss
+    onsets.append(start)
+    return np.clip(audio, -32768, 32767).astype(np.int16), onsets
+
+
+def load_wav(path):
+    with wave.open(path, 'rb') as wav_file:
+        if wav_file.getnchannels() != 1 or wav_file.getsampwidth() != 2 or wav_file.getframerate() != SAMPLE_RATE:
+            raise ValueError(f"{path}: 需要 16 kHz 單聲道 16-bit PCM")
+        return np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+
+
+def run_cascade(samples, webrtc_aggressiveness=None):
+    noise_floor = NoiseFloorEstimator(sample_rate=SAMPLE_RATE)
+    cascade = VadCascade(SAMPLE_RATE, FRAME_SIZE, noise_floor=noise_floor, webrtc_aggressiveness=webrtc_aggressiveness)
+    first_scored = []
+    frames = len(samples) // FRAME_SIZE
+    start = time.process_time()
+    for i in range(frames):
+        frame = samples[i * FRAME_SIZE:(i + 1) * FRAME_SIZE].tobytes()
+        noise_floor.update(frame)
+        scored = cascade.process(frame)
+        if scored:
+            first_scored.append((i + 1 - len(scored)) * FRAME_SIZE / SAMPLE_RATE)
+    return cascade, time.process_time() - start, first_scored
+
+
+def silero_ms_per_frame(frames=300):
+    """CPU cost of one Silero call, if torch and the model are available."""
+    try:
+        from models.silero_vad_audio_recorder import get_vad_model
+        import torch
+    except ImportError:
+        return None
+    model = get_vad_model()[0]
+    frame = torch.zeros(FRAME_SIZE)
+    start = time.process_time()
+    with torch.no_grad():
+        for _ in range(frames):
+            model(frame, SAMPLE_RATE)
+    return (time.process_time() - start) / frames * 1000
+
+
+def main():
+    """Measure how much audio the VAD cascade lets through to the neural scorer, and what the gate costs."""
+    parser = argparse.ArgumentParser(description="VAD 串接閘門效能測試")
+    parser.add_argument("wav", nargs="*", help="16 kHz 單聲道錄音 (省略則使用合成的安靜房間音訊)")
+    parser.add_argument("--seconds", type=float, default=120.0, help="合成音訊長度 (秒)")
+    parser.add_argument("--idle", action="store_true", help="合成音訊只有環境噪音，沒有語音")
+    parser.add_argument("--webrtc", type=int, default=None, help="加上 WebRTC 第二階段 (敏感度 0-3)")
+    args = parser.parse_args()
+
+    onsets = []
+    if args.wav:
+        samples = np.concatenate([load_wav(path) for path in args.wav])
+    else:
+        samples, onsets = make_room_audio(args.seconds, np.random.default_rng(0), speech=not args.idle)
+    audio_seconds = len(samples) / SAMPLE_RATE
+
+    cascade, gate_cpu, first_scored = run_cascade(samples, args.webrtc)
+    print(f"🎧 {audio_seconds:.0f} 秒音訊，{cascade.frames_seen} 幀")
+    print(f"   送交神經網路評分: {cascade.frames_scored} 幀 ({cascade.pass_rate * 100:.1f}%)")
+    print(f"   閘門成本: {gate_cpu / audio_seconds * 1000:.2f} ms CPU / 音訊秒")
+
+    for onset in onsets:
+        # Earliest scored audio that covers this onset, including look-back frames
+        covered = [t for t in first_scored if onset - 0.5 <= t <= onset + 0.5]
+        status = f"提前 {(onset - min(covered)) * 1000:.0f} ms 開始評分" if covered else "❌ 未送交評分"
+        print(f"   起始點 {onset:6.1f} 秒: {status}")
+
+    per_frame = silero_ms_per_frame()
+    if per_frame is None:
+        print("ℹ️ 未安裝 torch，略過 Silero 成本估算")
+        return
+    frames_per_second = SAMPLE_RATE / FRAME_SIZE
+    full = per_frame * frames_per_second
+    gated = per_frame * frames_per_second * cascade.pass_rate + gate_cpu / audio_seconds * 1000
+    print(f"   Silero 每音訊秒: 全部評分 {full:.1f} ms，串接後 {gated:.1f} ms ({full / max(gated, 1e-9):.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import configparser
+
+from models.config import SpeechConfig
+from models.keyword_spotter import KeywordSpotter
+from models.audio_device import release_pyaudio
+from models.noise_floor import NoiseFloorEstimator
+
+
+def main():
+    """Record trigger word templates for the local keyword spotter."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    config = configparser.ConfigParser()
+    config.read(os.path.join(os.path.dirname(__file__), 'vad_config.ini'))
+    template_dir = config.get('WAKE', 'kws_template_dir', fallback='keyword_templates')
+    if not os.path.isabs(template_dir):
+        template_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), template_dir)
+    sample_rate = config.getint('VAD', 'sample_rate', fallback=16000)
+    noise_floor = NoiseFloorEstimator(
+        sample_rate=sample_rate,
+        margin_db=config.getfloat('VAD', 'noise_margin_db', fallback=10.0),
+        min_threshold=config.getfloat('VAD', 'noise_min_threshold', fallback=50.0)
+    )
+
+    speech_config = SpeechConfig()
+    spotter = KeywordSpotter(
+        keyword=speech_config.trigger_word,
+        template_dir=template_dir,
+        sample_rate=sample_rate,
+        noise_floor=noise_floor
+    )
+    # Enroll through the same capture path the spotter listens on
+    spotter.capture_rate = config.getint('VAD', 'capture_rate', fallback=0)
+
+    try:
+        spotter.enroll(count)
+        print(f"✅ 已錄製 {len(spotter.templates)} 個範本，比對閾值: {spotter.match_threshold:.2f}")
+    except KeyboardInterrupt:
+        print("\n👋 錄製已取消")
+    finally:
+        spotter.cleanup()
+        release_pyaudio()
+
+
+if __name__ == "__main__":
+    main()
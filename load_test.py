@@ -0,0 +1,96 @@
+import argparse
+
+from models.config import OllamaConfig
+from services.load_generator import LoadGenerator
+from services.session_capture import CapturedTurn, load_captured_sessions
+from services.ollama_stub import OllamaStubServer
+from services.ollama_service import OllamaService
+from services.request_scheduler import RequestScheduler, RequestPriority
+
+# Used when no capture file is given
+_SAMPLE_SESSIONS = [
+    [
+        CapturedTurn("sample-1", 0, 0.0, "今天台北的天氣如何？", [{"name": "get_weather", "arguments": {"city": "Taipei"}}]),
+        CapturedTurn("sample-1", 1, 6.0, "那我需要帶傘嗎？"),
+        CapturedTurn("sample-1", 2, 8.0, "幫我算一下 23 乘以 17"),
+    ],
+    [
+        CapturedTurn("sample-2", 0, 0.0, "請用三句話介紹 Python"),
+        CapturedTurn("sample-2", 1, 10.0, "它和 JavaScript 有什麼不同？"),
+    ],
+]
+
+
+def main():
+    """Replay captured chat sessions as concurrent users against Ollama or a local stub."""
+    parser = argparse.ArgumentParser(description="聊天後端負載測試")
+    parser.add_argument("--capture", help="SessionConfig.capture_path 錄下的 JSONL 檔 (省略則使用內建範例)")
+    parser.add_argument("--users", type=int, default=4, help="同時模擬的使用者數")
+    parser.add_argument("--duration", type=float, default=60.0, help="測試時間 (秒)")
+    parser.add_argument("--turns", type=int, default=None, help="每位使用者的回合數上限")
+    parser.add_argument("--think-time", type=float, default=None, help="固定平均思考時間 (秒)，取代錄製的間隔")
+    parser.add_argument("--think-scale", type=float, default=1.0, help="錄製思考時間的倍率")
+    parser.add_argument("--ramp-up", type=float, default=1.0, help="使用者陸續加入的時間 (秒)")
+    parser.add_argument("--url", default=OllamaConfig.api_url, help="Ollama /api/chat 位址")
+    parser.add_argument("--model", default=OllamaConfig.model, help="模型名稱")
+    parser.add_argument("--max-in-flight", type=int, default=0, help="經由排程器送出，同時生成數上限 (0 表示不使用排程器)")
+    parser.add_argument("--priority", default="batch", choices=[p.name.lower() for p in RequestPriority], help="排程優先級")
+    parser.add_argument("--stub", action="store_true", help="啟動本機 Ollama 模擬伺服器並對其測試")
+    parser.add_argument("--stub-ttft", type=float, default=0.2, help="模擬伺服器的首字延遲 (秒)")
+    parser.add_argument("--stub-tokens", type=int, default=60, help="模擬伺服器每次回應的 token 數")
+    args = parser.parse_args()
+
+    sessions = load_captured_sessions(args.capture) if args.capture else _SAMPLE_SESSIONS
+    print(f"📂 {len(sessions)} 段對話，{sum(len(s) for s in sessions)} 個回合")
+
+    stub = None
+    url = args.url
+    if args.stub:
+        stub = OllamaStubServer(ttft=args.stub_ttft, tokens_per_response=args.stub_tokens)
+        stub.start()
+        url = stub.url
+        print(f"🧪 本機模擬伺服器: {url}")
+
+    ollama_config = OllamaConfig(api_url=url, model=args.model)
+    scheduler = None
+    if args.max_in_flight > 0:
+        scheduler = RequestScheduler(OllamaService(ollama_config), max_in_flight=args.max_in_flight)
+    generator = LoadGenerator(
+        ollama_config,
+        sessions,
+        users=args.users,
+        think_time=args.think_time,
+        think_scale=args.think_scale,
+        duration=None if args.turns else args.duration,
+        turns_per_user=args.turns,
+        ramp_up=args.ramp_up,
+        scheduler=scheduler,
+        priority=RequestPriority[args.priority.upper()]
+    )
+    print(f"🚀 {args.users} 位使用者開始測試...")
+    try:
+        report = generator.run()
+    finally:
+        if stub:
+            stub.stop()
+
+    ttft = report.ttft_percentiles()
+    latency = report.latency_percentiles()
+    print(f"\n📊 {len(report.results)} 個請求，{report.errors} 個錯誤，耗時 {report.duration:.1f} 秒")
+    print(f"   吞吐量: {report.requests_per_second:.2f} 請求/秒，{report.tokens_per_second:.1f} tokens/秒")
+    print(f"   首字延遲 (TTFT): p50 {ttft['p50'] * 1000:.0f} ms，p95 {ttft['p95'] * 1000:.0f} ms，p99 {ttft['p99'] * 1000:.0f} ms")
+    print(f"   完整回應延遲:    p50 {latency['p50'] * 1000:.0f} ms，p95 {latency['p95'] * 1000:.0f} ms，p99 {latency['p99'] * 1000:.0f} ms")
+    if scheduler:
+        metrics = scheduler.get_metrics()
+        print(
+            f"   排程器: 最大佇列深度 {metrics['max_queue_depth']}，排隊等待 p50 {metrics['wait_p50'] * 1000:.0f} ms，"
+            f"p95 {metrics['wait_p95'] * 1000:.0f} ms，捨棄 {metrics['dropped_stale'] + metrics['rejected_full']}"
+        )
+    for result in report.results:
+        if result.error:
+            print(f"⚠️ 使用者 {result.user}: {result.error}")
+            break
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from models.config import AppConfig
 from views.console_view import ConsoleView
+from views.tts_view import TtsView
 from viewmodels.chat_viewmodel import ChatViewModel
 
 
@@ -14,6 +15,7 @@ class ChatApp:
         self.config = AppConfig()
         self.view = ConsoleView()
         self.viewmodel = ChatViewModel(self.config)
+        self.tts_view = TtsView(self.config.tts) if self.config.tts.enabled else None
     
     def run(self):
         """
@@ -30,9 +32,21 @@ class ChatApp:
             self.view.display_welcome_message_text()
         else:
             self.view.display_welcome_message(trigger_word = self.config.speech.trigger_word)
+        # Models, devices and caches load in the background while the user starts talking
+        self.viewmodel.start_warm_up(self.view.display_startup_status)
+        
+        barge_in = self.viewmodel.is_barge_in_enabled()
+        pending_query = ""
         
         while True:
-            if input_mode.lower() == 'text':
+            if pending_query:
+                # The user interrupted the previous answer; their new query is already captured
+                query = pending_query
+                pending_query = ""
+                if self.viewmodel.is_exit_command(query):
+                    self.view.display_goodbye_message()
+                    break
+            elif input_mode.lower() == 'text':
                 # Text input mode: get input directly from keyboard
                 query = self.viewmodel.get_user_input()
                 
@@ -46,8 +60,7 @@ class ChatApp:
                     continue
             else:
                 # Voice input mode: listen for trigger word first
-                # trigger = self.viewmodel.listen_for_trigger()
-                trigger = self.config.speech.trigger_word  # For testing without microphone
+                trigger = self.viewmodel.listen_for_trigger()
                 print(f"Trigger detected: {trigger}")
                 
                 # Check if user wants to exit
@@ -60,8 +73,9 @@ class ChatApp:
                     self.view.display_not_triggered_message()
                     continue
                 
-                # Use VAD for speech input after trigger detection
-                query = self.viewmodel.get_user_input()
+                # A question spoken in the same breath as the trigger word is already
+                # recognized (one-shot mode); otherwise use VAD for speech input
+                query = self.viewmodel.take_one_shot_query() or self.viewmodel.get_user_input()
                 if not query:
                     self.view.display_no_question_message()
                     continue
@@ -71,9 +85,26 @@ class ChatApp:
             
             # Generate and display AI response character by character
             self.view.display_ai_response_start()
-            for char in self.viewmodel.generate_response():
+            if self.tts_view:
+                self.tts_view.display_ai_response_start()
+            cancel_event = self.viewmodel.start_barge_in_listener() if barge_in else None
+            for char in self.viewmodel.generate_response(cancel_event):
                 self.view.display_ai_character(char)
+                if self.tts_view:
+                    self.tts_view.display_ai_character(char)
+            if self.tts_view:
+                # Keep speaking (and listening for barge-in) until the answer has been played
+                self.tts_view.display_ai_response_end()
+                self.tts_view.wait_until_done(cancel_event)
+            if barge_in:
+                if cancel_event.is_set():
+                    self.view.display_ai_response_interrupted()
+                pending_query = self.viewmodel.finish_barge_in_listener()
             self.view.display_ai_response_end()
+        
+        if self.tts_view:
+            self.tts_view.cleanup()
+        self.viewmodel.cleanup()
 
 if __name__ == "__main__":
     app = ChatApp()
@@ -0,0 +1,66 @@
+import threading
+
+_audio = None
+_audio_lock = threading.Lock()
+
+
+def get_pyaudio():
+    """Get the process-wide PyAudio instance (singleton pattern)."""
+    global _audio
+    with _audio_lock:
+        if _audio is None:
+            import pyaudio
+            _audio = pyaudio.PyAudio()
+        return _audio
+
+
+def native_input_rate() -> int:
+    """Default sample rate of the default input device."""
+    return int(get_pyaudio().get_default_input_device_info()['defaultSampleRate'])
+
+
+def _open_device(rate, frames_per_buffer, callback_buffer):
+    """Open the default input device in blocking mode, or in callback mode with callback_buffer seconds of queue."""
+    if callback_buffer:
+        from .callback_capture import CallbackInputStream
+        return CallbackInputStream(rate, frames_per_buffer, buffer_seconds=callback_buffer)
+    import pyaudio
+    return get_pyaudio().open(
+        format=pyaudio.paInt16,
+        channels=1,
+        rate=rate,
+        input=True,
+        frames_per_buffer=frames_per_buffer
+    )
+
+
+def open_input_stream(sample_rate=16000, frame_size=512, capture_rate=None, callback_buffer=0.0):
+    """
+    Open a 16-bit mono input stream that reads at sample_rate.
+
+    Args:
+        capture_rate: Rate to open the device at; 0 means the device's native
+            rate and None means sample_rate. When it differs from sample_rate,
+            the returned stream resamples in software (see ResamplingStream)
+            instead of leaving conversion to PortAudio or ALSA.
+        callback_buffer: When positive, capture through PortAudio's callback
+            API into a lock-free queue holding this many seconds of audio
+            (see CallbackInputStream) instead of blocking reads.
+    """
+    if capture_rate == 0:
+        capture_rate = native_input_rate()
+    if not capture_rate or capture_rate == sample_rate:
+        return _open_device(sample_rate, frame_size, callback_buffer)
+    
+    from .resampler import ResamplingStream
+    stream = _open_device(capture_rate, round(frame_size * capture_rate / sample_rate), callback_buffer)
+    return ResamplingStream(stream, capture_rate, sample_rate, frame_size)
+
+
+def release_pyaudio():
+    """Terminate the shared PyAudio instance; call once on shutdown."""
+    global _audio
+    with _audio_lock:
+        if _audio is not None:
+            _audio.terminate()
+            _audio = None
@@ -1,9 +1,199 @@
+import time
+
+
 class BaseVadAudioRecorder:
-    def __init__(self, sample_rate=16000, frame_size=512, threshold=0.5, on_speech_end=None):
+    def __init__(self, sample_rate=16000, frame_size=512, threshold=0.5, on_speech_end=None, noise_floor=None,
+                 on_speech_start=None):
         self.sample_rate = sample_rate
         self.frame_size = frame_size
         self.threshold = threshold
         self.on_speech_end = on_speech_end
+        self.on_speech_start = on_speech_start  # Called as soon as speech onset is detected (barge-in)
+        self.noise_floor = noise_floor  # Shared NoiseFloorEstimator, updated on every captured frame
+        self.on_partial_speech = None   # Receives the PCM captured so far while the user is still speaking
+        self.partial_interval = 0.6     # Seconds of new speech between partial callbacks
+        self._partial_emitted_samples = 0
+        self.audio_source = None        # Replaces the microphone, e.g. a WavFileSource for offline replay
+        self.capture_rate = None        # Device rate: None opens at sample_rate, 0 uses the native rate
+        self.vad_cascade = None         # Optional VadCascade that skips scoring on silence
+        self.duty_cycler = None         # Optional DutyCycler that idles the whole pipeline in long silence
+        self.vad_metrics = None         # Optional VadMetrics collecting inference time and overflows
+        self.callback_buffer = 0.0      # Seconds of callback-capture queue; 0 uses blocking reads
+        self.catch_up_frames = 4        # Backlog (in frames) above which partial callbacks are deferred
+        self.end_silence = 0.0          # Seconds of non-speech that end an utterance; 0 ends it on the first one
+        self.on_speech_chunk = None     # Receives (pcm, final) for each piece of the utterance cut at a pause
+        self.chunk_pause = 0.3          # Internal pause (seconds) at which the utterance is cut
+        self.min_chunk_seconds = 2.0    # Shortest piece worth recognizing on its own
+        self._pause_frames = 0          # Non-speech frames at the end of the current utterance
+        self._pause_cut = False         # The current pause already produced a chunk
+        self._chunk_start = 0           # Index in speech_frames where the next chunk starts
+        self._held_frames = 0           # Captured frames the gates have not handed to the scorer yet
+        self._stream = None
+
+    def _open_stream(self):
+        """Open the capture stream: the configured audio source or the default microphone."""
+        if self.audio_source is not None:
+            self._stream = self.audio_source
+        else:
+            from .audio_device import open_input_stream
+            self._stream = open_input_stream(self.sample_rate, self.frame_size, self.capture_rate, self.callback_buffer)
+        return self._stream
+
+    def _is_catching_up(self) -> bool:
+        """Check whether captured audio is queued beyond catch_up_frames (callback capture fell behind)."""
+        stream = self._stream
+        if stream is None or not hasattr(stream, 'get_read_available'):
+            return False
+        return stream.get_read_available() > self.catch_up_frames * self.frame_size
+
+    def _clock(self):
+        """Current time in seconds; follows the audio clock when replaying a source."""
+        if self.audio_source is not None:
+            return self.audio_source.position
+        return time.time()
+
+    def set_partial_speech_listener(self, callback, interval=0.6):
+        """
+        Periodically hand the speech captured so far to a listener (streaming ASR).
+
+        Args:
+            callback: Called with the PCM16 bytes of the current utterance
+            interval: Seconds of new speech between calls
+        """
+        self.on_partial_speech = callback
+        self.partial_interval = interval
+
+    def set_speech_chunk_listener(self, callback, pause=0.3, min_chunk_seconds=2.0):
+        """
+        Hand the utterance over in pieces cut at internal pauses (chunked ASR).
+
+        Each piece is passed on as soon as the pause is heard, so it can be
+        recognized while the user keeps speaking; the rest of the utterance
+        follows with final=True when speech ends. Internal pauses only exist
+        if end_silence is longer than pause.
+
+        Args:
+            callback: Called with (PCM16 bytes, final); the final piece may be empty
+            pause: Seconds of non-speech at which the utterance is cut
+            min_chunk_seconds: Pieces are at least this long, so short phrases stay together
+        """
+        self.on_speech_chunk = callback
+        self.chunk_pause = pause
+        self.min_chunk_seconds = min_chunk_seconds
+
+    def _notify_speech_start(self):
+        """Notify listeners that speech onset was detected and reset the pause tracking."""
+        self._pause_frames = 0
+        self._pause_cut = False
+        self._chunk_start = 0
+        if self.on_speech_start:
+            self.on_speech_start()
+
+    def _track_pause(self, is_speech) -> float:
+        """
+        Follow the pause at the end of the utterance and cut a chunk once it is long enough.
+
+        Call after appending the frame to speech_frames.
+
+        Returns:
+            float: Seconds of non-speech at the end of the utterance so far
+        """
+        if is_speech:
+            self._pause_frames = 0
+            self._pause_cut = False
+            return 0.0
+        self._pause_frames += 1
+        pause = self._pause_frames * self.frame_size / self.sample_rate
+        if self.on_speech_chunk and not self._pause_cut and pause >= self.chunk_pause:
+            self._pause_cut = True
+            end = len(self.speech_frames)
+            if (end - self._chunk_start) * self.frame_size >= self.min_chunk_seconds * self.sample_rate:
+                self.on_speech_chunk(b''.join(self.speech_frames[self._chunk_start:end]), False)
+                self._chunk_start = end
+        return pause
+
+    def _utterance_ended(self, is_speech) -> bool:
+        """Account one frame of the utterance; True once the trailing pause reaches end_silence."""
+        pause = self._track_pause(is_speech)
+        return pause > 0 and pause >= self.end_silence
+
+    def _finish_chunks(self):
+        """Hand over the rest of the utterance as the final chunk, without most of the closing pause."""
+        if not self.on_speech_chunk:
+            return
+        end = len(self.speech_frames)
+        keep = int(self.chunk_pause * self.sample_rate / self.frame_size)
+        end -= max(0, self._pause_frames - keep)
+        if self._pause_cut:
+            end = max(end, self._chunk_start)
+        self.on_speech_chunk(b''.join(self.speech_frames[self._chunk_start:end]), True)
+        self._chunk_start = len(self.speech_frames)
+
+    def _emit_partial_speech(self):
+        """Call the partial speech listener once enough new speech was captured."""
+        if not self.on_partial_speech:
+            return
+        if self._is_catching_up():
+            # Drain the backlog first; the partial goes out once the loop is back in real time
+            return
+        captured = len(self.speech_frames) * self.frame_size
+        if captured < self._partial_emitted_samples:
+            # A new utterance started since the last partial
+            self._partial_emitted_samples = 0
+        if captured - self._partial_emitted_samples >= self.partial_interval * self.sample_rate:
+            self._partial_emitted_samples = captured
+            self.on_partial_speech(b''.join(self.speech_frames))
+
+    def _gate_frame(self, frame_bytes):
+        """
+        Frames to score for one captured frame: all of them unless the
+        DutyCycler (idle) or the VadCascade (silence) holds them back.
+
+        When the gates reopen after dropping audio that was never scored, the
+        scorer's state is reset first (see _reset_scorer), so a recurrent model
+        does not carry context across the gap.
+        """
+        gated = [frame_bytes]
+        if self.duty_cycler is not None:
+            gated = self.duty_cycler.process(frame_bytes, busy=self.is_speaking)
+        if self.vad_cascade is not None:
+            frames, gated = gated, []
+            for frame in frames:
+                gated.extend(self.vad_cascade.process(frame, self.is_speaking))
+        held = self._held_frames + 1
+        if gated and held > len(gated):
+            self._reset_scorer()
+        self._held_frames = 0 if gated else held
+        return gated
+
+    def _reset_scorer(self):
+        """Clear the scorer's recurrent state before non-contiguous audio; stateless backends ignore it."""
+        pass
+
+    def _start_metrics(self):
+        """Restart the per-stream clocks (audio vs wall clock, idle CPU accounting) for a newly opened stream."""
+        if self.vad_metrics is not None:
+            self.vad_metrics.start_stream()
+        if self.duty_cycler is not None:
+            self.duty_cycler.start_stream()
+
+    def _record_capture(self, stream):
+        """Report a captured frame and the stream's remaining backlog."""
+        if self.vad_metrics is None:
+            return
+        queued = stream.get_read_available() if hasattr(stream, 'get_read_available') else None
+        # A replayed file is read faster than real time, so its clock says nothing about overflows
+        self.vad_metrics.record_frame(self.frame_size, queued, track_clock=self.audio_source is None)
+
+    def _record_inference(self, started):
+        """Report the time spent scoring one frame, measured from time.perf_counter() at started."""
+        if self.vad_metrics is not None:
+            self.vad_metrics.record_inference(time.perf_counter() - started)
+
+    def _track_noise_floor(self, frame_bytes):
+        """Feed a captured frame to the shared noise-floor estimator (the DutyCycler does it when present)."""
+        if self.noise_floor is not None and self.duty_cycler is None:
+            self.noise_floor.update(frame_bytes)
 
     def _save_speech_and_callback(self): 
         pass
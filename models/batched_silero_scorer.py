@@ -0,0 +1,86 @@
+import numpy as np
+
+_STATE_SHAPE = (2, 1, 128)
+
+
+def _load_onnx_session(model_path=None):
+    """Open the Silero VAD ONNX model, downloading it through torch.hub if no path is given."""
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    options.inter_op_num_threads = 1
+    options.intra_op_num_threads = 1
+    if model_path:
+        return onnxruntime.InferenceSession(model_path, sess_options=options,
+                                            providers=['CPUExecutionProvider'])
+
+    import torch
+    model, _ = torch.hub.load(
+        repo_or_dir='snakers4/silero-vad',
+        model='silero_vad',
+        force_reload=False,
+        onnx=True
+    )
+    return model.session
+
+
+class BatchedSileroScorer:
+    """
+    Scores frames from many audio streams in one Silero ONNX forward pass.
+
+    Silero is recurrent, so each stream keeps its own LSTM state and the 64
+    samples of left context the model expects. A call stacks one frame per
+    active stream into a (batch, context + frame) input and the matching
+    per-stream states into a (2, batch, 128) state tensor.
+    """
+
+    def __init__(self, sample_rate=16000, frame_size=512, model_path=None, session=None):
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.context_size = 64 if sample_rate == 16000 else 32
+        self.session = session or _load_onnx_session(model_path)
+        self._sr = np.array(sample_rate, dtype=np.int64)
+        self._states = {}
+        self._contexts = {}
+
+    def reset(self, stream_id):
+        """Clear the recurrent state of one stream."""
+        self._states[stream_id] = np.zeros(_STATE_SHAPE, dtype=np.float32)
+        self._contexts[stream_id] = np.zeros(self.context_size, dtype=np.float32)
+
+    def remove(self, stream_id):
+        self._states.pop(stream_id, None)
+        self._contexts.pop(stream_id, None)
+
+    def score(self, frames):
+        """
+        Score one frame for each stream in a single batched forward pass.
+
+        Args:
+            frames: dict of stream_id -> int16 numpy frame of frame_size samples
+
+        Returns:
+            dict: stream_id -> speech probability
+        """
+        if not frames:
+            return {}
+        stream_ids = list(frames)
+        for stream_id in stream_ids:
+            if stream_id not in self._states:
+                self.reset(stream_id)
+
+        audio = np.stack([frames[s] for s in stream_ids]).astype(np.float32) / 32768.0
+        contexts = np.stack([self._contexts[s] for s in stream_ids])
+        batch_input = np.concatenate((contexts, audio), axis=1)
+        state = np.concatenate([self._states[s] for s in stream_ids], axis=1)
+
+        output, new_state = self.session.run(
+            None, {'input': batch_input, 'state': state, 'sr': self._sr}
+        )
+
+        probabilities = {}
+        for i, stream_id in enumerate(stream_ids):
+            self._states[stream_id] = new_state[:, i:i + 1, :]
+            self._contexts[stream_id] = batch_input[i, -self.context_size:]
+            probabilities[stream_id] = float(output[i, 0])
+        return probabilities
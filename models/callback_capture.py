@@ -0,0 +1,104 @@
+import time
+
+import numpy as np
+
+from .ring_buffer import SpscRingBuffer
+
+
+class CallbackInputStream:
+    """
+    Non-blocking microphone capture through PortAudio's callback API.
+
+    PortAudio calls _on_audio on its own thread with every buffer; the callback
+    only copies the samples into a preallocated SpscRingBuffer, so it never
+    waits on the VAD loop. read() is the consumer side: it drains everything
+    queued in one pop_into() call into a local batch and serves reads from
+    that batch, so after a stall the whole backlog is moved in one step and
+    processed back to back. A ring of a few seconds absorbs stalls that would
+    overflow PortAudio's own buffer of a frame or two.
+
+    read() has the same shape as a PyAudio blocking stream, so it can be
+    wrapped by ResamplingStream or used directly by the recorders.
+    """
+
+    def __init__(self, rate=16000, frame_size=512, buffer_seconds=2.0, audio=None, device_index=None):
+        import pyaudio
+        from .audio_device import get_pyaudio
+
+        self.rate = rate
+        self.frame_size = frame_size
+        capacity = max(4, int(np.ceil(buffer_seconds * rate / frame_size)))
+        self.ring = SpscRingBuffer(capacity, frame_size, np.int16)
+        self._batch = np.empty((capacity, frame_size), dtype=np.int16)
+        self._batch_flat = self._batch.reshape(-1)
+        self._batch_fill = 0    # Samples in the local batch
+        self._batch_offset = 0  # Samples of the batch already returned
+        self._poll_interval = frame_size / rate / 4
+        self.overflows = 0      # Buffers PortAudio flagged as overflowed before the callback ran
+        self.short_buffers = 0  # Callbacks whose size did not match frame_size (dropped)
+        self._continue = pyaudio.paContinue
+        self._overflow_flag = pyaudio.paInputOverflow
+        self.stream = (audio or get_pyaudio()).open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=rate,
+            input=True,
+            input_device_index=device_index,
+            frames_per_buffer=frame_size,
+            stream_callback=self._on_audio
+        )
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PortAudio callback (producer side); must not block."""
+        if status & self._overflow_flag:
+            self.overflows += 1
+        if frame_count == self.frame_size:
+            self.ring.push(np.frombuffer(in_data, dtype=np.int16))
+        else:
+            self.short_buffers += 1
+        return None, self._continue
+
+    @property
+    def dropped_frames(self) -> int:
+        """Frames the callback could not queue because the consumer fell a whole buffer behind."""
+        return self.ring.dropped
+
+    def _refill(self):
+        """Move the whole queued backlog into the local batch, waiting for at least one frame."""
+        while True:
+            frames = self.ring.pop_into(self._batch)
+            if frames:
+                self._batch_fill = frames * self.frame_size
+                self._batch_offset = 0
+                return
+            if not self.stream.is_active():
+                raise OSError("輸入串流已停止")
+            time.sleep(self._poll_interval)
+
+    def read(self, num_frames, exception_on_overflow=False) -> bytes:
+        """Return num_frames samples of PCM16, waiting only if nothing is queued."""
+        if self._batch_fill - self._batch_offset >= num_frames:
+            start = self._batch_offset
+            self._batch_offset += num_frames
+            return self._batch_flat[start:self._batch_offset].tobytes()
+
+        parts = []
+        remaining = num_frames
+        while remaining:
+            if self._batch_offset == self._batch_fill:
+                self._refill()
+            take = min(remaining, self._batch_fill - self._batch_offset)
+            parts.append(self._batch_flat[self._batch_offset:self._batch_offset + take].tobytes())
+            self._batch_offset += take
+            remaining -= take
+        return b''.join(parts)
+
+    def get_read_available(self) -> int:
+        """Samples captured but not yet read."""
+        return len(self.ring) * self.frame_size + self._batch_fill - self._batch_offset
+
+    def stop_stream(self):
+        self.stream.stop_stream()
+
+    def close(self):
+        self.stream.close()
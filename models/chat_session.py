@@ -1,11 +1,14 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional
 from .message import Message, MessageRole
+from .chat_store import ChatStore
 
 
 @dataclass
 class ChatSession:
     messages: List[Message] = field(default_factory=list)
+    store: Optional[ChatStore] = None
+    session_id: Optional[int] = None
     
     def __post_init__(self):
         if not self.messages:
@@ -15,9 +18,43 @@ class ChatSession:
                     content="You are a helpful AI assistant. You can use tools: get_today_date, get_current_time, simple_calculator, get_weather"
                 )
             ]
+            if self.store is not None:
+                self.session_id = self.store.create_session()
+                self.store.append(self.session_id, 0, self.messages[0])
+        # Sequence numbers of the oldest in-memory non-system message and of the next append
+        self._first_loaded_seq = 1
+        self._next_seq = len(self.messages)
+        self._invalidate_encoding()
+    
+    @classmethod
+    def open(cls, store: ChatStore, history_window: int = 50) -> 'ChatSession':
+        """
+        Reopen the latest stored session, paging in only the active window.
+        
+        Args:
+            store: Persistent chat store
+            history_window: Number of most recent messages to load
+        
+        Returns:
+            ChatSession: The resumed session, or a new one if none is stored
+        """
+        session_id = store.latest_session()
+        if session_id is None:
+            return cls(store=store)
+        
+        messages, first_seq, next_seq = store.load_window(session_id, history_window)
+        if not messages:
+            return cls(store=store)
+        session = cls(messages=messages, store=store, session_id=session_id)
+        session._first_loaded_seq = first_seq
+        session._next_seq = next_seq
+        return session
     
     def add_message(self, message: Message):
         self.messages.append(message)
+        if self.store is not None:
+            self.store.append(self.session_id, self._next_seq, message)
+        self._next_seq += 1
     
     def add_user_message(self, content: str):
         self.add_message(Message(role=MessageRole.USER, content=content))
@@ -28,8 +65,73 @@ class ChatSession:
     def add_tool_message(self, content: str):
         self.add_message(Message(role=MessageRole.TOOL, content=content))
     
+    def load_earlier(self, count: int) -> int:
+        """
+        Page older stored messages into memory, just after the system prompt.
+        
+        Returns:
+            int: Number of messages loaded
+        """
+        if self.store is None or self._first_loaded_seq <= 1:
+            return 0
+        start = max(1, self._first_loaded_seq - count)
+        earlier = self.store.load_range(self.session_id, start, self._first_loaded_seq)
+        self.messages[1:1] = earlier
+        self._first_loaded_seq = start
+        self._invalidate_encoding()
+        return len(earlier)
+    
     def get_messages_as_dict(self) -> List[dict]:
         return [msg.to_dict() for msg in self.messages]
     
+    def _invalidate_encoding(self):
+        self._encoded_body = bytearray()
+        # (message, its encoding, length of the body before it) per message in the body
+        self._encoded_slots = []
+    
+    def get_encoded_messages(self, extra: Optional[List[Message]] = None) -> bytes:
+        """
+        JSON array of all messages, assembled from cached per-message encodings.
+        
+        Only messages added since the last call are encoded, so the per-turn
+        serialization cost does not grow with the history. Every slot is
+        checked by identity against the message and encoding it was built
+        from; the body is rebuilt from the first message that was modified or
+        moved, and only this session's cache is affected.
+        
+        Args:
+            extra: Messages to append to the payload without adding them to the session
+        
+        Returns:
+            bytes: UTF-8 JSON array, ready to splice into a request body
+        """
+        slots = self._encoded_slots
+        valid = 0
+        for (message, encoded, _), current in zip(slots, self.messages):
+            if current is not message or message.encode() is not encoded:
+                break
+            valid += 1
+        if valid < len(slots):
+            del self._encoded_body[slots[valid][2]:]
+            del slots[valid:]
+        
+        for message in self.messages[valid:]:
+            offset = len(self._encoded_body)
+            encoded = message.encode()
+            if self._encoded_body:
+                self._encoded_body += b","
+            self._encoded_body += encoded
+            slots.append((message, encoded, offset))
+        
+        body = bytes(self._encoded_body)
+        if extra:
+            fragments = [body] if body else []
+            fragments.extend(message.encode() for message in extra)
+            body = b",".join(fragments)
+        return b"[" + body + b"]"
+    
     def clear(self):
+        if self.store is not None and self.session_id is not None:
+            self.store.close_session(self.session_id)
+        self.messages = []
         self.__post_init__()
\ No newline at end of file
@@ -0,0 +1,119 @@
+import json
+import time
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+
+from .message import Message, MessageRole, ToolCall
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    closed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    tool_calls TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+class ChatStore:
+    """
+    Append-only SQLite storage for chat sessions.
+
+    Each message is one INSERT in write-ahead-log mode, so a turn costs a single
+    sequential append. Messages are keyed by (session, sequence number), which
+    lets a session reopen by reading only its system prompt and the most recent
+    window instead of the whole history, and WAL recovery after a crash only
+    replays the uncheckpointed tail.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _to_message(role, content, tool_calls) -> Message:
+        calls = None
+        if tool_calls:
+            calls = [ToolCall(tc["name"], tc.get("arguments", {})) for tc in json.loads(tool_calls)]
+        return Message(role=MessageRole(role), content=content, tool_calls=calls)
+
+    def create_session(self) -> int:
+        """Start a new session and return its id."""
+        with self._lock:
+            cursor = self.conn.execute("INSERT INTO sessions (created_at) VALUES (?)", (time.time(),))
+            return cursor.lastrowid
+
+    def latest_session(self) -> Optional[int]:
+        """Id of the most recent session that was not cleared, or None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT id FROM sessions WHERE closed = 0 ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def close_session(self, session_id: int):
+        """Mark a session as finished so it is not reopened."""
+        with self._lock:
+            self.conn.execute("UPDATE sessions SET closed = 1 WHERE id = ?", (session_id,))
+
+    def append(self, session_id: int, seq: int, message: Message):
+        """Append one message to a session."""
+        tool_calls = None
+        if message.tool_calls:
+            tool_calls = json.dumps(
+                [{"name": tc.name, "arguments": tc.arguments} for tc in message.tool_calls],
+                ensure_ascii=False
+            )
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO messages (session_id, seq, role, content, tool_calls, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, seq, message.role.value, message.content, tool_calls, time.time())
+            )
+
+    def next_seq(self, session_id: int) -> int:
+        """Sequence number the next appended message will get."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT MAX(seq) FROM messages WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def load_range(self, session_id: int, start: int, end: int) -> List[Message]:
+        """Load messages with start <= seq < end, in order."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT role, content, tool_calls FROM messages "
+                "WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (session_id, start, end)
+            ).fetchall()
+        return [self._to_message(*row) for row in rows]
+
+    def load_window(self, session_id: int, window: int) -> Tuple[List[Message], int, int]:
+        """
+        Load the system prompt plus the last `window` messages of a session.
+
+        Returns:
+            tuple: (messages, seq of the oldest windowed message, next seq)
+        """
+        next_seq = self.next_seq(session_id)
+        first_seq = max(1, next_seq - window)
+        messages = self.load_range(session_id, 0, 1) + self.load_range(session_id, first_seq, next_seq)
+        return messages, first_seq, next_seq
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -6,6 +6,16 @@ class OllamaConfig:
     """Configuration for LLaMA/Ollama service."""
     api_url: str = "http://localhost:11434/api/chat"  # Ollama API endpoint
     model: str = "llama3"  # LLaMA model name
+    max_in_flight: int = 2  # Concurrent generations admitted to the backend (match OLLAMA_NUM_PARALLEL)
+    connect_timeout: float = 5.0  # Seconds to establish the connection
+    first_token_timeout: float = 30.0  # Seconds from request to first token before the request is retried
+    inter_token_timeout: float = 10.0  # Longest gap between tokens before the stream counts as stalled
+    turn_deadline: float = 120.0  # Hard upper bound on one streamed answer
+    stall_retries: int = 1  # Retries of a request that stalls before its first token
+    hedge_url: str = ""  # Second endpoint for hedged requests (empty: same endpoint)
+    hedge_model: str = ""  # Model for hedged requests (empty: same model); hedging is on if either is set
+    hedge_percentile: float = 0.95  # Hedge once the first token is later than this percentile of recent ones
+    hedge_min_delay: float = 1.0  # Never hedge earlier than this (also used until enough history exists)
     
     
 @dataclass
@@ -21,15 +31,77 @@ class SpeechConfig:
         return self.trigger_language
     
     
+@dataclass
+class TtsConfig:
+    """Configuration for spoken responses."""
+    enabled: bool = False  # Speak AI responses in addition to printing them
+    engine: str = "espeak"  # Local TTS engine: espeak or pyttsx3
+    voice: str = "zh"  # Engine voice name
+    rate: int = 175  # Words per minute
+    output_wav: str = ""  # Write audio to this WAV file instead of the speaker
+    
+    
+@dataclass
+class SessionConfig:
+    """Configuration for persistent chat history."""
+    db_path: str = ""  # SQLite chat store, e.g. "chat_history.db"; empty keeps history in memory only
+    history_window: int = 50  # Recent messages paged in when a session is reopened
+    resume: bool = False  # Reopen the last stored session on startup instead of starting a new one (needs db_path)
+    capture_path: str = ""  # Append turn transcripts and timings here as JSON lines for load_test.py
+    
+    
+@dataclass
+class StartupConfig:
+    """Configuration for startup warm-up."""
+    warm_up: bool = True  # Load models, devices and caches concurrently while the welcome message shows
+    weather_city: str = "Taipei"  # City whose weather is fetched into the tool cache
+
+
+@dataclass
+class IntentConfig:
+    """Configuration for the local intent fast path."""
+    enabled: bool = True  # Answer clear date/time/calculator/weather questions from the tools without the LLM
+    
+    
+@dataclass
+class RouterConfig:
+    """Configuration for routing turns between a small and a large Ollama model."""
+    enabled: bool = False  # Route each turn by query complexity; off sends everything to OllamaConfig.model
+    small_model: str = "llama3.2:1b"  # Fast model for short chit-chat
+    large_model: str = ""  # Model for everything else (empty: OllamaConfig.model)
+    small_keep_alive: str = "60m"  # How long Ollama keeps the small model loaded ("-1": for ever)
+    large_keep_alive: str = ""  # Same for the large model (empty: Ollama's default of 5 minutes)
+    max_small_words: int = 24  # Longer queries (CJK characters or words) go to the large model
+    max_small_history: int = 16  # Conversations with more messages go to the large model
+    tools_to_large: bool = True  # Queries that look like they need a tool go to the large model
+    escalate: bool = True  # Let the small model hand the turn to the large one when it is unsure
+    escalation_marker: str = "[ESCALATE]"  # Reply the small model gives to hand the turn over
+    
+    
 @dataclass
 class AppConfig:
     """Main application configuration combining all service configs."""
     ollama: OllamaConfig = None
     speech: SpeechConfig = None
+    tts: TtsConfig = None
+    session: SessionConfig = None
+    startup: StartupConfig = None
+    intent: IntentConfig = None
+    router: RouterConfig = None
     
     def __post_init__(self):
         """Initialize default configurations if not provided."""
         if self.ollama is None:
             self.ollama = OllamaConfig()
         if self.speech is None:
-            self.speech = SpeechConfig()
\ No newline at end of file
+            self.speech = SpeechConfig()
+        if self.tts is None:
+            self.tts = TtsConfig()
+        if self.session is None:
+            self.session = SessionConfig()
+        if self.startup is None:
+            self.startup = StartupConfig()
+        if self.intent is None:
+            self.intent = IntentConfig()
+        if self.router is None:
+            self.router = RouterConfig()
\ No newline at end of file
@@ -0,0 +1,440 @@
+import os
+import glob
+import time
+import wave
+import numpy as np
+import pyaudio
+
+from .audio_device import get_pyaudio, open_input_stream
+
+
+def _hz_to_mel(hz):
+    return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+
+def _mel_to_hz(mel):
+    return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+
+def _mel_filterbank(sample_rate, n_fft, n_mels):
+    """Build a triangular mel filterbank matrix of shape (n_fft // 2 + 1, n_mels)."""
+    mel_points = np.linspace(_hz_to_mel(0.0), _hz_to_mel(sample_rate / 2.0), n_mels + 2)
+    bins = np.floor((n_fft + 1) * _mel_to_hz(mel_points) / sample_rate).astype(int)
+    fbank = np.zeros((n_fft // 2 + 1, n_mels), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            fbank[left:center, m - 1] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            fbank[center:right, m - 1] = (right - np.arange(center, right)) / (right - center)
+    return fbank
+
+
+def _dct_matrix(n_in, n_out):
+    """DCT-II basis used to turn log-mel energies into cepstral coefficients."""
+    n = np.arange(n_in)
+    k = np.arange(n_out)[:, None]
+    return (np.cos(np.pi / n_in * (n + 0.5) * k) * np.sqrt(2.0 / n_in)).T.astype(np.float32)
+
+
+def dtw_anchored(template, segment):
+    """
+    DTW alignment of a template against the start of a segment.
+
+    The path is anchored at the first frame of both sequences but may end at
+    any frame of the segment, so the template can be found at the start of a
+    longer utterance.
+
+    Returns:
+        tuple: (normalized distance, index of the last segment frame matched)
+    """
+    n, m = len(template), len(segment)
+    if n == 0 or m == 0:
+        return float("inf"), 0
+    cost = np.sqrt(((template[:, None, :] - segment[None, :, :]) ** 2).sum(axis=2))
+
+    # Row-wise recurrence D[i, j] = C[i, j] + min(D[i-1, j], D[i-1, j-1], D[i, j-1]),
+    # vectorized with the prefix-sum identity so each row is a handful of numpy ops.
+    prev = np.cumsum(cost[0])
+    for i in range(1, n):
+        diag = np.empty(m)
+        diag[0] = np.inf
+        diag[1:] = prev[:-1]
+        best_prev = np.minimum(prev, diag)
+        prefix = np.cumsum(cost[i])
+        shifted = np.concatenate(([0.0], prefix[:-1]))
+        prev = prefix + np.minimum.accumulate(best_prev - shifted)
+
+    normalized = prev / (n + np.arange(1, m + 1))
+    end = int(np.argmin(normalized))
+    return float(normalized[end]), end
+
+
+class KeywordSpotter:
+    """
+    Always-on keyword spotter for the trigger word.
+
+    Runs locally on the capture stream: log-mel cepstra every 10 ms, an energy
+    segmenter and DTW template matching against enrolled recordings of the
+    trigger word. No audio leaves the machine before the keyword fires.
+    """
+
+    def __init__(self, keyword, template_dir, sample_rate=16000, frame_size=320,
+                 energy_threshold=300.0, sensitivity=1.2, match_threshold=None, noise_floor=None):
+        self.keyword = keyword
+        self.template_dir = template_dir
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.energy_threshold = energy_threshold
+        self.noise_floor = noise_floor    # Shared NoiseFloorEstimator, replaces the fixed threshold
+        self.sensitivity = sensitivity
+
+        # Feature extraction settings: 25 ms windows, 10 ms hop
+        self.win_size = int(sample_rate * 0.025)
+        self.hop_size = int(sample_rate * 0.010)
+        self.n_fft = 512
+        self.window = np.hamming(self.win_size).astype(np.float32)
+        self.mel_fbank = _mel_filterbank(sample_rate, self.n_fft, 26)
+        self.dct = _dct_matrix(26, 13)
+
+        # Segmenter settings (in hops)
+        self.preroll_hops = 10
+        self.hangover_hops = 10    # ~100 ms of silence closes a segment
+        self.min_segment_hops = 15
+
+        # One-shot query capture settings (in hops), see wait_for_keyword(capture_query=True)
+        self.query_wait_hops = 80        # Silence after the keyword that means no query follows
+        self.query_hangover_hops = 70    # Silence that ends the query
+        self.min_query_hops = 15         # Voiced hops needed to count as a query, not the keyword's tail
+        self.max_query_hops = 1500
+        self.query_pcm = b''
+
+        self.templates = self._load_templates()
+        self.max_segment_hops = self._max_template_hops()
+        self.match_threshold = match_threshold if match_threshold is not None else self._calibrate_threshold()
+
+        self.audio = None
+        self.capture_rate = None  # Device rate: None opens at sample_rate, 0 uses the native rate
+        self.duty_cycler = None   # Optional DutyCycler that stops feature extraction during long silence
+        self.is_listening = False
+
+    # ----- features -----
+
+    def _reset_stream_state(self):
+        self._tail = np.zeros(self.win_size - self.hop_size, dtype=np.float32)
+
+    def _features(self, samples):
+        """
+        Compute cepstral features for newly captured samples.
+
+        Args:
+            samples: float32 samples whose length is a multiple of hop_size
+
+        Returns:
+            tuple: (features of shape (hops, 13), per-hop RMS in int16 units)
+        """
+        buf = np.concatenate((self._tail, samples))
+        self._tail = buf[-(self.win_size - self.hop_size):]
+        frames = np.lib.stride_tricks.sliding_window_view(buf, self.win_size)[::self.hop_size]
+        rms = np.sqrt((frames[:, -self.hop_size:] ** 2).mean(axis=1)) * 32768.0
+        spectrum = np.abs(np.fft.rfft(frames * self.window, n=self.n_fft, axis=1)) ** 2
+        log_mel = np.log(spectrum @ self.mel_fbank + 1e-6)
+        return (log_mel @ self.dct).astype(np.float32), rms
+
+    def _file_features(self, path):
+        """Compute mean-normalized features for a WAV file."""
+        with wave.open(path, 'rb') as wav_file:
+            pcm = wav_file.readframes(wav_file.getnframes())
+        samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        usable = len(samples) - len(samples) % self.hop_size
+        self._reset_stream_state()
+        feats, _ = self._features(samples[:usable])
+        return feats - feats.mean(axis=0)
+
+    # ----- templates -----
+
+    def _keyword_dir(self):
+        return os.path.join(self.template_dir, self.keyword.lower())
+
+    def _load_templates(self):
+        paths = sorted(glob.glob(os.path.join(self._keyword_dir(), "*.wav")))
+        return [self._file_features(path) for path in paths]
+
+    def _max_template_hops(self):
+        if not self.templates:
+            return 150
+        return int(max(len(t) for t in self.templates) * 1.5)
+
+    def _calibrate_threshold(self):
+        """Derive the match threshold from the spread between enrolled templates."""
+        if len(self.templates) < 2:
+            return 20.0
+        distances = [
+            dtw_anchored(a, b)[0]
+            for i, a in enumerate(self.templates)
+            for b in self.templates[i + 1:]
+        ]
+        return max(distances) * self.sensitivity
+
+    def has_templates(self) -> bool:
+        """Check whether the trigger word has been enrolled."""
+        return bool(self.templates)
+
+    def match(self, features):
+        """
+        Match segment features against the enrolled templates.
+
+        Returns:
+            tuple: (best normalized distance, hop index where the keyword ends)
+        """
+        segment = features - features.mean(axis=0)
+        best = (float("inf"), 0)
+        for template in self.templates:
+            result = dtw_anchored(template, segment)
+            if result[0] < best[0]:
+                best = result
+        return best
+
+    # ----- capture -----
+
+    def _open_stream(self):
+        if self.audio is None:
+            self.audio = get_pyaudio()
+        return open_input_stream(self.sample_rate, self.frame_size, self.capture_rate)
+
+    def _read_frame(self, stream):
+        """
+        Read one frame and update the shared noise floor.
+
+        Returns:
+            tuple: (PCM bytes, float32 samples, energy threshold for this frame)
+        """
+        frame_bytes = stream.read(self.frame_size, exception_on_overflow=False)
+        samples, threshold = self._prepare_frame(frame_bytes)
+        return frame_bytes, samples, threshold
+
+    def _prepare_frame(self, frame_bytes, update_floor=True):
+        """
+        Convert a frame for feature extraction.
+
+        Returns:
+            tuple: (float32 samples, energy threshold for this frame)
+        """
+        samples = np.frombuffer(frame_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+        if self.noise_floor is None:
+            return samples, self.energy_threshold
+        if update_floor:
+            return samples, self.noise_floor.update(frame_bytes)
+        return samples, self.noise_floor.energy_threshold
+
+    def _hop_pcm(self, frame_bytes):
+        """Split a frame's PCM into the per-hop chunks that line up with its features."""
+        hop_bytes = self.hop_size * 2
+        return [frame_bytes[i:i + hop_bytes] for i in range(0, len(frame_bytes), hop_bytes)]
+
+    def _iter_segments(self, stream):
+        """
+        Yield energy-delimited segments from the stream.
+
+        With a duty cycler, long silence is not turned into features (see
+        _next_frames).
+
+        Yields:
+            tuple: (features, per-hop PCM chunks, per-hop voiced flags), one entry per hop
+        """
+        self._reset_stream_state()
+        history = []
+        segment = None
+        silent_hops = 0
+        if self.duty_cycler is not None:
+            self.duty_cycler.start_stream()
+
+        while self.is_listening:
+            for frame_bytes, samples, threshold in self._next_frames(stream, busy=segment is not None):
+                feats, rms = self._features(samples)
+
+                for feat, pcm, energy in zip(feats, self._hop_pcm(frame_bytes), rms):
+                    voiced = energy > threshold
+                    if segment is None:
+                        history.append((feat, pcm, voiced))
+                        if len(history) > self.preroll_hops:
+                            history.pop(0)
+                        if voiced:
+                            segment = list(history)
+                            silent_hops = 0
+                        continue
+
+                    segment.append((feat, pcm, voiced))
+                    silent_hops = 0 if voiced else silent_hops + 1
+                    if silent_hops >= self.hangover_hops or len(segment) >= self.max_segment_hops:
+                        kept = segment[:len(segment) - silent_hops]
+                        feats_kept, pcm_kept, voiced_kept = zip(*kept)
+                        yield np.array(feats_kept), list(pcm_kept), list(voiced_kept)
+                        # Skip the rest of an over-long utterance before looking again
+                        if silent_hops < self.hangover_hops:
+                            self._skip_until_silence(stream)
+                        segment = None
+                        history = []
+
+    def _next_frames(self, stream, busy=False):
+        """
+        Read one frame and return the frames to turn into features.
+
+        Without a duty cycler that is the frame itself. While the cycler is
+        idle it is nothing; when it wakes it is the cycler's look-back plus the
+        frame, and the feature window restarts there so the pre-roll is
+        contiguous. The cycler updates the noise floor itself.
+
+        Returns:
+            list: (PCM bytes, float32 samples, energy threshold) per frame
+        """
+        if self.duty_cycler is None:
+            return [self._read_frame(stream)]
+        frame_bytes = stream.read(self.frame_size, exception_on_overflow=False)
+        frames = self.duty_cycler.process(frame_bytes, busy=busy)
+        if len(frames) > 1:
+            self._reset_stream_state()
+        return [(frame, *self._prepare_frame(frame, update_floor=False)) for frame in frames]
+
+    def _skip_until_silence(self, stream):
+        silent_hops = 0
+        while self.is_listening and silent_hops < self.hangover_hops:
+            frame_bytes, samples, threshold = self._read_frame(stream)
+            _, rms = self._features(samples)
+            for energy in rms:
+                silent_hops = 0 if energy > threshold else silent_hops + 1
+
+    def wait_for_keyword(self, capture_query=False) -> str:
+        """
+        Block until the trigger word is spoken.
+
+        Args:
+            capture_query: Also capture what is said right after the trigger
+                word (one-shot "hello, what's the weather"). The keyword's end
+                comes from the DTW alignment; the audio after it, up to the end
+                of the utterance, is left in query_pcm (empty when nothing
+                follows the trigger word).
+
+        Returns:
+            str: The trigger word, empty string if listening was stopped
+        """
+        self.is_listening = True
+        self.query_pcm = b''
+        stream = self._open_stream()
+        try:
+            for features, pcm, voiced in self._iter_segments(stream):
+                if len(features) < self.min_segment_hops:
+                    continue
+                start = time.perf_counter()
+                distance, end = self.match(features)
+                if distance <= self.match_threshold:
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    print(f"🔑 偵測到喚醒詞 '{self.keyword}' (距離: {distance:.2f}, 比對 {elapsed_ms:.1f} ms)")
+                    if capture_query:
+                        self.query_pcm = self._capture_query(stream, pcm[end + 1:], sum(voiced[end + 1:]))
+                    return self.keyword
+            return ""
+        finally:
+            stream.stop_stream()
+            stream.close()
+            self.is_listening = False
+
+    def _capture_query(self, stream, pcm, voiced_hops):
+        """
+        Continue capturing after the keyword until the utterance ends.
+
+        Args:
+            pcm: Per-hop PCM already captured after the keyword's end
+            voiced_hops: How many of those hops were voiced
+
+        Returns:
+            bytes: The query's PCM, or b'' if no speech followed within query_wait_hops
+        """
+        pcm = list(pcm)
+        silent_hops = 0
+        while self.is_listening and len(pcm) < self.max_query_hops:
+            frame_bytes, samples, threshold = self._read_frame(stream)
+            _, rms = self._features(samples)
+            pcm.extend(self._hop_pcm(frame_bytes))
+            for energy in rms:
+                if energy > threshold:
+                    voiced_hops += 1
+                    silent_hops = 0
+                else:
+                    silent_hops += 1
+            speaking = voiced_hops >= self.min_query_hops
+            if not speaking and silent_hops >= self.query_wait_hops:
+                return b''
+            if speaking and silent_hops >= self.query_hangover_hops:
+                break
+        return b''.join(pcm) if voiced_hops >= self.min_query_hops else b''
+
+    def stop(self):
+        """Stop waiting for the keyword."""
+        self.is_listening = False
+
+    def enroll(self, count=3):
+        """
+        Record examples of the trigger word and store them as templates.
+
+        Args:
+            count: Number of examples to record
+        """
+        os.makedirs(self._keyword_dir(), exist_ok=True)
+        self.is_listening = True
+        stream = self._open_stream()
+        recorded = 0
+        try:
+            print(f"🎙️ 請說 '{self.keyword}' {count} 次，每次之間稍作停頓")
+            while recorded < count and self.is_listening:
+                pcm = self._record_segment(stream)
+                if not pcm:
+                    continue
+                filename = os.path.join(self._keyword_dir(), f"template_{int(time.time() * 1000)}.wav")
+                with wave.open(filename, 'wb') as wav_file:
+                    wav_file.setnchannels(1)
+                    wav_file.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
+                    wav_file.setframerate(self.sample_rate)
+                    wav_file.writeframes(pcm)
+                recorded += 1
+                print(f"💾 範本 {recorded}/{count} 已保存: {filename}")
+        finally:
+            stream.stop_stream()
+            stream.close()
+            self.is_listening = False
+
+        self.templates = self._load_templates()
+        self.max_segment_hops = self._max_template_hops()
+        self.match_threshold = self._calibrate_threshold()
+
+    def _record_segment(self, stream):
+        """Capture one energy-delimited utterance and return its PCM bytes."""
+        self._reset_stream_state()
+        frames = []
+        preroll = []
+        silent_hops = 0
+        hops_per_frame = self.frame_size // self.hop_size
+
+        while self.is_listening:
+            frame_bytes, samples, threshold = self._read_frame(stream)
+            _, rms = self._features(samples)
+            voiced = bool((rms > threshold).any())
+
+            if not frames:
+                preroll.append(frame_bytes)
+                if len(preroll) > self.preroll_hops // hops_per_frame:
+                    preroll.pop(0)
+                if voiced:
+                    frames = list(preroll)
+                continue
+
+            frames.append(frame_bytes)
+            silent_hops = 0 if voiced else silent_hops + hops_per_frame
+            if silent_hops >= self.hangover_hops * 3:
+                return b''.join(frames)
+        return b''
+
+    def cleanup(self):
+        """Release audio resources."""
+        # The PyAudio instance is shared; it is terminated on application shutdown
+        self.audio = None
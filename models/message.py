@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+import json
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 from enum import Enum
 
@@ -10,17 +11,39 @@ class MessageRole(Enum):
     TOOL = "tool"
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCall:
     name: str
     arguments: Dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     role: MessageRole
     content: str
     tool_calls: Optional[List[ToolCall]] = None
+    _encoded: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name, value):
+        if name != "_encoded" and getattr(self, "_encoded", None) is not None:
+            # Any field change makes the cached encoding dirty
+            object.__setattr__(self, "_encoded", None)
+        object.__setattr__(self, name, value)
+    
+    def encode(self) -> bytes:
+        """
+        JSON encoding of to_dict(), cached until a field changes.
+        
+        A new bytes object is returned after a change, so callers holding an
+        earlier result can tell by identity whether it is still current.
+        
+        tool_calls must be replaced rather than mutated in place for the cache
+        to notice the change.
+        """
+        if self._encoded is None:
+            encoded = json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            object.__setattr__(self, "_encoded", encoded)
+        return self._encoded
     
     def to_dict(self) -> Dict[str, Any]:
         result = {
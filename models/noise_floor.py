@@ -0,0 +1,73 @@
+import numpy as np
+
+
+class NoiseFloorEstimator:
+    """
+    Running noise-floor estimate over the capture stream.
+
+    Every captured frame is split into 10 ms blocks whose RMS is computed in one
+    vectorized pass. The quietest block drives an asymmetric tracker that falls
+    quickly when the room gets quieter and rises slowly, so speech does not pull
+    the floor up. The energy threshold (in int16 RMS units, like
+    speech_recognition's Recognizer.energy_threshold) is the floor plus a margin.
+    """
+
+    def __init__(self, sample_rate=16000, margin_db=10.0, rise_time=5.0, fall_time=0.3,
+                 min_threshold=50.0):
+        self.sample_rate = sample_rate
+        self.block_size = sample_rate // 100
+        self.margin = 10.0 ** (margin_db / 20.0)
+        self.rise_time = rise_time
+        self.fall_time = fall_time
+        self.min_threshold = min_threshold
+        self.floor_db = None
+
+    def _coefficient(self, time_constant, frame_seconds):
+        return 1.0 - np.exp(-frame_seconds / time_constant)
+
+    def update(self, frame) -> float:
+        """
+        Feed one captured frame and return the updated energy threshold.
+
+        Args:
+            frame: PCM16 bytes or int16 numpy array
+
+        Returns:
+            float: Current energy threshold
+        """
+        samples = np.frombuffer(frame, dtype=np.int16) if isinstance(frame, bytes) else frame
+        blocks = len(samples) // self.block_size
+        if blocks == 0:
+            return self.energy_threshold
+
+        usable = samples[:blocks * self.block_size].astype(np.float32).reshape(blocks, self.block_size)
+        rms = np.sqrt((usable * usable).mean(axis=1))
+        level_db = 20.0 * np.log10(max(float(rms.min()), 1.0))
+
+        if self.floor_db is None:
+            self.floor_db = level_db
+        else:
+            frame_seconds = len(samples) / self.sample_rate
+            time_constant = self.fall_time if level_db < self.floor_db else self.rise_time
+            self.floor_db += (level_db - self.floor_db) * self._coefficient(time_constant, frame_seconds)
+        return self.energy_threshold
+
+    def seed(self, energy_threshold: float):
+        """Initialize the floor from an externally measured energy threshold."""
+        self.floor_db = 20.0 * np.log10(max(energy_threshold / self.margin, 1.0))
+
+    def is_primed(self) -> bool:
+        """Check whether any audio has been observed yet."""
+        return self.floor_db is not None
+
+    @property
+    def noise_floor(self) -> float:
+        """Current noise floor in int16 RMS units."""
+        if self.floor_db is None:
+            return 0.0
+        return float(10.0 ** (self.floor_db / 20.0))
+
+    @property
+    def energy_threshold(self) -> float:
+        """Energy above which a frame is considered voiced."""
+        return max(self.noise_floor * self.margin, self.min_threshold)
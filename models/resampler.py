@@ -0,0 +1,151 @@
+from math import gcd
+
+import numpy as np
+
+
+class PolyphaseResampler:
+    """
+    Streaming rational-factor resampler (e.g. 48 kHz or 44.1 kHz to 16 kHz).
+
+    A Kaiser-windowed sinc low-pass is split into up polyphase branches of
+    taps_per_phase taps. Every output sample is one dot product of a branch
+    with the most recent input samples, computed for a whole block at once
+    with np.take and np.einsum. Filter history is carried across calls, and
+    every intermediate array is preallocated for max_output samples, so the
+    steady state allocates nothing but the returned bytes.
+    """
+
+    def __init__(self, in_rate, out_rate, max_output=2048, taps_per_phase=32, beta=8.0, rolloff=0.9):
+        divisor = gcd(int(in_rate), int(out_rate))
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = int(out_rate) // divisor
+        self.down = int(in_rate) // divisor
+        self.taps = taps_per_phase
+        self.max_output = max_output
+
+        # Prototype filter at the upsampled rate, split into (up, taps) branches
+        length = self.up * taps_per_phase
+        cutoff = rolloff / max(self.up, self.down)
+        n = np.arange(length) - (length - 1) / 2.0
+        prototype = cutoff * np.sinc(cutoff * n) * np.kaiser(length, beta) * self.up
+        self.phases = prototype.reshape(taps_per_phase, self.up).T.astype(np.float32).copy()
+        self._reversed_phase = self.phases[0, ::-1].copy()
+
+        self.max_input = (max_output * self.down) // self.up + taps_per_phase + 1
+        self._history = np.zeros(taps_per_phase - 1 + self.max_input, dtype=np.float32)
+        self._fill = taps_per_phase - 1  # Leading zeros stand in for the samples before the stream
+        self._position = (taps_per_phase - 1) * self.up  # Next output, in upsampled-sample units
+
+        # Preallocated work buffers
+        self._steps = np.arange(max_output, dtype=np.int64) * self.down
+        self._tap_offsets = np.arange(taps_per_phase, dtype=np.int64)
+        self._positions = np.empty(max_output, dtype=np.int64)
+        self._bases = np.empty(max_output, dtype=np.int64)
+        self._branch = np.empty(max_output, dtype=np.int64)
+        self._indices = np.empty((max_output, taps_per_phase), dtype=np.int64)
+        self._window = np.empty((max_output, taps_per_phase), dtype=np.float32)
+        self._coefficients = np.empty((max_output, taps_per_phase), dtype=np.float32)
+        self._output = np.empty(max_output, dtype=np.float32)
+        self._pcm = np.empty(max_output, dtype=np.int16)
+
+    def input_needed(self, count) -> int:
+        """Number of input samples to push before count output samples can be pulled."""
+        last = (self._position + (count - 1) * self.down) // self.up
+        return max(0, last + 1 - self._fill)
+
+    def push(self, samples):
+        """Append int16 input samples."""
+        end = self._fill + len(samples)
+        if end > len(self._history):
+            raise ValueError(f"一次最多輸入 {len(self._history) - self._fill} 個樣本")
+        np.multiply(samples, 1.0 / 32768.0, out=self._history[self._fill:end], casting='unsafe')
+        self._fill = end
+
+    def pull(self, count) -> np.ndarray:
+        """
+        Produce count output samples as int16.
+
+        The returned array is an internal buffer that is overwritten by the next call.
+        """
+        if count > self.max_output:
+            raise ValueError(f"一次最多輸出 {self.max_output} 個樣本")
+        if self.input_needed(count):
+            raise ValueError("輸入樣本不足")
+
+        positions = self._positions[:count]
+        bases = self._bases[:count]
+        branch = self._branch[:count]
+        indices = self._indices[:count]
+        window = self._window[:count]
+        coefficients = self._coefficients[:count]
+        output = self._output[:count]
+
+        if self.up == 1:
+            # Integer decimation: every output uses the same branch, so read a strided view instead of gathering
+            start = self._position - (self.taps - 1)
+            view = np.lib.stride_tricks.as_strided(
+                self._history[start:],
+                shape=(count, self.taps),
+                strides=(self.down * self._history.itemsize, self._history.itemsize)
+            )
+            np.dot(view, self._reversed_phase, out=output)
+        else:
+            np.add(self._steps[:count], self._position, out=positions)
+            np.floor_divide(positions, self.up, out=bases)
+            np.remainder(positions, self.up, out=branch)
+            np.subtract(bases[:, None], self._tap_offsets[None, :], out=indices)
+            np.take(self._history, indices, out=window)
+            np.take(self.phases, branch, axis=0, out=coefficients)
+            np.einsum('ij,ij->i', window, coefficients, out=output)
+
+        np.multiply(output, 32768.0, out=output)
+        np.clip(output, -32768.0, 32767.0, out=output)
+        pcm = self._pcm[:count]
+        np.copyto(pcm, output, casting='unsafe')
+
+        # Drop input that no future output will reach, keeping taps - 1 samples of history
+        self._position += count * self.down
+        drop = self._position // self.up - (self.taps - 1)
+        if drop > 0:
+            keep = self._fill - drop
+            self._history[:keep] = self._history[drop:self._fill]
+            self._fill = keep
+            self._position -= drop * self.up
+        return pcm
+
+    def reset(self):
+        self._history[:] = 0.0
+        self._fill = self.taps - 1
+        self._position = (self.taps - 1) * self.up
+
+
+class ResamplingStream:
+    """
+    Input stream wrapper that captures at the device rate and reads at the target rate.
+
+    read(n) returns n frames of 16-bit mono PCM at out_rate, like a PyAudio
+    stream opened at that rate, so the recorders' capture loops are unchanged.
+    """
+
+    def __init__(self, stream, in_rate, out_rate, frame_size):
+        self.stream = stream
+        self.resampler = PolyphaseResampler(in_rate, out_rate, max_output=max(frame_size, 64))
+
+    def read(self, num_frames, exception_on_overflow=False) -> bytes:
+        needed = self.resampler.input_needed(num_frames)
+        if needed:
+            raw = self.stream.read(needed, exception_on_overflow=exception_on_overflow)
+            self.resampler.push(np.frombuffer(raw, dtype=np.int16))
+        return self.resampler.pull(num_frames).tobytes()
+
+    def get_read_available(self) -> int:
+        """Frames readable without blocking, in output-rate frames."""
+        resampler = self.resampler
+        return self.stream.get_read_available() * resampler.up // resampler.down
+
+    def stop_stream(self):
+        self.stream.stop_stream()
+
+    def close(self):
+        self.stream.close()
@@ -0,0 +1,114 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+_HEADER_SLOTS = 2  # [frames written, frames read]
+
+
+class SpscRingBuffer:
+    """
+    Lock-free single-producer / single-consumer ring of fixed-size frames.
+
+    The write and read counters live in the same buffer as the data, so the
+    ring can be placed in shared memory and used across processes. Only the
+    producer advances the write counter and only the consumer advances the
+    read counter; both are aligned 64-bit stores, so no lock is needed.
+    """
+
+    def __init__(self, capacity, frame_size, dtype=np.int16, buffer=None, shm=None):
+        self.capacity = capacity
+        self.frame_size = frame_size
+        self.dtype = np.dtype(dtype)
+        self.shm = shm
+        if buffer is None:
+            buffer = bytearray(self.nbytes(capacity, frame_size, dtype))
+        header_bytes = _HEADER_SLOTS * 8
+        self._counters = np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=buffer)
+        self._frames = np.ndarray((capacity, frame_size), dtype=self.dtype, buffer=buffer, offset=header_bytes)
+        self.dropped = 0
+
+    @staticmethod
+    def nbytes(capacity, frame_size, dtype=np.int16):
+        """Bytes needed for a ring with this geometry."""
+        return _HEADER_SLOTS * 8 + capacity * frame_size * np.dtype(dtype).itemsize
+
+    @classmethod
+    def create_shared(cls, capacity, frame_size, dtype=np.int16):
+        """Allocate a ring in a new shared-memory block."""
+        shm = shared_memory.SharedMemory(create=True, size=cls.nbytes(capacity, frame_size, dtype))
+        ring = cls(capacity, frame_size, dtype, buffer=shm.buf, shm=shm)
+        ring._counters[:] = 0
+        return ring
+
+    @classmethod
+    def attach_shared(cls, name, capacity, frame_size, dtype=np.int16):
+        """Attach to a ring created by another process."""
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(capacity, frame_size, dtype, buffer=shm.buf, shm=shm)
+
+    @property
+    def name(self):
+        return self.shm.name if self.shm is not None else None
+
+    @property
+    def written(self) -> int:
+        """Total frames ever pushed; the sequence number of the next frame."""
+        return int(self._counters[0])
+
+    @property
+    def consumed(self) -> int:
+        """Total frames ever popped; the sequence number of the next frame to read."""
+        return int(self._counters[1])
+
+    def __len__(self):
+        return int(self._counters[0] - self._counters[1])
+
+    def push(self, frame) -> bool:
+        """
+        Append one frame (producer side).
+
+        Returns:
+            bool: False if the ring was full and the frame was dropped
+        """
+        head = int(self._counters[0])
+        if head - int(self._counters[1]) >= self.capacity:
+            self.dropped += 1
+            return False
+        self._frames[head % self.capacity] = frame
+        self._counters[0] = head + 1  # Publish only after the data is in place
+        return True
+
+    def pop(self):
+        """Remove and return the oldest frame as a copy, or None if empty (consumer side)."""
+        tail = int(self._counters[1])
+        if tail >= int(self._counters[0]):
+            return None
+        frame = self._frames[tail % self.capacity].copy()
+        self._counters[1] = tail + 1
+        return frame
+
+    def pop_into(self, out) -> int:
+        """
+        Move up to len(out) frames into a preallocated array (consumer side).
+
+        Returns:
+            int: Number of frames copied
+        """
+        tail = int(self._counters[1])
+        count = min(int(self._counters[0]) - tail, len(out))
+        start = tail % self.capacity
+        first = min(count, self.capacity - start)
+        out[:first] = self._frames[start:start + first]
+        out[first:count] = self._frames[:count - first]
+        self._counters[1] = tail + count
+        return count
+
+    def close(self, unlink=False):
+        """Release the shared-memory mapping."""
+        if self.shm is None:
+            return
+        self._counters = None
+        self._frames = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+        self.shm = None
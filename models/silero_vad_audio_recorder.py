@@ -1,35 +1,55 @@
 import os
 import time
+import threading
+from collections import deque
 import numpy as np
 import torch
 import pyaudio
 import wave
 
 from .base_vad_audio_recorder import BaseVadAudioRecorder
+from .audio_device import get_pyaudio
 
 _vad_model = None
 _vad_utils = None
+_vad_model_lock = threading.Lock()  # A startup warm-up and the first recorder may load concurrently
 
 def get_vad_model():
-    """Get or load the Silero VAD model (singleton pattern)."""
+    """
+    Get or load the Silero VAD model (singleton pattern).
+    
+    The first forward pass is much slower than the rest, so it is run here,
+    under the lock, before any recorder can use the model; the state it
+    leaves behind is cleared again.
+    """
     global _vad_model, _vad_utils
-    if _vad_model is None:
-        print("🔄 正在初始化 Silero VAD 模型...")
-        _vad_model, _vad_utils = torch.hub.load(
-            repo_or_dir='snakers4/silero-vad',
-            model='silero_vad',
-            force_reload=False,  # Don't force reload to use cached version
-            onnx=False
-        )
-        print("✅ Silero VAD 模型初始化完成")
+    with _vad_model_lock:
+        if _vad_model is None:
+            print("🔄 正在初始化 Silero VAD 模型...")
+            model, utils = torch.hub.load(
+                repo_or_dir='snakers4/silero-vad',
+                model='silero_vad',
+                force_reload=False,  # Don't force reload to use cached version
+                onnx=False
+            )
+            with torch.no_grad():
+                model(torch.zeros(512), 16000)
+            model.reset_states()
+            _vad_model, _vad_utils = model, utils
+            print("✅ Silero VAD 模型初始化完成")
     return _vad_model, _vad_utils
 
 class SileroVadAudioRecorder(BaseVadAudioRecorder):
-    def __init__(self, sample_rate=16000, frame_size=512, threshold=0.5, on_speech_end=None):
-        super().__init__(sample_rate, frame_size, threshold, on_speech_end)
-        self.vad_model, utils = get_vad_model()
+    def __init__(self, sample_rate=16000, frame_size=512, threshold=0.5, on_speech_end=None, noise_floor=None,
+                 on_speech_start=None, vad_worker=None):
+        super().__init__(sample_rate, frame_size, threshold, on_speech_end, noise_floor, on_speech_start)
+        # With a VadWorkerProcess the model lives in the worker, not in this interpreter
+        self.vad_worker = vad_worker
+        self.vad_model = get_vad_model()[0] if vad_worker is None else None
+        self._pending_frames = deque()  # (sequence number, frame bytes, submit time) awaiting worker results
+        self._reset_pending = False  # Reset the worker's model state before the next submitted frame
 
-        self.audio = pyaudio.PyAudio()
+        self.audio = get_pyaudio()  # Shared instance, terminated on application shutdown
         self.is_recording = False
         self.is_speaking = False
         
@@ -67,8 +87,6 @@ class SileroVadAudioRecorder(BaseVadAudioRecorder):
         """Clean up temporary files and audio resources."""
         if self.speech_file and os.path.exists(self.speech_file):
             os.remove(self.speech_file)
-        if hasattr(self, 'audio'):
-            self.audio.terminate()
     
     def get_speech_file(self):
         super().get_speech_file()
@@ -83,15 +101,16 @@ class SileroVadAudioRecorder(BaseVadAudioRecorder):
         self.is_recording = True
         self.is_speaking = False
         self.speech_frames = []
-        self.recording_start_time = time.time()
+        self._pending_frames = deque()
+        self.recording_start_time = self._clock()
+        if self.vad_cascade is not None:
+            self.vad_cascade.reset()
+        # The shared model still holds the state of the previous recording
+        self._held_frames = 0
+        self._reset_scorer()
         
-        stream = self.audio.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=self.sample_rate,
-            input=True,
-            frames_per_buffer=self.frame_size
-        )
+        stream = self._open_stream()
+        self._start_metrics()
         
         print("🎙️ 請開始說話...")
         
@@ -99,34 +118,22 @@ class SileroVadAudioRecorder(BaseVadAudioRecorder):
             while self.is_recording:
                 # Read audio frame
                 frame_bytes = stream.read(self.frame_size, exception_on_overflow=False)
+                self._track_noise_floor(frame_bytes)
+                self._record_capture(stream)
+                gated = self._gate_frame(frame_bytes)
                 
-                # Convert to numpy array and normalize to [-1, 1]
-                frame_np = np.frombuffer(frame_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-                frame_tensor = torch.from_numpy(frame_np)
-                
-                # Use Silero VAD for speech detection
-                with torch.no_grad():
-                    speech_prob = self.vad_model(frame_tensor, self.sample_rate).item()
-                    is_speech = speech_prob > self.threshold
-                
-                # State management - exactly like vad_text.py
-                if is_speech and not self.is_speaking:
-                    self.is_speaking = True
-                    print(f"🗣️ 偵測到語音開始 (置信度: {speech_prob:.3f})...")
-                    self.speech_frames = []  # Start fresh recording
+                if self.vad_worker is not None:
+                    # Scoring is pipelined: results arrive a frame or two later
+                    scored = self._score_in_worker(gated)
+                else:
+                    scored = [(frame, self._score(frame)) for frame in gated]
                 
-                if self.is_speaking:
-                    self.speech_frames.append(frame_bytes)
-                    
-                if not is_speech and self.is_speaking:
-                    # Speech ended - save and notify
-                    self.is_speaking = False
-                    print(f"✅ 語音結束 (置信度: {speech_prob:.3f})")
-                    self._save_speech_and_callback()
-                    return  # Exit recording loop
+                for scored_bytes, speech_prob in scored:
+                    if self._process_frame(scored_bytes, speech_prob):
+                        return  # Exit recording loop
                 
                 # Auto-timeout if no speech detected for too long
-                if not self.is_speaking and (time.time() - self.recording_start_time) > self.no_speech_timeout:
+                if not self.is_speaking and (self._clock() - self.recording_start_time) > self.no_speech_timeout:
                     print("⏱️ 未檢測到語音，自動結束")
                     return
                 
@@ -135,6 +142,85 @@ class SileroVadAudioRecorder(BaseVadAudioRecorder):
             stream.close()
             self.is_recording = False
     
+    def _reset_scorer(self):
+        """Clear Silero's recurrent state, in this process or in the worker before its next frame."""
+        if self.vad_worker is not None:
+            self._reset_pending = True
+        else:
+            self.vad_model.reset_states()
+    
+    def _score(self, frame_bytes):
+        """Run Silero VAD on one frame in this process."""
+        # Convert to numpy array and normalize to [-1, 1]
+        frame_np = np.frombuffer(frame_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+        frame_tensor = torch.from_numpy(frame_np)
+        
+        # Use Silero VAD for speech detection
+        started = time.perf_counter()
+        with torch.no_grad():
+            speech_prob = self.vad_model(frame_tensor, self.sample_rate).item()
+        self._record_inference(started)
+        return speech_prob
+    
+    def _score_in_worker(self, frames):
+        """
+        Hand frames to the VAD worker process and collect finished results.
+        
+        The inference time reported to the metrics is the submit-to-result
+        latency, which includes time spent waiting in the worker's queue.
+        
+        Returns:
+            list: (frame bytes, speech probability) pairs in capture order
+        """
+        for frame_bytes in frames:
+            seq = self.vad_worker.submit(frame_bytes, reset=self._reset_pending)
+            if seq >= 0:
+                self._reset_pending = False
+                self._pending_frames.append((seq, frame_bytes, time.perf_counter()))
+            else:
+                # The dropped frame is a gap too
+                self._reset_pending = True
+        
+        scored = []
+        for seq, speech_prob in self.vad_worker.poll():
+            # Results for frames from an earlier recording are ignored
+            while self._pending_frames and self._pending_frames[0][0] < seq:
+                self._pending_frames.popleft()
+            if self._pending_frames and self._pending_frames[0][0] == seq:
+                _, frame_bytes, submitted = self._pending_frames.popleft()
+                self._record_inference(submitted)
+                scored.append((frame_bytes, speech_prob))
+        return scored
+    
+    def _process_frame(self, frame_bytes, speech_prob):
+        """
+        Update the speech state machine with one scored frame.
+        
+        Returns:
+            bool: True when the utterance has ended and recording should stop
+        """
+        is_speech = speech_prob > self.threshold
+        
+        # State management - exactly like vad_text.py
+        if is_speech and not self.is_speaking:
+            self.is_speaking = True
+            print(f"🗣️ 偵測到語音開始 (置信度: {speech_prob:.3f})...")
+            self._notify_speech_start()
+            self.speech_frames = []  # Start fresh recording
+        
+        if self.is_speaking:
+            self.speech_frames.append(frame_bytes)
+            self._emit_partial_speech()
+            
+            if self._utterance_ended(is_speech):
+                # Speech ended - save and notify
+                self.is_speaking = False
+                print(f"✅ 語音結束 (置信度: {speech_prob:.3f})")
+                self._finish_chunks()
+                self._save_speech_and_callback()
+                return True
+        return False
+    
     def stop_recording(self):
         super().stop_recording()
         """Stop recording session."""
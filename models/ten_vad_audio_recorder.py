@@ -6,6 +6,7 @@ import pyaudio
 import wave
 
 from .base_vad_audio_recorder import BaseVadAudioRecorder
+from .audio_device import get_pyaudio
 
 # 添加 ten-vad 本地模組路徑
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../sample/ten-vad/include")))
@@ -19,8 +20,8 @@ except ImportError:
 
 class TenVadAudioRecorder(BaseVadAudioRecorder):
     def __init__(self, sample_rate=16000, frame_size=512, threshold=0.5, on_speech_end=None, 
-                 min_silence_duration=0.5, min_speech_duration=0.25):
-        super().__init__(sample_rate, frame_size, threshold, on_speech_end)
+                 min_silence_duration=0.5, min_speech_duration=0.25, noise_floor=None, on_speech_start=None):
+        super().__init__(sample_rate, frame_size, threshold, on_speech_end, noise_floor, on_speech_start)
         
         if not TEN_VAD_AVAILABLE:
             raise ImportError("找不到 ten_vad.py，請確認 sample/ten-vad/include/ 目錄存在")
@@ -30,7 +31,7 @@ class TenVadAudioRecorder(BaseVadAudioRecorder):
         self.vad = TenVad(self.hop_size, threshold)
         
         # 音頻設定
-        self.audio = pyaudio.PyAudio()
+        self.audio = get_pyaudio()  # Shared instance, terminated on application shutdown
         self.is_recording = False
         self.is_speaking = False
         
@@ -115,8 +116,6 @@ class TenVadAudioRecorder(BaseVadAudioRecorder):
         """清理臨時檔案和音頻資源"""
         if self.speech_file and os.path.exists(self.speech_file):
             os.remove(self.speech_file)
-        if hasattr(self, 'audio'):
-            self.audio.terminate()
     
     def get_speech_file(self):
         """取得錄製的語音檔案路徑"""
@@ -128,62 +127,68 @@ class TenVadAudioRecorder(BaseVadAudioRecorder):
         self.is_speaking = False
         self.speech_frames = []
         self.audio_buffer_int16 = np.array([], dtype=np.int16)
-        self.recording_start_time = time.time()
+        self.recording_start_time = self._clock()
+        if self.vad_cascade is not None:
+            self.vad_cascade.reset()
         
-        stream = self.audio.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=self.sample_rate,
-            input=True,
-            frames_per_buffer=self.frame_size
-        )
+        stream = self._open_stream()
+        self._start_metrics()
         
         print(f"🎙️ 請開始說話... (TEN-VAD)")
         
         try:
-            current_time = time.time()
+            current_time = self._clock()
             
             while self.is_recording:
                 # 讀取音頻幀
                 frame_bytes = stream.read(self.frame_size, exception_on_overflow=False)
-                current_time = time.time()
+                current_time = self._clock()
+                self._track_noise_floor(frame_bytes)
+                self._record_capture(stream)
                 
-                # 使用 TEN-VAD 進行語音檢測
-                is_speech = self._is_speech_detected(frame_bytes)
-                
-                # 狀態管理
-                if is_speech:
-                    if not self.is_speaking:
-                        # 語音開始
-                        self.speech_start_time = current_time
-                        
-                        # 檢查是否滿足最小語音持續時間
-                        if (current_time - self.speech_start_time) >= 0:  # 立即開始
-                            self.is_speaking = True
-                            print(f"🗣️ TEN-VAD 偵測到語音開始...")
-                            self.speech_frames = []
+                for frame_bytes in self._gate_frame(frame_bytes):
+                    # 使用 TEN-VAD 進行語音檢測
+                    started = time.perf_counter()
+                    is_speech = self._is_speech_detected(frame_bytes)
+                    self._record_inference(started)
                     
-                    self.last_speech_time = current_time
-                    self.silence_start_time = 0  # 重置靜默計時
-                else:
-                    if self.is_speaking and self.silence_start_time == 0:
-                        # 開始靜默計時
-                        self.silence_start_time = current_time
-                
-                # 收集語音數據
-                if self.is_speaking:
-                    self.speech_frames.append(frame_bytes)
+                    # 狀態管理
+                    if is_speech:
+                        if not self.is_speaking:
+                            # 語音開始
+                            self.speech_start_time = current_time
+                            
+                            # 檢查是否滿足最小語音持續時間
+                            if (current_time - self.speech_start_time) >= 0:  # 立即開始
+                                self.is_speaking = True
+                                print(f"🗣️ TEN-VAD 偵測到語音開始...")
+                                self._notify_speech_start()
+                                self.speech_frames = []
+                        
+                        self.last_speech_time = current_time
+                        self.silence_start_time = 0  # 重置靜默計時
+                    else:
+                        if self.is_speaking and self.silence_start_time == 0:
+                            # 開始靜默計時
+                            self.silence_start_time = current_time
                     
-                    # 檢查是否應該結束語音（靜默時間足夠長）
-                    if (self.silence_start_time > 0 and 
-                        (current_time - self.silence_start_time) > self.min_silence_duration and
-                        (current_time - self.speech_start_time) > self.min_speech_duration):
+                    # 收集語音數據
+                    if self.is_speaking:
+                        self.speech_frames.append(frame_bytes)
+                        self._emit_partial_speech()
+                        self._track_pause(is_speech)
                         
-                        # 語音結束
-                        self.is_speaking = False
-                        print(f"✅ TEN-VAD 語音結束")
-                        self._save_speech_and_callback()
-                        return
+                        # 檢查是否應該結束語音（靜默時間足夠長）
+                        if (self.silence_start_time > 0 and 
+                            (current_time - self.silence_start_time) > self.min_silence_duration and
+                            (current_time - self.speech_start_time) > self.min_speech_duration):
+                            
+                            # 語音結束
+                            self.is_speaking = False
+                            print(f"✅ TEN-VAD 語音結束")
+                            self._finish_chunks()
+                            self._save_speech_and_callback()
+                            return
                 
                 # 自動超時檢查
                 if not self.is_speaking and (current_time - self.recording_start_time) > self.no_speech_timeout:
@@ -0,0 +1,116 @@
+from collections import deque
+
+import numpy as np
+
+
+class VadCascade:
+    """
+    Cheap pre-filter that decides which frames reach the neural VAD scorer.
+
+    Stage 1 splits each frame into 10 ms blocks and computes their RMS and
+    zero-crossing rate in one vectorized pass. A frame passes when a block is
+    louder than the noise floor plus gate_margin_db, or when it clears half that margin
+    with a high zero-crossing rate (quiet fricatives such as /s/).
+    Stage 2, if enabled, asks WebRTC VAD for a second opinion on frames that
+    passed stage 1.
+
+    A gate opens only after confirm_frames consecutive frames pass, so isolated
+    noise spikes do not wake the scorer. Frames are held in a short look-back
+    buffer until then; when the gate opens they are released ahead of the
+    current frame, so the scorer sees
+    (and the recorder keeps) the quiet start of the utterance. While the
+    recorder is inside an utterance every frame passes, so the end of speech is
+    still decided by the neural model.
+    """
+
+    def __init__(self, sample_rate=16000, frame_size=512, noise_floor=None, gate_margin_db=6.0,
+                 min_rms=30.0, zcr_threshold=0.25, lookback=0.3, confirm_frames=2,
+                 webrtc_aggressiveness=None):
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.noise_floor = noise_floor  # Shared NoiseFloorEstimator; the recorder updates it
+        self.block_size = sample_rate // 100
+        self.gate_margin = 10.0 ** (gate_margin_db / 20.0)
+        self._fricative_margin = 10.0 ** (gate_margin_db / 40.0)  # Half the margin, in dB
+        self.min_rms = min_rms
+        self.zcr_threshold = zcr_threshold
+        self.confirm_frames = confirm_frames
+        self._lookback = deque(maxlen=max(confirm_frames, round(lookback * sample_rate / frame_size)))
+        self._streak = 0  # Consecutive frames that passed the cheap stages
+        self.webrtc = None
+        if webrtc_aggressiveness is not None:
+            try:
+                import webrtcvad
+                self.webrtc = webrtcvad.Vad(webrtc_aggressiveness)
+            except ImportError:
+                print("⚠️ 找不到 webrtcvad，VAD 串接只使用能量閘門")
+        self.frames_seen = 0
+        self.frames_scored = 0
+
+    def _energy_gate(self, samples) -> bool:
+        """Stage 1: RMS / zero-crossing test over 10 ms blocks."""
+        blocks = len(samples) // self.block_size
+        if blocks == 0:
+            return True
+        usable = samples[:blocks * self.block_size].reshape(blocks, self.block_size)
+        values = usable.astype(np.float32)
+        rms = np.sqrt((values * values).mean(axis=1))
+
+        if self.noise_floor is None or not self.noise_floor.is_primed():
+            floor = self.min_rms
+        else:
+            floor = max(self.noise_floor.noise_floor, self.min_rms)
+        if (rms > floor * self.gate_margin).any():
+            return True
+
+        signs = np.signbit(usable)
+        zcr = (signs[:, 1:] != signs[:, :-1]).mean(axis=1)
+        return bool(((rms > floor * self._fricative_margin) & (zcr > self.zcr_threshold)).any())
+
+    def _webrtc_gate(self, frame_bytes) -> bool:
+        """Stage 2: WebRTC VAD on the 10 ms blocks of the frame."""
+        block_bytes = self.block_size * 2
+        for start in range(0, len(frame_bytes) - block_bytes + 1, block_bytes):
+            if self.webrtc.is_speech(frame_bytes[start:start + block_bytes], self.sample_rate):
+                return True
+        return False
+
+    def process(self, frame_bytes, in_speech=False) -> list:
+        """
+        Gate one captured frame.
+
+        Args:
+            frame_bytes: PCM16 frame
+            in_speech: Whether the recorder is inside an utterance
+
+        Returns:
+            list: Frames to hand to the scorer, oldest first; empty while idle
+        """
+        self.frames_seen += 1
+        if not in_speech:
+            samples = np.frombuffer(frame_bytes, dtype=np.int16)
+            passed = self._energy_gate(samples)
+            if passed and self.webrtc is not None:
+                passed = self._webrtc_gate(frame_bytes)
+            self._streak = self._streak + 1 if passed else 0
+            if self._streak < self.confirm_frames:
+                self._lookback.append(frame_bytes)
+                return []
+
+        frames = list(self._lookback)
+        frames.append(frame_bytes)
+        self._lookback.clear()
+        self.frames_scored += len(frames)
+        return frames
+
+    def reset(self):
+        """Forget buffered audio, e.g. at the start of a new recording."""
+        self._lookback.clear()
+        self._streak = 0
+
+    @property
+    def pass_rate(self) -> float:
+        """Fraction of captured frames that reached the scorer."""
+        if self.frames_seen == 0:
+            return 1.0
+        return self.frames_scored / self.frames_seen
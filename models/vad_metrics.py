@@ -0,0 +1,149 @@
+import time
+import threading
+
+import numpy as np
+
+
+class LatencyHistogram:
+    """Fixed log-spaced buckets (seconds) with approximate percentiles."""
+
+    def __init__(self, low=1e-5, high=1.0, buckets=50):
+        self.edges = np.geomspace(low, high, buckets)
+        self.counts = np.zeros(buckets + 1, dtype=np.int64)  # Last bucket: above high
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[np.searchsorted(self.edges, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def percentile(self, q) -> float:
+        """Upper edge of the bucket holding the q-th quantile (0-1)."""
+        count = self.count
+        if count == 0:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), q * count))
+        return min(float(self.edges[index]), self.max) if index < len(self.edges) else self.max
+
+
+class VadMetrics:
+    """
+    Real-time health counters for a capture + VAD loop.
+
+    Recorders report every captured frame (with the stream's queued frame
+    count) and the time spent scoring it. Because reads use
+    exception_on_overflow=False, PortAudio drops input silently when the loop
+    falls behind; the drop shows up as the wall clock running ahead of the
+    audio clock (samples read / sample rate). The lag above its best observed
+    value is counted as dropped audio, and each jump of at least one frame is
+    an overflow event.
+
+    One instance can be shared by successive recordings; each recording calls
+    start_stream() so gaps between recordings are not counted.
+    """
+
+    def __init__(self, sample_rate=16000, log_interval=0.0):
+        self.sample_rate = sample_rate
+        self.log_interval = log_interval  # Seconds between log lines; 0 disables them
+        self._lock = threading.Lock()
+        self.inference = LatencyHistogram()
+        self.frames = 0
+        self.audio_seconds = 0.0
+        self.queue_depth_max = 0
+        self._queue_depth_sum = 0
+        self._queue_depth_last = 0
+        self.overflow_events = 0
+        self.dropped_seconds = 0.0
+        self._stream_start = None
+        self._stream_audio = 0.0
+        self._lag_baseline = None
+        self._stream_dropped = 0.0
+        self._clock_gap = 0.0
+        self._last_log = time.perf_counter()
+
+    def start_stream(self):
+        """Reset the clock comparison for a newly opened stream."""
+        with self._lock:
+            self._stream_start = time.perf_counter()
+            self._stream_audio = 0.0
+            self._lag_baseline = None
+            self._stream_dropped = 0.0
+            self._clock_gap = 0.0
+
+    def record_frame(self, samples, queued_frames=None, track_clock=True):
+        """
+        Account one captured frame.
+
+        Args:
+            samples: Samples in the frame
+            queued_frames: Frames still waiting in the device buffer after the read
+            track_clock: False when replaying a file faster than real time
+        """
+        now = time.perf_counter()
+        duration = samples / self.sample_rate
+        with self._lock:
+            self.frames += 1
+            self.audio_seconds += duration
+            if queued_frames is not None:
+                self._queue_depth_last = queued_frames
+                self._queue_depth_sum += queued_frames
+                self.queue_depth_max = max(self.queue_depth_max, queued_frames)
+
+            if track_clock and self._stream_start is not None:
+                self._stream_audio += duration
+                # Audio still queued was captured already; count it as read
+                queued = (queued_frames or 0) / self.sample_rate
+                lag = (now - self._stream_start) - (self._stream_audio + queued)
+                if self._lag_baseline is None or lag < self._lag_baseline:
+                    self._lag_baseline = lag
+                self._clock_gap = lag - self._lag_baseline
+                if self._clock_gap - self._stream_dropped >= duration:
+                    self.overflow_events += 1
+                    self.dropped_seconds += self._clock_gap - self._stream_dropped
+                    self._stream_dropped = self._clock_gap
+
+        if self.log_interval > 0 and now - self._last_log >= self.log_interval:
+            self._last_log = now
+            self.log()
+
+    def record_inference(self, seconds):
+        """Account the time spent scoring one frame."""
+        with self._lock:
+            self.inference.add(seconds)
+
+    def snapshot(self) -> dict:
+        """Current counters, inference percentiles and clock health."""
+        with self._lock:
+            inference = self.inference
+            frames = self.frames
+            return {
+                "frames": frames,
+                "audio_seconds": self.audio_seconds,
+                "inference_count": inference.count,
+                "inference_p50": inference.percentile(0.5),
+                "inference_p95": inference.percentile(0.95),
+                "inference_p99": inference.percentile(0.99),
+                "inference_max": inference.max,
+                # Scoring time per second of audio; above 1.0 the backend cannot keep up
+                "real_time_factor": inference.total / self.audio_seconds if self.audio_seconds else 0.0,
+                "queue_depth": self._queue_depth_last,
+                "queue_depth_max": self.queue_depth_max,
+                "queue_depth_mean": self._queue_depth_sum / frames if frames else 0.0,
+                "overflow_events": self.overflow_events,
+                "dropped_seconds": self.dropped_seconds,
+                "clock_gap": self._clock_gap,
+            }
+
+    def log(self):
+        """Print a one-line summary."""
+        m = self.snapshot()
+        print(
+            f"📈 VAD: {m['frames']} 幀，推論 p50 {m['inference_p50'] * 1000:.2f} ms / p99 {m['inference_p99'] * 1000:.2f} ms，"
+            f"RTF {m['real_time_factor']:.3f}，佇列 {m['queue_depth']} (最大 {m['queue_depth_max']})，"
+            f"溢位 {m['overflow_events']} 次 / {m['dropped_seconds'] * 1000:.0f} ms"
+        )
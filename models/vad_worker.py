@@ -0,0 +1,129 @@
+import time
+import multiprocessing
+import numpy as np
+
+from .ring_buffer import SpscRingBuffer
+
+# Each PCM ring slot is one frame plus this trailing flag sample; RESET_FLAG
+# there tells the worker to clear Silero's state before scoring the frame
+_FLAG_SAMPLES = 1
+RESET_FLAG = 1
+
+
+def _worker_main(pcm_name, prob_name, capacity, frame_size, sample_rate, stop_event):
+    """
+    VAD worker process: score PCM frames from the shared ring with Silero.
+
+    Runs in its own interpreter so torch inference never competes with the
+    capture loop, ASR callbacks or console rendering for the GIL.
+    """
+    import torch
+    from .silero_vad_audio_recorder import get_vad_model
+
+    torch.set_num_threads(1)
+    vad_model, _ = get_vad_model()
+    pcm_ring = SpscRingBuffer.attach_shared(pcm_name, capacity, frame_size + _FLAG_SAMPLES, np.int16)
+    prob_ring = SpscRingBuffer.attach_shared(prob_name, capacity, 2, np.float64)
+    batch = np.empty((capacity, frame_size + _FLAG_SAMPLES), dtype=np.int16)
+    result = np.empty(2, dtype=np.float64)
+
+    try:
+        while not stop_event.is_set():
+            first_seq = pcm_ring.consumed
+            count = pcm_ring.pop_into(batch)
+            if count == 0:
+                time.sleep(0.002)
+                continue
+            # Silero is recurrent, so frames are scored in order, one at a time
+            frames = torch.from_numpy(batch[:count, :frame_size].astype(np.float32) / 32768.0)
+            flags = batch[:count, frame_size]
+            with torch.no_grad():
+                for i in range(count):
+                    if flags[i] == RESET_FLAG:
+                        vad_model.reset_states()
+                    result[0] = first_seq + i
+                    result[1] = vad_model(frames[i], sample_rate).item()
+                    while not prob_ring.push(result) and not stop_event.is_set():
+                        time.sleep(0.001)
+    finally:
+        pcm_ring.close()
+        prob_ring.close()
+
+
+class VadWorkerProcess:
+    """
+    Runs Silero VAD scoring in a dedicated worker process.
+
+    Capture writes PCM into a shared-memory ring buffer and the worker returns
+    (sequence number, speech probability) pairs through a second ring. Both
+    rings are single-producer / single-consumer, so neither side takes a lock.
+    """
+
+    def __init__(self, sample_rate=16000, frame_size=512, capacity=256):
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.capacity = capacity
+        self.pcm_ring = SpscRingBuffer.create_shared(capacity, frame_size + _FLAG_SAMPLES, np.int16)
+        self._slot = np.zeros(frame_size + _FLAG_SAMPLES, dtype=np.int16)  # Frame and flag, copied into the ring
+        self.prob_ring = SpscRingBuffer.create_shared(capacity, 2, np.float64)
+
+        context = multiprocessing.get_context("spawn")
+        self._stop_event = context.Event()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(self.pcm_ring.name, self.prob_ring.name, capacity, frame_size, sample_rate, self._stop_event),
+            daemon=True
+        )
+        self.process.start()
+        print("🔧 Silero VAD 推論已移至獨立行程")
+
+    def submit(self, frame_bytes, reset=False) -> int:
+        """
+        Queue one frame for scoring without waiting for the result.
+
+        Args:
+            frame_bytes: PCM16 frame
+            reset: Clear the model's recurrent state before scoring this frame,
+                because the audio before it was not submitted
+
+        Returns:
+            int: Sequence number of the frame, or -1 if the ring was full
+        """
+        seq = self.pcm_ring.written
+        # The flag travels in the frame's own slot, so every reset reaches the worker however far behind it is
+        self._slot[:self.frame_size] = np.frombuffer(frame_bytes, dtype=np.int16)
+        self._slot[self.frame_size] = RESET_FLAG if reset else 0
+        if not self.pcm_ring.push(self._slot):
+            return -1
+        return seq
+
+    def poll(self):
+        """
+        Collect all probabilities the worker has produced so far.
+
+        Returns:
+            list: (sequence number, speech probability) pairs in submit order
+        """
+        results = []
+        while True:
+            item = self.prob_ring.pop()
+            if item is None:
+                return results
+            results.append((int(item[0]), float(item[1])))
+
+    @property
+    def dropped_frames(self) -> int:
+        """Frames dropped because the worker fell a full ring behind."""
+        return self.pcm_ring.dropped
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def shutdown(self):
+        """Stop the worker and release the shared memory."""
+        self._stop_event.set()
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.pcm_ring.close(unlink=True)
+        self.prob_ring.close(unlink=True)
@@ -0,0 +1,57 @@
+import wave
+import numpy as np
+
+
+class WavFileSource:
+    """
+    Stream-like WAV reader that stands in for a PyAudio input stream.
+
+    Reads return immediately, so recorders replay a file faster than real time.
+    The position property is the audio clock in seconds. After the file ends
+    the source keeps returning silence; on_exhausted fires once tail seconds
+    of that silence have been read so the caller can stop the recorder.
+    """
+
+    def __init__(self, path, sample_rate=16000, tail=2.0, on_exhausted=None):
+        with wave.open(path, 'rb') as wav_file:
+            if wav_file.getnchannels() != 1 or wav_file.getsampwidth() != 2:
+                raise ValueError(f"{path}: 需要單聲道 16-bit PCM")
+            if wav_file.getframerate() != sample_rate:
+                raise ValueError(f"{path}: 取樣率 {wav_file.getframerate()} 與設定 {sample_rate} 不符")
+            self.samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+        self.path = path
+        self.sample_rate = sample_rate
+        self.tail_samples = int(tail * sample_rate)
+        self.on_exhausted = on_exhausted
+        self.offset = 0
+        self._exhausted = False
+
+    @property
+    def position(self) -> float:
+        """Seconds of audio read so far."""
+        return self.offset / self.sample_rate
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    def read(self, num_frames, exception_on_overflow=False) -> bytes:
+        chunk = self.samples[self.offset:self.offset + num_frames]
+        if len(chunk) < num_frames:
+            chunk = np.concatenate((chunk, np.zeros(num_frames - len(chunk), dtype=np.int16)))
+        self.offset += num_frames
+        if not self._exhausted and self.offset >= len(self.samples) + self.tail_samples:
+            self._exhausted = True
+            if self.on_exhausted:
+                self.on_exhausted()
+        return chunk.tobytes()
+
+    def rewind(self):
+        self.offset = 0
+        self._exhausted = False
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
@@ -7,22 +7,24 @@ import wave
 import webrtcvad
 
 from .base_vad_audio_recorder import BaseVadAudioRecorder
+from .audio_device import get_pyaudio
 
 class WebrtcVadAudioRecorder(BaseVadAudioRecorder):
-    def __init__(self, sample_rate=16000, frame_size=320, threshold=0.5, on_speech_end=None, aggressiveness=3):
+    def __init__(self, sample_rate=16000, frame_size=320, threshold=0.5, on_speech_end=None, aggressiveness=3,
+                 noise_floor=None, on_speech_start=None):
         # WebRTC VAD requires specific frame sizes: 160, 320, or 480 samples for 16kHz
         # Adjust frame_size if needed
         valid_frame_sizes = [160, 320, 480]
         if frame_size not in valid_frame_sizes:
             frame_size = 320  # Default to 320 samples (20ms at 16kHz)
             
-        super().__init__(sample_rate, frame_size, threshold, on_speech_end)
+        super().__init__(sample_rate, frame_size, threshold, on_speech_end, noise_floor, on_speech_start)
         
         # WebRTC VAD initialization
         self.vad = webrtcvad.Vad(aggressiveness)  # 0-3, higher = more aggressive
         self.aggressiveness = aggressiveness
         
-        self.audio = pyaudio.PyAudio()
+        self.audio = get_pyaudio()  # Shared instance, terminated on application shutdown
         self.is_recording = False
         self.is_speaking = False
         
@@ -84,8 +86,6 @@ class WebrtcVadAudioRecorder(BaseVadAudioRecorder):
         """Clean up temporary files and audio resources."""
         if self.speech_file and os.path.exists(self.speech_file):
             os.remove(self.speech_file)
-        if hasattr(self, 'audio'):
-            self.audio.terminate()
     
     def get_speech_file(self):
         """Get path to recorded speech file."""
@@ -97,15 +97,12 @@ class WebrtcVadAudioRecorder(BaseVadAudioRecorder):
         self.is_speaking = False
         self.speech_frames = []
         self.speech_history = []
-        self.recording_start_time = time.time()
+        self.recording_start_time = self._clock()
+        if self.vad_cascade is not None:
+            self.vad_cascade.reset()
         
-        stream = self.audio.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=self.sample_rate,
-            input=True,
-            frames_per_buffer=self.frame_size
-        )
+        stream = self._open_stream()
+        self._start_metrics()
         
         print(f"🎙️ 請開始說話... (WebRTC VAD, 敏感度: {self.aggressiveness})")
         
@@ -113,28 +110,36 @@ class WebrtcVadAudioRecorder(BaseVadAudioRecorder):
             while self.is_recording:
                 # Read audio frame
                 frame_bytes = stream.read(self.frame_size, exception_on_overflow=False)
+                self._track_noise_floor(frame_bytes)
+                self._record_capture(stream)
                 
-                # Use WebRTC VAD for speech detection
-                is_speech = self._is_speech_detected(frame_bytes)
-                
-                # State management - same logic as Silero implementation
-                if is_speech and not self.is_speaking:
-                    self.is_speaking = True
-                    print(f"🗣️ WebRTC VAD 偵測到語音開始...")
-                    self.speech_frames = []  # Start fresh recording
-                
-                if self.is_speaking:
-                    self.speech_frames.append(frame_bytes)
+                for frame_bytes in self._gate_frame(frame_bytes):
+                    # Use WebRTC VAD for speech detection
+                    started = time.perf_counter()
+                    is_speech = self._is_speech_detected(frame_bytes)
+                    self._record_inference(started)
+                    
+                    # State management - same logic as Silero implementation
+                    if is_speech and not self.is_speaking:
+                        self.is_speaking = True
+                        print(f"🗣️ WebRTC VAD 偵測到語音開始...")
+                        self._notify_speech_start()
+                        self.speech_frames = []  # Start fresh recording
                     
-                if not is_speech and self.is_speaking:
-                    # Speech ended - save and notify
-                    self.is_speaking = False
-                    print(f"✅ WebRTC VAD 語音結束")
-                    self._save_speech_and_callback()
-                    return  # Exit recording loop
+                    if self.is_speaking:
+                        self.speech_frames.append(frame_bytes)
+                        self._emit_partial_speech()
+                        
+                        if self._utterance_ended(is_speech):
+                            # Speech ended - save and notify
+                            self.is_speaking = False
+                            print(f"✅ WebRTC VAD 語音結束")
+                            self._finish_chunks()
+                            self._save_speech_and_callback()
+                            return  # Exit recording loop
                 
                 # Auto-timeout if no speech detected for too long
-                if not self.is_speaking and (time.time() - self.recording_start_time) > self.no_speech_timeout:
+                if not self.is_speaking and (self._clock() - self.recording_start_time) > self.no_speech_timeout:
                     print("⏱️ 未檢測到語音，自動結束")
                     return
                 
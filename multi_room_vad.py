@@ -0,0 +1,51 @@
+import sys
+import time
+import wave
+
+from models.audio_device import release_pyaudio
+from services.multi_stream_vad_service import MultiStreamVadService, MicrophoneSource
+
+
+def main():
+    """
+    Run batched VAD over several microphones and save each utterance to a WAV file.
+
+    Usage: python multi_room_vad.py <device_index> [<device_index> ...]
+    """
+    if len(sys.argv) < 2:
+        print("用法: python multi_room_vad.py <裝置編號> [<裝置編號> ...]")
+        return
+
+    sources = {
+        f"room{index}": MicrophoneSource(device_index=int(index))
+        for index in sys.argv[1:]
+    }
+
+    def on_segment(stream_id, pcm):
+        filename = f"temp_speech_{stream_id}_{int(time.time() * 1000)}.wav"
+        with wave.open(filename, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(16000)
+            wav_file.writeframes(pcm)
+        print(f"💾 {stream_id} 語音已保存: {filename}")
+
+    service = MultiStreamVadService(sources, on_segment)
+    service.start()
+    try:
+        while True:
+            time.sleep(10)
+            stats = service.get_stats()
+            print(
+                f"📊 平均批次大小 {stats['average_batch_size']:.2f}，每幀推論 {stats['inference_ms_per_frame']:.3f} ms，"
+                f"處理落後丟棄 {stats['dropped_frames']} 幀"
+            )
+    except KeyboardInterrupt:
+        print("\n停止錄音...")
+    finally:
+        service.stop()
+        release_pyaudio()
+
+
+if __name__ == "__main__":
+    main()
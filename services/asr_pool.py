@@ -0,0 +1,116 @@
+import time
+import queue
+import threading
+from typing import Callable, List, Optional
+
+_STOP = object()
+
+
+class AsrJob:
+    """One piece of audio waiting for, or finished with, recognition."""
+
+    def __init__(self, pcm: bytes):
+        self.pcm = pcm
+        self.text = ""
+        self.error = None
+        self.submitted_at = time.perf_counter()
+        self.finished_at = None
+        self._done = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+
+class AsrWorkerPool:
+    """
+    Fixed set of recognition threads fed from one job queue.
+
+    recognize is called with the PCM16 bytes of a job and returns its text;
+    an exception is stored on the job instead of reaching the caller. The
+    online recognizer spends its time waiting on the network, so threads are
+    enough to run several requests at once.
+    """
+
+    def __init__(self, recognize: Callable[[bytes], str], workers: int = 3):
+        self.recognize = recognize
+        self._jobs = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._work, daemon=True, name=f"asr-{i}") for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is _STOP:
+                return
+            try:
+                job.text = self.recognize(job.pcm) or ""
+            except Exception as e:
+                job.error = e
+            job.finished_at = time.perf_counter()
+            job._done.set()
+
+    def submit(self, pcm: bytes) -> AsrJob:
+        """Queue a piece of audio for recognition; returns immediately."""
+        job = AsrJob(pcm)
+        self._jobs.put(job)
+        return job
+
+    def shutdown(self):
+        """Stop the workers once the queued jobs are done."""
+        for _ in self._threads:
+            self._jobs.put(_STOP)
+        self._threads = []
+
+
+class ChunkedTranscript:
+    """
+    The pieces of one utterance, recognized in parallel and joined in order.
+
+    add_chunk() has the signature of a recorder's speech chunk listener, so
+    each piece is submitted while the user is still speaking; result() waits
+    for the outstanding pieces once speech has ended.
+    """
+
+    def __init__(self, pool: AsrWorkerPool, separator: str = ""):
+        self.pool = pool
+        self.separator = separator  # "" for Chinese, " " for languages written with spaces
+        self.jobs: List[AsrJob] = []
+        self.ended_at = None  # When the final piece arrived, i.e. the end of speech
+
+    def add_chunk(self, pcm: bytes, final: bool):
+        if pcm:
+            self.jobs.append(self.pool.submit(pcm))
+        if final:
+            self.ended_at = time.perf_counter()
+
+    def result(self, timeout: Optional[float] = None) -> str:
+        """
+        Wait for every piece and join their texts in capture order.
+
+        Pieces that failed or did not finish within timeout are left out.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        texts = []
+        for job in self.jobs:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if job.wait(remaining) and job.error is None and job.text:
+                texts.append(job.text.strip())
+        return self.separator.join(texts)
+
+    @property
+    def errors(self) -> list:
+        return [job.error for job in self.jobs if job.error is not None]
+
+    def latency(self) -> float:
+        """Seconds from the end of speech to the last recognized piece."""
+        finished = [job.finished_at for job in self.jobs if job.finished_at is not None]
+        if self.ended_at is None or not finished:
+            return 0.0
+        return max(0.0, max(finished) - self.ended_at)
@@ -0,0 +1,220 @@
+import json
+import time
+import queue
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Iterable, List, Optional
+
+from models.config import AppConfig
+from models.message import MessageRole
+from services.load_generator import percentile
+from services.model_router import ModelRouter
+from services.ollama_service import OllamaService
+from services.request_scheduler import RequestScheduler, RequestPriority
+from services.speech_service import SpeechService
+from tool_box import ToolService
+from viewmodels.chat_viewmodel import ChatViewModel
+
+
+@dataclass
+class BatchTurn:
+    """One query of a batch file."""
+    id: str
+    query: str
+
+
+@dataclass
+class BatchSession:
+    """Queries answered in one conversation, in order; a single-turn session is an independent query."""
+    session: str
+    turns: List[BatchTurn] = field(default_factory=list)
+
+
+@dataclass
+class BatchResult:
+    """Answer and timings of one query."""
+    id: str
+    session: str
+    turn: int
+    query: str
+    answer: str = ""
+    tools: List[str] = field(default_factory=list)  # Tool results added to the session during the turn
+    ttft: float = 0.0  # Seconds from the request to the first answer character
+    latency: float = 0.0  # Seconds from the request to the end of the answer
+    error: str = ""
+
+    def to_json(self) -> str:
+        data = {
+            "id": self.id,
+            "session": self.session,
+            "turn": self.turn,
+            "query": self.query,
+            "answer": self.answer,
+            "tools": self.tools,
+            "ttft": round(self.ttft, 4),
+            "latency": round(self.latency, 4),
+        }
+        if self.error:
+            data["error"] = self.error
+        return json.dumps(data, ensure_ascii=False)
+
+
+@dataclass
+class BatchReport:
+    """Aggregated results of a batch run."""
+    concurrency: int
+    duration: float
+    results: List[BatchResult] = field(default_factory=list)
+
+    @property
+    def errors(self) -> int:
+        return sum(1 for r in self.results if r.error)
+
+    @property
+    def queries_per_second(self) -> float:
+        return len(self.results) / max(self.duration, 1e-9)
+
+    def latency_percentiles(self) -> Dict[str, float]:
+        latencies = [r.latency for r in self.results if not r.error]
+        return {name: percentile(latencies, q) for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))}
+
+
+def load_batch(lines: Iterable[str]) -> List[BatchSession]:
+    """
+    Parse batch JSONL into sessions.
+
+    Each line is an object with a "query" string or a "turns" list of
+    strings. Lines sharing a "session" value form one scripted multi-turn
+    conversation in file order; lines without one are independent queries.
+    "id" is optional and defaults to the line number. A line that is not
+    JSON is taken as a plain query.
+    """
+    sessions: Dict[str, BatchSession] = {}
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            item = line
+        if not isinstance(item, dict):
+            item = {"query": str(item)}
+        key = str(item.get("session") or f"q{number}")
+        session = sessions.setdefault(key, BatchSession(key))
+        queries = item.get("turns") or [item.get("query", "")]
+        base_id = str(item.get("id", number))
+        for index, query in enumerate(queries):
+            if not isinstance(query, str) or not query.strip():
+                raise ValueError(f"第 {number} 行沒有問題內容")
+            turn_id = base_id if len(queries) == 1 else f"{base_id}.{index}"
+            session.turns.append(BatchTurn(turn_id, query.strip()))
+    return list(sessions.values())
+
+
+class BatchRunner:
+    """
+    Answers batch sessions through ChatViewModel with a fixed number of workers.
+
+    Every session gets its own ViewModel (so the local intent path and model
+    routing work as in the app) with an in-memory history, but all of them
+    share one OllamaService, RequestScheduler, ToolService and an audio-free
+    SpeechService. OllamaService sends no tool definitions, so the model does
+    not call tools itself; a result's tools list only shows tool answers from
+    the local intent path. Workers take whole sessions, so the turns of a
+    scripted conversation stay in order while different sessions run
+    concurrently. The scheduler caps generations on the backend at
+    max_in_flight, so raising concurrency beyond the backend's parallelism
+    only queues requests.
+    """
+
+    def __init__(self, config: AppConfig, concurrency: int = 4, max_in_flight: Optional[int] = None,
+                 on_result: Optional[Callable[[BatchResult], None]] = None):
+        # Batch runs must not resume, write or capture the interactive history
+        self.config = replace(config, session=replace(config.session, db_path="", capture_path=""))
+        self.concurrency = max(1, concurrency)
+        self.on_result = on_result
+        self.ollama_service = OllamaService(self.config.ollama)
+        self.scheduler = RequestScheduler(
+            self.ollama_service, max_in_flight=max_in_flight or self.config.ollama.max_in_flight
+        )
+        self.router = None
+        if self.config.router.enabled:
+            # One router for all sessions, so its metrics cover the whole batch
+            self.router = ModelRouter(self.scheduler, self.config.router, self.config.ollama.model)
+        self.speech_service = SpeechService(self.config.speech, input_mode="text")
+        self.tool_service = ToolService()
+        self._lock = threading.Lock()
+
+    def _viewmodel(self, session_id: str) -> ChatViewModel:
+        return ChatViewModel(
+            self.config,
+            ollama_service=self.ollama_service,
+            scheduler=self.scheduler,
+            router=self.router,
+            speech_service=self.speech_service,
+            tool_service=self.tool_service,
+            scheduler_session=session_id,
+            priority=RequestPriority.BATCH
+        )
+
+    def _run_turn(self, viewmodel: ChatViewModel, session: BatchSession, index: int, turn: BatchTurn) -> BatchResult:
+        result = BatchResult(turn.id, session.session, index, turn.query)
+        messages = viewmodel.chat_session.messages
+        viewmodel.add_user_message(turn.query)
+        start = len(messages)
+        started = time.perf_counter()
+        answer = []
+        try:
+            for char in viewmodel.generate_response():
+                if not answer:
+                    result.ttft = time.perf_counter() - started
+                answer.append(char)
+        except Exception as e:
+            result.error = str(e) or type(e).__name__
+        if viewmodel.turn_error and not result.error:
+            # Cut off (stall, deadline, lost connection) or never answered: not a success
+            result.error = viewmodel.turn_error
+        result.latency = time.perf_counter() - started
+        result.answer = "".join(answer)
+        result.tools = [m.content for m in messages[start:] if m.role == MessageRole.TOOL]
+        if not result.answer and not result.error:
+            result.error = "no answer"
+        return result
+
+    def _work(self, sessions: "queue.Queue[BatchSession]", results: List[BatchResult]):
+        while True:
+            try:
+                session = sessions.get_nowait()
+            except queue.Empty:
+                return
+            viewmodel = self._viewmodel(session.session)
+            for index, turn in enumerate(session.turns):
+                result = self._run_turn(viewmodel, session, index, turn)
+                with self._lock:
+                    results.append(result)
+                    if self.on_result:
+                        self.on_result(result)
+
+    def run(self, sessions: List[BatchSession]) -> BatchReport:
+        """Answer every session; results are passed to on_result as they finish."""
+        pending = queue.Queue()
+        for session in sessions:
+            pending.put(session)
+        results: List[BatchResult] = []
+        started = time.perf_counter()
+        workers = [
+            threading.Thread(target=self._work, args=(pending, results), daemon=True, name=f"batch-{i}")
+            for i in range(min(self.concurrency, len(sessions)))
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return BatchReport(self.concurrency, time.perf_counter() - started, results)
+
+    def get_router_metrics(self) -> dict:
+        return self.router.get_metrics() if self.router is not None else {}
+
+    def get_scheduler_metrics(self) -> dict:
+        return self.scheduler.get_metrics()
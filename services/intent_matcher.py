@@ -0,0 +1,107 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+# Characters removed before matching; recognizers add them inconsistently
+_FILLER = re.compile(r"[\s,，。!！?？~～、]+|(?<!\d)\.|\.(?!\d)")
+_OPERATORS = {"加": "+", "加上": "+", "減": "-", "減掉": "-", "乘": "*", "乘以": "*", "乘上": "*",
+              "除以": "/", "x": "*", "×": "*", "÷": "/", "plus": "+", "minus": "-", "times": "*",
+              "dividedby": "/"}
+_CITIES = {"台北": "Taipei", "臺北": "Taipei", "新北": "New Taipei", "桃園": "Taoyuan", "新竹": "Hsinchu",
+           "台中": "Taichung", "臺中": "Taichung", "台南": "Tainan", "臺南": "Tainan", "高雄": "Kaohsiung"}
+
+_NUMBER = r"\d+(?:\.\d+)?"
+_OPERATOR = "|".join(sorted((re.escape(op) for op in _OPERATORS), key=len, reverse=True)) + r"|[-+*/]"
+_EXPRESSION = rf"(?P<expression>{_NUMBER}(?:(?:{_OPERATOR}){_NUMBER})+)"
+_CITY = "|".join(_CITIES)
+
+# Whole-transcript patterns; anything that does not match completely goes to the LLM
+_PATTERNS = [
+    ("get_today_date", "今天是 {result}。", [
+        r"(?:請問)?今天(?:是)?(?:幾月)?幾號(?:呢)?",
+        r"(?:請問)?今天(?:的)?日期(?:是)?(?:什麼|多少)?(?:呢)?",
+        r"what(?:is|'s)?(?:the|today's)?date(?:today)?",
+    ]),
+    ("get_current_time", "現在時間是 {result}。", [
+        r"(?:請問)?現在(?:是)?幾點(?:了|鐘)?(?:呢)?",
+        r"(?:請問)?現在(?:的)?時間(?:是)?(?:多少|幾點)?(?:呢)?",
+        r"what(?:is|'s)?(?:the)?time(?:isit)?(?:now)?",
+    ]),
+    ("simple_calculator", "{expression} = {result}", [
+        rf"(?:請問|幫我算(?:一下)?|計算)?{_EXPRESSION}(?:等於|是)?(?:多少|幾)?(?:呢)?",
+        rf"(?:what(?:is|'s)|calculate){_EXPRESSION}",
+    ]),
+    ("get_weather", "{result}", [
+        rf"(?P<city>{_CITY})?(?:今天|現在)?(?:的)?天氣(?:如何|怎麼樣|怎樣)?(?:呢)?",
+    ]),
+]
+
+# Tool results that mean the tool failed; those turns fall back to the LLM
+_ERROR_PREFIXES = ("未知工具", "工具錯誤", "計算錯誤", "無法取得天氣", "取得天氣時發生錯誤")
+
+
+@dataclass
+class IntentMatch:
+    """A transcript mapped to one tool call and the template that phrases its answer."""
+    tool: str
+    args: Dict[str, Any] = field(default_factory=dict)
+    template: str = "{result}"
+    expression: str = ""
+
+    def render(self, result: str) -> str:
+        return self.template.format(result=result.strip(), expression=self.expression)
+
+
+class IntentMatcher:
+    """
+    Compiled-pattern intent matcher for questions a tool can answer directly.
+
+    Only transcripts that match a pattern completely (after removing spaces
+    and punctuation) count, so anything with extra conditions, such as "what
+    time is it in Tokyo", still goes to the LLM.
+    """
+
+    def __init__(self, default_city: str = "Taipei"):
+        self.default_city = default_city
+        self._patterns = [
+            (tool, template, [re.compile(pattern, re.IGNORECASE) for pattern in patterns])
+            for tool, template, patterns in _PATTERNS
+        ]
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return _FILLER.sub("", text).lower()
+
+    def match(self, text: str) -> Optional[IntentMatch]:
+        """
+        Map a transcript to a tool call.
+
+        Returns:
+            IntentMatch: The tool to run, or None if the transcript is not a clear match
+        """
+        normalized = self._normalize(text)
+        if not normalized:
+            return None
+        for tool, template, patterns in self._patterns:
+            for pattern in patterns:
+                found = pattern.fullmatch(normalized)
+                if found:
+                    return self._build(tool, template, found.groupdict())
+        return None
+
+    def _build(self, tool, template, groups) -> IntentMatch:
+        if tool == "simple_calculator":
+            expression = groups["expression"]
+            for word in sorted(_OPERATORS, key=len, reverse=True):
+                expression = expression.replace(word, _OPERATORS[word])
+            # The calculator evaluates its input; only digits and arithmetic operators reach it
+            return IntentMatch(tool, {"expression": expression}, template, expression)
+        if tool == "get_weather":
+            city = _CITIES.get(groups.get("city") or "", self.default_city)
+            return IntentMatch(tool, {"city": city}, template)
+        return IntentMatch(tool, {}, template)
+
+    @staticmethod
+    def is_error(result: str) -> bool:
+        """Check whether a tool result reports a failure."""
+        return result.startswith(_ERROR_PREFIXES)
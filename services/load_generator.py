@@ -0,0 +1,190 @@
+import math
+import time
+import random
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from models.chat_session import ChatSession
+from models.config import OllamaConfig
+from services.ollama_service import OllamaService, TRUNCATED_DONE_REASONS
+from services.session_capture import CapturedTurn
+from services.request_scheduler import RequestScheduler, RequestPriority
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 1]."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+@dataclass
+class RequestResult:
+    """Outcome of one replayed turn."""
+    user: int
+    started_at: float
+    ttft: float = 0.0
+    latency: float = 0.0
+    tokens: int = 0
+    error: str = ""
+
+
+@dataclass
+class LoadReport:
+    """Aggregated results of a load run."""
+    users: int
+    duration: float
+    results: List[RequestResult] = field(default_factory=list)
+
+    @property
+    def completed(self) -> List[RequestResult]:
+        return [r for r in self.results if not r.error]
+
+    @property
+    def errors(self) -> int:
+        return len(self.results) - len(self.completed)
+
+    @property
+    def requests_per_second(self) -> float:
+        return len(self.completed) / max(self.duration, 1e-9)
+
+    @property
+    def tokens_per_second(self) -> float:
+        return sum(r.tokens for r in self.completed) / max(self.duration, 1e-9)
+
+    def ttft_percentiles(self) -> Dict[str, float]:
+        ttfts = [r.ttft for r in self.completed]
+        return {name: percentile(ttfts, q) for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))}
+
+    def latency_percentiles(self) -> Dict[str, float]:
+        latencies = [r.latency for r in self.completed]
+        return {name: percentile(latencies, q) for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))}
+
+
+class LoadGenerator:
+    """
+    Replays captured sessions as concurrent synthetic users against OllamaService.
+
+    Every user runs in its own thread with its own in-memory ChatSession, so
+    prompts grow turn by turn exactly as in the app. Between turns a user
+    waits either the captured think time (scaled by think_scale) or, if
+    think_time is given, an exponentially distributed pause with that mean.
+    With a scheduler, requests go through it with one session per user.
+    """
+
+    def __init__(self, ollama_config: OllamaConfig, sessions: List[List[CapturedTurn]], users: int = 4,
+                 think_time: Optional[float] = None, think_scale: float = 1.0, duration: Optional[float] = None,
+                 turns_per_user: Optional[int] = None, ramp_up: float = 1.0, seed: int = 0,
+                 scheduler: Optional[RequestScheduler] = None,
+                 priority: RequestPriority = RequestPriority.BATCH):
+        if not sessions:
+            raise ValueError("沒有可重播的對話")
+        self.ollama_config = ollama_config
+        self.sessions = sessions
+        self.users = users
+        self.think_time = think_time
+        self.think_scale = think_scale
+        self.duration = duration
+        self.turns_per_user = turns_per_user
+        self.ramp_up = ramp_up
+        self.seed = seed
+        self.scheduler = scheduler
+        self.priority = priority
+        self._results: List[RequestResult] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _pause(self, rng: random.Random, turn: CapturedTurn):
+        if self.think_time is not None:
+            delay = rng.expovariate(1.0 / self.think_time) if self.think_time > 0 else 0.0
+        else:
+            delay = turn.think_time * self.think_scale
+        self._stop.wait(delay)
+
+    def _run_turn(self, service: OllamaService, chat_session: ChatSession, user: int,
+                  turn: CapturedTurn) -> RequestResult:
+        chat_session.add_user_message(turn.user)
+        result = RequestResult(user=user, started_at=time.perf_counter())
+        content = []
+        try:
+            messages = chat_session.get_encoded_messages()
+            if self.scheduler is not None:
+                stream = self.scheduler.chat_stream(messages, session_id=f"user{user}", priority=self.priority)
+            else:
+                stream = service.chat_stream(messages)
+            try:
+                for response_data in stream:
+                    text = response_data.get("message", {}).get("content", "")
+                    if text:
+                        if not content:
+                            result.ttft = time.perf_counter() - result.started_at
+                        content.append(text)
+                        result.tokens += 1
+                    if response_data.get("done"):
+                        result.tokens = response_data.get("eval_count", result.tokens)
+                        if response_data.get("done_reason") in TRUNCATED_DONE_REASONS:
+                            # A cut-off answer is not a completed request
+                            result.error = response_data["done_reason"]
+                        break
+            finally:
+                stream.close()
+        except Exception as e:
+            result.error = str(e) or type(e).__name__
+        result.latency = time.perf_counter() - result.started_at
+
+        if content:
+            chat_session.add_assistant_message("".join(content))
+        for tool_call in turn.tool_calls:
+            # Keep the prompt shape of the captured conversation
+            chat_session.add_tool_message(f"{tool_call.get('name')} 回傳: (replayed)")
+        return result
+
+    def _run_user(self, user: int):
+        rng = random.Random(self.seed * 1000 + user)
+        service = OllamaService(self.ollama_config)
+        self._stop.wait(self.ramp_up * user / max(self.users, 1))
+        done = 0
+        session_index = user
+        while not self._stop.is_set():
+            chat_session = ChatSession()
+            for turn in self.sessions[session_index % len(self.sessions)]:
+                if turn.turn > 0:
+                    self._pause(rng, turn)
+                if self._stop.is_set():
+                    return
+                result = self._run_turn(service, chat_session, user, turn)
+                with self._lock:
+                    self._results.append(result)
+                done += 1
+                if self.turns_per_user and done >= self.turns_per_user:
+                    return
+            session_index += self.users
+
+    def run(self) -> LoadReport:
+        """Run the load test until the duration or per-user turn budget is used up."""
+        if self.duration is None and self.turns_per_user is None:
+            raise ValueError("需要指定 duration 或 turns_per_user")
+        self._results = []
+        self._stop.clear()
+        threads = [threading.Thread(target=self._run_user, args=(i,), daemon=True) for i in range(self.users)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            if self.duration is not None:
+                deadline = start + self.duration
+                while any(t.is_alive() for t in threads) and time.perf_counter() < deadline:
+                    time.sleep(0.1)
+                # In-flight turns finish; no new ones start
+                self._stop.set()
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+        with self._lock:
+            results = list(self._results)
+        return LoadReport(users=self.users, duration=time.perf_counter() - start, results=results)
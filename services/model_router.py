@@ -0,0 +1,228 @@
+import re
+import time
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Generator, Optional
+
+from models.config import RouterConfig
+from models.message import Message, MessageRole
+from models.vad_metrics import LatencyHistogram
+
+# Cheap transcript features; a hit sends the turn to the large model
+_WORDS = re.compile(r"[\u3400-\u9fff]|[A-Za-z0-9']+")
+_COMPLEX = re.compile(
+    r"為什麼|為何|怎麼做|如何|解釋|說明|比較|分析|差別|差異|優缺點|步驟|程式|翻譯|總結|摘要|建議|規劃|推薦|"
+    r"\b(?:why|how|explain|compare|analy[sz]e|difference|summari[sz]e|translate|write|code|plan|recommend)\b",
+    re.IGNORECASE
+)
+_TOOL = re.compile(
+    r"天氣|氣溫|下雨|溫度|幾點|時間|日期|幾號|星期幾|計算|等於|\d\s*(?:[-+*/×÷]|加|減|乘|除)|"
+    r"\b(?:weather|temperature|time|date|calculate)\b",
+    re.IGNORECASE
+)
+
+_ESCALATION_PROMPT = (
+    "If you are not confident that you can answer correctly, or the question needs careful "
+    "reasoning, reply with exactly {marker} and nothing else."
+)
+
+
+@dataclass
+class RouteDecision:
+    """The model chosen for one turn and why."""
+    model: str
+    tier: str  # "small" or "large"
+    reason: str  # Feature that decided the route, e.g. "short", "long_query", "tools"
+    keep_alive: str = ""
+    escalate_to: str = ""  # Large model to hand over to when the small one is unsure; empty: no escalation
+
+
+class _ModelStats:
+    __slots__ = ("requests", "ttft", "latency")
+
+    def __init__(self):
+        self.requests = 0
+        self.ttft = LatencyHistogram(low=0.01, high=120.0)
+        self.latency = LatencyHistogram(low=0.01, high=300.0)
+
+
+class ModelRouter:
+    """
+    Routes each turn to a small fast model or the large one.
+
+    route() looks only at cheap features: the length of the query, words
+    that ask for reasoning or long answers, words that suggest a tool, and
+    the length of the conversation. Anything not clearly simple goes to the
+    large model.
+
+    chat_stream() has the same shape as RequestScheduler.chat_stream() plus
+    the decision, so it can stand in for the scheduler (including in
+    SpeculativeGeneration). With escalation on, the small model is told to
+    answer with an escalation marker when it is unsure; the start of its
+    answer is held back until it is clear whether it is the marker, and if so
+    the turn is re-sent to the large model. The user sees nothing of the
+    small model's attempt.
+    """
+
+    def __init__(self, backend, config: RouterConfig, default_model: str):
+        self.backend = backend  # RequestScheduler or OllamaService
+        self.config = config
+        self.small_model = config.small_model
+        self.large_model = config.large_model or default_model
+        self._marker = config.escalation_marker
+        self._escalation_message = Message(
+            role=MessageRole.SYSTEM, content=_ESCALATION_PROMPT.format(marker=config.escalation_marker)
+        )
+        self._lock = threading.Lock()
+        self._models: Dict[str, _ModelStats] = {}
+        self._reasons: Dict[str, int] = {}
+        self.escalations = 0
+
+    def route(self, query: str, history_length: int = 0) -> RouteDecision:
+        """
+        Pick the model for a turn.
+
+        Args:
+            query: The user's transcript
+            history_length: Messages in the conversation, including this query
+        """
+        config = self.config
+        if len(_WORDS.findall(query)) > config.max_small_words:
+            return self._large("long_query")
+        if _COMPLEX.search(query):
+            return self._large("complex")
+        if config.tools_to_large and _TOOL.search(query):
+            return self._large("tools")
+        if history_length > config.max_small_history:
+            return self._large("long_history")
+        return RouteDecision(
+            self.small_model, "small", "short", config.small_keep_alive,
+            self.large_model if config.escalate and self.large_model != self.small_model else ""
+        )
+
+    def _large(self, reason: str) -> RouteDecision:
+        return RouteDecision(self.large_model, "large", reason, self.config.large_keep_alive)
+
+    def warm_up(self, tier: str) -> str:
+        """Load the "small" or "large" model with its own keep_alive (for StartupOrchestrator)."""
+        service = getattr(self.backend, "ollama_service", self.backend)
+        if tier == "small":
+            return service.warm_up(model=self.small_model, keep_alive=self.config.small_keep_alive)
+        return service.warm_up(model=self.large_model, keep_alive=self.config.large_keep_alive)
+
+    def _with_escalation_prompt(self, messages):
+        """Append the escalation instruction to the payload, pre-encoded or not."""
+        if isinstance(messages, (bytes, bytearray)):
+            separator = b"," if len(messages) > 2 else b""
+            return bytes(messages[:-1]) + separator + self._escalation_message.encode() + b"]"
+        return list(messages) + [self._escalation_message.to_dict()]
+
+    def chat_stream(self, messages, decision: Optional[RouteDecision] = None,
+                    **options) -> Generator[Dict[str, Any], None, None]:
+        """
+        Stream a chat response from the routed model.
+
+        Args:
+            messages: Message dicts or a pre-encoded JSON array, without the escalation prompt
+            decision: Result of route(); None uses the large model
+            options: Passed on to the backend's chat_stream (session_id, priority, generation)
+        """
+        if decision is None:
+            decision = self._large("default")
+        return self._stream(messages, decision, options)
+
+    def _stream(self, messages, decision: RouteDecision, options) -> Generator[Dict[str, Any], None, None]:
+        started = time.perf_counter()
+        with self._lock:
+            self._reasons[decision.reason] = self._reasons.get(decision.reason, 0) + 1
+        if decision.escalate_to:
+            payload = self._with_escalation_prompt(messages)
+        else:
+            payload = messages
+        escalated = yield from self._attempt(payload, decision.model, decision.keep_alive, started,
+                                             options, hold=bool(decision.escalate_to))
+        if escalated:
+            with self._lock:
+                self.escalations += 1
+            print(f"↗️ {decision.model} 信心不足，改用 {decision.escalate_to}")
+            yield from self._attempt(messages, decision.escalate_to, self.config.large_keep_alive, started,
+                                     options, hold=False)
+
+    def _attempt(self, messages, model, keep_alive, started, options, hold):
+        """
+        Stream one model's answer, recording its first-token time and latency.
+
+        With hold set, chunks are buffered until the answer either starts with
+        the escalation marker (returns True without yielding anything) or can
+        no longer be the marker (the buffer is released and streaming goes on).
+        Times are measured from the start of the turn, so an escalated turn's
+        large-model latency includes the small model's attempt.
+        """
+        stream = self.backend.chat_stream(messages, model=model, keep_alive=keep_alive, **options)
+        held = []
+        text = ""
+        first_token_at = None
+        try:
+            for data in stream:
+                content = data.get("message", {}).get("content", "")
+                if content and first_token_at is None:
+                    first_token_at = time.perf_counter()
+                if hold:
+                    held.append(data)
+                    text += content
+                    probe = text.lstrip()
+                    if probe.startswith(self._marker):
+                        return True
+                    if self._marker.startswith(probe) and not data.get("done"):
+                        continue
+                    hold = False
+                    yield from held
+                    held = []
+                    if data.get("done"):
+                        break
+                    continue
+                yield data
+                if data.get("done"):
+                    break
+        finally:
+            stream.close()
+            self._record(model, started, first_token_at)
+        return False
+
+    def _record(self, model, started, first_token_at):
+        finished = time.perf_counter()
+        with self._lock:
+            stats = self._models.setdefault(model, _ModelStats())
+            stats.requests += 1
+            if first_token_at is not None:
+                stats.ttft.add(first_token_at - started)
+                stats.latency.add(finished - started)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Routing decisions by reason, escalations, and first-token / total latency percentiles per model."""
+        with self._lock:
+            models = {}
+            for model, stats in self._models.items():
+                models[model] = {
+                    "requests": stats.requests,
+                    "answered": stats.ttft.count,
+                    "ttft_p50": stats.ttft.percentile(0.5),
+                    "ttft_p95": stats.ttft.percentile(0.95),
+                    "latency_p50": stats.latency.percentile(0.5),
+                    "latency_p95": stats.latency.percentile(0.95),
+                }
+            return {"reasons": dict(self._reasons), "escalations": self.escalations, "models": models}
+
+    def log(self):
+        """Print a per-model summary."""
+        metrics = self.get_metrics()
+        routed = sum(metrics["reasons"].values())
+        if not routed:
+            return
+        reasons = "，".join(f"{reason} {count}" for reason, count in metrics["reasons"].items())
+        print(f"🧭 模型路由: {routed} 回合 ({reasons})，升級 {metrics['escalations']} 次")
+        for model, m in metrics["models"].items():
+            print(
+                f"   {model}: {m['requests']} 次請求，首字 p50 {m['ttft_p50']:.2f} 秒 / p95 {m['ttft_p95']:.2f} 秒，"
+                f"完成 p50 {m['latency_p50']:.2f} 秒"
+            )
@@ -0,0 +1,181 @@
+import time
+import threading
+from collections import deque
+from typing import Callable, Dict
+
+import numpy as np
+
+from models.audio_device import get_pyaudio
+from models.ring_buffer import SpscRingBuffer
+from models.batched_silero_scorer import BatchedSileroScorer
+
+
+class MicrophoneSource:
+    """Blocking PyAudio capture from one input device."""
+
+    def __init__(self, device_index=None, sample_rate=16000, frame_size=512, audio=None):
+        import pyaudio
+        self._pyaudio = pyaudio
+        self.device_index = device_index
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.audio = audio or get_pyaudio()  # Shared instance, released with release_pyaudio()
+        self.stream = None
+
+    def open(self):
+        self.stream = self.audio.open(
+            format=self._pyaudio.paInt16,
+            channels=1,
+            rate=self.sample_rate,
+            input=True,
+            input_device_index=self.device_index,
+            frames_per_buffer=self.frame_size
+        )
+
+    def read(self) -> bytes:
+        return self.stream.read(self.frame_size, exception_on_overflow=False)
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+
+
+class _StreamSegmenter:
+    """Per-stream speech state machine turning scored frames into utterances."""
+
+    def __init__(self, threshold, min_silence_frames, min_speech_frames, preroll_frames):
+        self.threshold = threshold
+        self.min_silence_frames = min_silence_frames
+        self.min_speech_frames = min_speech_frames
+        self.preroll = deque(maxlen=preroll_frames)
+        self.frames = []
+        self.is_speaking = False
+        self.silent_frames = 0
+
+    def update(self, frame_bytes, speech_prob):
+        """Return the utterance PCM when one ends, otherwise None."""
+        is_speech = speech_prob > self.threshold
+        if not self.is_speaking:
+            if is_speech:
+                self.is_speaking = True
+                self.frames = list(self.preroll)
+                self.silent_frames = 0
+            else:
+                self.preroll.append(frame_bytes)
+                return None
+
+        self.frames.append(frame_bytes)
+        self.silent_frames = 0 if is_speech else self.silent_frames + 1
+        if self.silent_frames < self.min_silence_frames:
+            return None
+
+        self.is_speaking = False
+        self.preroll.clear()
+        voiced = len(self.frames) - self.silent_frames
+        segment = b''.join(self.frames) if voiced >= self.min_speech_frames else None
+        self.frames = []
+        return segment
+
+
+class MultiStreamVadService:
+    """
+    Voice activity detection for several rooms at once.
+
+    Each source is captured on its own thread into a lock-free ring buffer. A
+    single scoring thread takes the next frame from every stream that has one,
+    scores them all in one batched Silero forward pass with per-stream
+    recurrent state, and emits per-stream utterance segments.
+
+    on_segment runs on the scoring thread, so it should hand work off (e.g. to
+    an ASR thread) rather than block every room.
+    """
+
+    def __init__(self, sources: Dict[str, object], on_segment: Callable[[str, bytes], None],
+                 sample_rate=16000, frame_size=512, threshold=0.5, min_silence_duration=0.3,
+                 min_speech_duration=0.25, scorer=None, ring_capacity=64):
+        self.sources = sources
+        self.on_segment = on_segment
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.scorer = scorer or BatchedSileroScorer(sample_rate, frame_size)
+
+        frame_seconds = frame_size / sample_rate
+        self.rings = {
+            stream_id: SpscRingBuffer(ring_capacity, frame_size, np.int16)
+            for stream_id in sources
+        }
+        self.segmenters = {
+            stream_id: _StreamSegmenter(
+                threshold,
+                min_silence_frames=max(1, int(min_silence_duration / frame_seconds)),
+                min_speech_frames=max(1, int(min_speech_duration / frame_seconds)),
+                preroll_frames=3
+            )
+            for stream_id in sources
+        }
+        self.is_running = False
+        self._threads = []
+        self.stats = {"forward_calls": 0, "frames_scored": 0, "inference_seconds": 0.0}
+
+    def start(self):
+        """Open every source and start capture and scoring threads."""
+        self.is_running = True
+        for stream_id, source in self.sources.items():
+            source.open()
+            thread = threading.Thread(target=self._capture_loop, args=(stream_id, source), daemon=True)
+            self._threads.append(thread)
+        self._threads.append(threading.Thread(target=self._scoring_loop, daemon=True))
+        for thread in self._threads:
+            thread.start()
+        print(f"🎙️ 多路 VAD 已啟動 ({len(self.sources)} 個音訊來源)")
+
+    def stop(self):
+        """Stop all threads and close the sources."""
+        self.is_running = False
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+        for source in self.sources.values():
+            source.close()
+
+    def _capture_loop(self, stream_id, source):
+        ring = self.rings[stream_id]
+        while self.is_running:
+            frame = np.frombuffer(source.read(), dtype=np.int16)
+            # A full ring drops the frame and counts it in ring.dropped (see get_stats)
+            ring.push(frame)
+
+    def _scoring_loop(self):
+        while self.is_running:
+            frames = {}
+            for stream_id, ring in self.rings.items():
+                frame = ring.pop()
+                if frame is not None:
+                    frames[stream_id] = frame
+            if not frames:
+                time.sleep(0.005)
+                continue
+
+            start = time.perf_counter()
+            probabilities = self.scorer.score(frames)
+            self.stats["inference_seconds"] += time.perf_counter() - start
+            self.stats["forward_calls"] += 1
+            self.stats["frames_scored"] += len(frames)
+
+            for stream_id, speech_prob in probabilities.items():
+                segment = self.segmenters[stream_id].update(frames[stream_id].tobytes(), speech_prob)
+                if segment:
+                    self.on_segment(stream_id, segment)
+
+    def get_stats(self) -> dict:
+        """Batching statistics: average batch size, inference cost per frame and frames dropped because scoring fell behind."""
+        stats = dict(self.stats)
+        stats["dropped_by_stream"] = {stream_id: ring.dropped for stream_id, ring in self.rings.items()}
+        stats["dropped_frames"] = sum(stats["dropped_by_stream"].values())
+        calls = max(stats["forward_calls"], 1)
+        frames = max(stats["frames_scored"], 1)
+        stats["average_batch_size"] = stats["frames_scored"] / calls
+        stats["inference_ms_per_frame"] = stats["inference_seconds"] * 1000 / frames
+        return stats
@@ -1,31 +1,300 @@
 import requests
 import json
-from typing import Generator, List, Dict, Any
+import time
+import socket
+import queue
+import threading
+from collections import deque
+from typing import Generator, List, Dict, Any, Optional, Union
 from models.config import OllamaConfig
 from models.message import Message
 
+# done_reason of a final chunk that cut the answer short (see chat_stream)
+TRUNCATED_DONE_REASONS = ("stall", "deadline", "error")
+
+
+class ChatStreamError(Exception):
+    """No answer started in time, or the backend kept failing, even after retries."""
+
+
+class StreamCancel:
+    """
+    Cancels a chat stream from another thread.
+    
+    A generator cannot be closed while another thread is inside it, so the
+    stream and the scheduler register what to tear down here instead; cancel()
+    runs that at once, whether the request is still queued, waiting for its
+    first token or streaming.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.cancelled = False
+    
+    def add_callback(self, callback):
+        """Run callback on cancel(), or right away if already cancelled."""
+        with self._lock:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                return
+        callback()
+    
+    def cancel(self):
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+class _Attempt:
+    """
+    One streaming request, read on its own thread into a shared event queue.
+    
+    The consumer never blocks on the socket, so it can enforce deadlines,
+    start a hedge and abandon a stalled attempt at any time.
+    """
+    
+    def __init__(self, url, body, headers, timeout, events, label):
+        self.label = label
+        self.started_at = time.perf_counter()
+        self.closed = False
+        self.response = None
+        self._events = events
+        self._thread = threading.Thread(target=self._read, args=(url, body, headers, timeout), daemon=True)
+        self._thread.start()
+    
+    def _read(self, url, body, headers, timeout):
+        try:
+            self.response = requests.post(url, data=body, headers=headers, stream=True, timeout=timeout)
+            if self.closed:
+                return
+            self.response.raise_for_status()
+            for line in self.response.iter_lines():
+                if self.closed:
+                    return
+                if line:
+                    try:
+                        self._events.put(("chunk", self, json.loads(line.decode("utf-8"))))
+                    except json.JSONDecodeError:
+                        continue
+            self._events.put(("end", self, None))
+        except Exception as e:
+            if not self.closed:
+                self._events.put(("error", self, e))
+        finally:
+            if self.response is not None:
+                self.response.close()
+    
+    def close(self):
+        """
+        Abandon the attempt; the dropped connection makes Ollama stop generating.
+        
+        The socket is shut down rather than the response closed: the reader
+        thread may be blocked in a read that holds the response's buffer, and
+        the shutdown wakes it up immediately. The reader then closes the response.
+        """
+        self.closed = True
+        response = self.response
+        if response is None:
+            return
+        sock = getattr(getattr(response.raw, "connection", None), "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
 
 class OllamaService:
     def __init__(self, config: OllamaConfig):
         self.config = config
+        # Recent first-token latencies per model, for the hedge threshold
+        self._ttft_history: Dict[str, deque] = {}
     
-    def chat_stream(self, messages: List[Dict[str, Any]]) -> Generator[Dict[str, Any], None, None]:
-        payload = {
-            "model": self.config.model,
-            "messages": messages
-        }
+    def warm_up(self, timeout: float = 300.0, model: Optional[str] = None, keep_alive: Optional[str] = None) -> str:
+        """
+        Load a model into Ollama ahead of the first question.
+        
+        A chat request without messages makes Ollama load the model and return
+        immediately, so the first real request does not pay the load time.
+        
+        Args:
+            model: Model to load; defaults to OllamaConfig.model
+            keep_alive: How long Ollama keeps the model loaded after a request
+                (e.g. "30m", "-1" for ever); empty uses the server default
         
-        response = requests.post(
-            self.config.api_url, 
-            json=payload, 
-            stream=True
+        Returns:
+            str: Name of the loaded model
+        """
+        model = model or self.config.model
+        body = {"model": model, "messages": [], "stream": False}
+        if keep_alive:
+            body["keep_alive"] = keep_alive
+        response = requests.post(self.config.api_url, json=body, timeout=timeout)
+        response.raise_for_status()
+        return model
+    
+    def _request(self, messages, url: str, model: str, events: queue.Queue, label: str,
+                 keep_alive: Optional[str] = None) -> _Attempt:
+        extra = b',"keep_alive":' + json.dumps(keep_alive).encode("utf-8") if keep_alive else b''
+        if isinstance(messages, (bytes, bytearray)):
+            # Pre-encoded history from ChatSession.get_encoded_messages() is spliced in as is
+            body = b'{"model":' + json.dumps(model).encode("utf-8") + extra + b',"messages":' + messages + b'}'
+        else:
+            payload = {"model": model, "messages": messages}
+            if keep_alive:
+                payload["keep_alive"] = keep_alive
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        # The socket read timeout only bounds how long an abandoned reader thread lingers;
+        # the deadlines themselves are enforced by chat_stream
+        read_timeout = max(self.config.first_token_timeout, self.config.inter_token_timeout)
+        return _Attempt(
+            url, body, {"Content-Type": "application/json"},
+            (self.config.connect_timeout, read_timeout), events, label
         )
+    
+    def _hedge_delay(self, model: str) -> Optional[float]:
+        """Seconds without a first token after which a hedged request is sent, or None if hedging is off."""
+        if not (self.config.hedge_url or self.config.hedge_model):
+            return None
+        history = sorted(self._ttft_history.get(model, ()))
+        if len(history) < 20:
+            return self.config.hedge_min_delay
+        index = min(len(history) - 1, int(len(history) * self.config.hedge_percentile))
+        return max(self.config.hedge_min_delay, history[index])
+    
+    def chat_stream(self, messages: Union[List[Dict[str, Any]], bytes], model: Optional[str] = None,
+                    keep_alive: Optional[str] = None,
+                    cancel: Optional[StreamCancel] = None) -> Generator[Dict[str, Any], None, None]:
+        """
+        Stream chat chunks from Ollama within bounded time.
+        
+        Deadlines (see OllamaConfig): the first token must arrive within
+        first_token_timeout of a request and later tokens within
+        inter_token_timeout of each other, and the whole turn ends after
+        turn_deadline. A request that stalls before its first token is retried
+        up to stall_retries times. A stall after the answer has started ends the
+        stream with a final chunk whose done_reason is "stall" (or "deadline"),
+        and a connection that fails mid-answer with done_reason "error", so
+        the partial answer is kept.
+        
+        With hedge_url or hedge_model set, a second request is sent when the
+        first token is later than the hedge_percentile of recent first-token
+        latencies; whichever request produces a token first is kept and the
+        other is closed.
+        
+        Args:
+            messages: Message dicts, or an already-encoded JSON array as returned by
+                ChatSession.get_encoded_messages(), which is spliced into the body as is
+            model: Model for this request (e.g. chosen by ModelRouter); defaults to OllamaConfig.model
+            keep_alive: Ollama keep_alive sent with the request, so each model keeps its own
+                residency; empty uses the server default
+            cancel: Optional StreamCancel; cancelling it closes the connections and
+                ends the stream without a final chunk
+        
+        Raises:
+            ChatStreamError: If no answer started in time
+        """
+        config = self.config
+        events = queue.Queue()
+        turn_start = time.perf_counter()
+        deadline = turn_start + config.turn_deadline
+        model = model or config.model
+        hedge_delay = self._hedge_delay(model)
+        attempts = [self._request(messages, config.api_url, model, events, "primary", keep_alive)]
+        retries = 0
+        winner = None
+        last_chunk_at = None
+        
+        def close_all(keep=None):
+            for attempt in attempts:
+                if attempt is not keep:
+                    attempt.close()
+        
+        def on_cancel():
+            close_all()
+            events.put(("cancel", None, None))
+        
+        def restart(reason):
+            nonlocal retries, hedge_delay
+            close_all()
+            if retries >= config.stall_retries or time.perf_counter() >= deadline:
+                raise ChatStreamError(reason)
+            retries += 1
+            hedge_delay = None  # A retry already is the second chance
+            attempts.append(self._request(messages, config.api_url, model, events, "retry", keep_alive))
         
-        for line in response.iter_lines():
-            if line:
-                data = line.decode("utf-8")
+        if cancel is not None:
+            cancel.add_callback(on_cancel)
+        try:
+            while True:
+                if cancel is not None and cancel.cancelled:
+                    return
+                now = time.perf_counter()
+                if winner is None:
+                    current = attempts[-1]
+                    wait_until = min(deadline, current.started_at + config.first_token_timeout)
+                    hedging = hedge_delay is not None and len(attempts) == 1
+                    if hedging:
+                        wait_until = min(wait_until, turn_start + hedge_delay)
+                else:
+                    wait_until = min(deadline, last_chunk_at + config.inter_token_timeout)
+                
                 try:
-                    json_data = json.loads(data)
-                    yield json_data
-                except json.JSONDecodeError:
-                    continue
\ No newline at end of file
+                    kind, attempt, data = events.get(timeout=max(0.0, wait_until - now))
+                except queue.Empty:
+                    now = time.perf_counter()
+                    if winner is not None:
+                        # Stalled or out of time mid-answer: keep what was said
+                        reason = "deadline" if now >= deadline else "stall"
+                        yield {"message": {"role": "assistant", "content": ""}, "done": True, "done_reason": reason}
+                        return
+                    if now >= deadline:
+                        raise ChatStreamError("turn deadline")
+                    if hedging and now >= turn_start + hedge_delay:
+                        attempts.append(self._request(
+                            messages, config.hedge_url or config.api_url, config.hedge_model or model,
+                            events, "hedge", keep_alive
+                        ))
+                        hedge_delay = None
+                        continue
+                    restart("first token timeout")
+                    continue
+                
+                if kind == "cancel" or attempt.closed:
+                    continue
+                if kind == "error":
+                    if winner is attempt:
+                        # Connection lost mid-answer: keep what was said
+                        yield {"message": {"role": "assistant", "content": ""}, "done": True, "done_reason": "error"}
+                        return
+                    if winner is None and not any(not a.closed and a is not attempt for a in attempts):
+                        attempt.close()
+                        restart(str(data))
+                    else:
+                        attempt.close()
+                    continue
+                if kind == "end":
+                    if winner is attempt:
+                        return
+                    attempt.close()
+                    if winner is None and all(a.closed for a in attempts):
+                        restart("stream ended without an answer")
+                    continue
+                
+                if winner is None:
+                    winner = attempt
+                    close_all(keep=winner)
+                    # Measured on the first request; a lower bound when a hedge or retry won
+                    history = self._ttft_history.setdefault(model, deque(maxlen=200))
+                    history.append(time.perf_counter() - attempts[0].started_at)
+                last_chunk_at = time.perf_counter()
+                yield data
+                if data.get("done"):
+                    return
+        finally:
+            close_all()
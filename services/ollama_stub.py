@@ -0,0 +1,105 @@
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Chunked NDJSON, so clients see every line as it is written, like Ollama
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self.send_error(400, "invalid JSON")
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        model = payload.get("model", "stub")
+        if not payload.get("messages"):
+            # Model load request (see OllamaService.warm_up)
+            self._write({"model": model, "message": {"role": "assistant", "content": ""}, "done": True})
+            self._end()
+            return
+
+        with server.active_lock:
+            server.active += 1
+            # Every concurrent request slows token generation, like a shared GPU
+            slowdown = 1.0 + server.contention * (server.active - 1)
+        try:
+            time.sleep(server.ttft * slowdown * random.uniform(0.8, 1.2))
+            tokens = server.tokens_per_response
+            for i in range(tokens):
+                self._write({
+                    "model": model,
+                    "message": {"role": "assistant", "content": "測試" if i % 2 else "stub "},
+                    "done": False
+                })
+                time.sleep(server.token_interval * slowdown)
+            self._write({
+                "model": model,
+                "message": {"role": "assistant", "content": ""},
+                "done": True,
+                "eval_count": tokens
+            })
+            self._end()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client cancelled the stream
+        finally:
+            with server.active_lock:
+                server.active -= 1
+
+    def _write(self, data):
+        line = json.dumps(data, ensure_ascii=False).encode("utf-8") + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+    def _end(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class OllamaStubServer:
+    """
+    Local stand-in for Ollama's /api/chat used by load tests.
+
+    Streams a fixed number of tokens after a simulated prompt-processing
+    delay. Concurrent requests slow each other down by `contention` per extra
+    request, so saturation shows up in the latency tails as it would on one GPU.
+    """
+
+    def __init__(self, host="127.0.0.1", port=11435, ttft=0.2, token_interval=0.02, tokens_per_response=60,
+                 contention=0.15):
+        self.httpd = ThreadingHTTPServer((host, port), _StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.ttft = ttft
+        self.httpd.token_interval = token_interval
+        self.httpd.tokens_per_response = tokens_per_response
+        self.httpd.contention = contention
+        self.httpd.active = 0
+        self.httpd.active_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api/chat"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,223 @@
+import time
+import threading
+from collections import OrderedDict, deque
+from enum import IntEnum
+from typing import Any, Deque, Dict, Generator, Optional
+
+from services.ollama_service import OllamaService, StreamCancel
+
+
+class RequestPriority(IntEnum):
+    """Scheduling class of a generation request; lower values are served first."""
+    INTERACTIVE = 0  # A user is waiting for the answer (voice or console turn)
+    NORMAL = 1
+    BATCH = 2  # Offline jobs such as batch queries and load tests
+
+
+class RequestDropped(Exception):
+    """Raised by a scheduled stream that was never sent to the backend."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason  # "stale", "queue_full" or "cancelled"
+
+
+class _Request:
+    __slots__ = ("session_id", "priority", "generation", "enqueued_at", "admitted", "dropped")
+
+    def __init__(self, session_id, priority, generation):
+        self.session_id = session_id
+        self.priority = priority
+        self.generation = generation
+        self.enqueued_at = 0.0
+        self.admitted = False
+        self.dropped = None
+
+
+class RequestScheduler:
+    """
+    Admission control and fair queueing in front of one Ollama backend.
+
+    At most max_in_flight generations run on the backend at once. Waiting
+    requests are served strictly by priority and, within a priority, round
+    robin across sessions, so one session's burst cannot starve the others.
+    Every session has a generation counter; bumping it (e.g. when the user
+    speaks again) drops that session's queued requests from older generations
+    before they reach the backend.
+
+    chat_stream() has the same shape as OllamaService.chat_stream(), so the
+    scheduler can stand in for the service.
+    """
+
+    def __init__(self, ollama_service: OllamaService, max_in_flight: int = 2, max_queued_per_session: int = 8):
+        self.ollama_service = ollama_service
+        self.max_in_flight = max_in_flight
+        self.max_queued_per_session = max_queued_per_session
+        self._cond = threading.Condition()
+        self._queues: Dict[RequestPriority, "OrderedDict[str, Deque[_Request]]"] = {
+            priority: OrderedDict() for priority in RequestPriority
+        }
+        self._generations: Dict[str, int] = {}
+        self._in_flight = 0
+        self._queued = 0
+        self._stats = {"admitted": 0, "dropped_stale": 0, "rejected_full": 0, "max_queue_depth": 0}
+        self._waits: Deque[float] = deque(maxlen=1000)
+
+    def current_generation(self, session_id: str) -> int:
+        with self._cond:
+            return self._generations.get(session_id, 0)
+
+    def bump_generation(self, session_id: str) -> int:
+        """
+        Start a new generation for a session and drop its queued older requests.
+
+        Returns:
+            int: The new generation token
+        """
+        with self._cond:
+            generation = self._generations.get(session_id, 0) + 1
+            self._generations[session_id] = generation
+            for sessions in self._queues.values():
+                queue = sessions.get(session_id)
+                if not queue:
+                    continue
+                for request in queue:
+                    if request.generation < generation:
+                        request.dropped = "stale"
+                        self._stats["dropped_stale"] += 1
+                kept = deque(r for r in queue if r.dropped is None)
+                self._queued -= len(queue) - len(kept)
+                if kept:
+                    sessions[session_id] = kept
+                else:
+                    del sessions[session_id]
+            self._cond.notify_all()
+            return generation
+
+    def _dispatch(self):
+        """Admit waiting requests while backend slots are free; caller holds the lock."""
+        while self._in_flight < self.max_in_flight and self._queued:
+            for priority in RequestPriority:
+                sessions = self._queues[priority]
+                if sessions:
+                    break
+            session_id, queue = next(iter(sessions.items()))
+            request = queue.popleft()
+            self._queued -= 1
+            if queue:
+                # Round robin: this session goes to the back of its priority level
+                sessions.move_to_end(session_id)
+            else:
+                del sessions[session_id]
+
+            if request.generation < self._generations.get(session_id, 0):
+                request.dropped = "stale"
+                self._stats["dropped_stale"] += 1
+                continue
+            request.admitted = True
+            self._in_flight += 1
+            self._stats["admitted"] += 1
+            self._waits.append(time.perf_counter() - request.enqueued_at)
+        self._cond.notify_all()
+
+    def _drop(self, request: _Request, reason: str):
+        """Drop a request that is still waiting for a slot (e.g. a cancelled one)."""
+        with self._cond:
+            if request.admitted or request.dropped is not None:
+                return
+            request.dropped = reason
+            sessions = self._queues[request.priority]
+            queue = sessions.get(request.session_id)
+            if queue and request in queue:
+                queue.remove(request)
+                self._queued -= 1
+                if not queue:
+                    del sessions[request.session_id]
+            self._cond.notify_all()
+
+    def _acquire(self, request: _Request):
+        with self._cond:
+            if request.dropped:
+                raise RequestDropped(request.dropped)
+            if request.generation < self._generations.get(request.session_id, 0):
+                self._stats["dropped_stale"] += 1
+                raise RequestDropped("stale")
+            queue = self._queues[request.priority].setdefault(request.session_id, deque())
+            if len(queue) >= self.max_queued_per_session:
+                self._stats["rejected_full"] += 1
+                raise RequestDropped("queue_full")
+            request.enqueued_at = time.perf_counter()
+            queue.append(request)
+            self._queued += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._queued)
+            self._dispatch()
+            while not request.admitted and request.dropped is None:
+                self._cond.wait()
+            if request.dropped:
+                raise RequestDropped(request.dropped)
+
+    def _release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._dispatch()
+
+    def chat_stream(self, messages, session_id: str = "default",
+                    priority: RequestPriority = RequestPriority.INTERACTIVE,
+                    generation: Optional[int] = None, model: Optional[str] = None,
+                    keep_alive: Optional[str] = None,
+                    cancel: Optional[StreamCancel] = None) -> Generator[Dict[str, Any], None, None]:
+        """
+        Stream a chat response once the scheduler admits the request.
+
+        Args:
+            messages: Message dicts or a pre-encoded JSON array, as for OllamaService
+            session_id: Fairness and staleness key, e.g. one per user
+            priority: Scheduling class
+            generation: Generation token the request belongs to; defaults to the
+                session's current generation at the time of this call
+            model: Model override passed to OllamaService.chat_stream (see ModelRouter)
+            keep_alive: Ollama keep_alive passed to OllamaService.chat_stream
+            cancel: Optional StreamCancel; cancelling it drops the request while it
+                is queued and closes the backend stream once it runs
+
+        Raises:
+            RequestDropped: From the stream, if the request went stale, the
+                session's queue was full or it was cancelled while queued
+        """
+        if generation is None:
+            generation = self.current_generation(session_id)
+        request = _Request(session_id, RequestPriority(priority), generation)
+        return self._stream(messages, request, model, keep_alive, cancel)
+
+    def _stream(self, messages, request: _Request, model=None, keep_alive=None,
+                cancel=None) -> Generator[Dict[str, Any], None, None]:
+        if cancel is not None:
+            cancel.add_callback(lambda: self._drop(request, "cancelled"))
+        self._acquire(request)
+        try:
+            stream = self.ollama_service.chat_stream(messages, model=model, keep_alive=keep_alive, cancel=cancel)
+            try:
+                yield from stream
+            finally:
+                stream.close()
+        finally:
+            self._release()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of queue depths, in-flight count, drop counters and queue wait percentiles."""
+        with self._cond:
+            waits = sorted(self._waits)
+            metrics = dict(self._stats)
+            metrics["in_flight"] = self._in_flight
+            metrics["queued"] = self._queued
+            metrics["queued_by_priority"] = {
+                priority.name.lower(): sum(len(q) for q in self._queues[priority].values())
+                for priority in RequestPriority
+            }
+            metrics["queued_by_session"] = {}
+            for sessions in self._queues.values():
+                for session_id, queue in sessions.items():
+                    metrics["queued_by_session"][session_id] = metrics["queued_by_session"].get(session_id, 0) + len(queue)
+        for name, q in (("wait_p50", 0.5), ("wait_p95", 0.95)):
+            metrics[name] = waits[min(len(waits) - 1, int(len(waits) * q))] if waits else 0.0
+        return metrics
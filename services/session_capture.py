@@ -0,0 +1,70 @@
+import json
+import time
+import threading
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List
+
+
+@dataclass
+class CapturedTurn:
+    """One user turn of a captured session."""
+    session: str
+    turn: int
+    think_time: float  # Seconds between the previous answer and this question
+    user: str
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    response_chars: int = 0
+    ttft: float = 0.0  # Seconds from request to first content chunk
+    latency: float = 0.0  # Seconds from request to the end of the answer
+
+
+class SessionCapture:
+    """
+    Records chat turns as JSON lines for later replay by the load generator.
+
+    Only transcripts, timing gaps and tool calls are written, not the model's
+    answers, so a capture replays the user side of a conversation against
+    any backend.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.session = time.strftime("%Y%m%d-%H%M%S")
+        self._turn = 0
+        self._last_answer_at = None
+        self._lock = threading.Lock()
+
+    def mark_answer_end(self):
+        """Note when an answer finished so the next turn's think time can be measured."""
+        self._last_answer_at = time.time()
+
+    def record(self, user: str, asked_at: float, tool_calls: List[Dict[str, Any]], response_chars: int,
+               ttft: float, latency: float):
+        """Append one turn to the capture file."""
+        think_time = 0.0 if self._last_answer_at is None else max(0.0, asked_at - self._last_answer_at)
+        with self._lock:
+            turn = CapturedTurn(
+                session=self.session,
+                turn=self._turn,
+                think_time=round(think_time, 3),
+                user=user,
+                tool_calls=tool_calls,
+                response_chars=response_chars,
+                ttft=round(ttft, 4),
+                latency=round(latency, 4)
+            )
+            self._turn += 1
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(asdict(turn), ensure_ascii=False) + "\n")
+
+
+def load_captured_sessions(path: str) -> List[List[CapturedTurn]]:
+    """Read a capture file and group its turns by session, in turn order."""
+    sessions: Dict[str, List[CapturedTurn]] = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                turn = CapturedTurn(**json.loads(line))
+                sessions.setdefault(turn.session, []).append(turn)
+    return [sorted(turns, key=lambda t: t.turn) for turns in sessions.values()]
@@ -0,0 +1,92 @@
+import re
+import time
+import queue
+import threading
+from typing import Generator, List, Dict, Any, Optional, Union
+from services.ollama_service import OllamaService, StreamCancel
+
+_END = object()
+
+
+def normalize_transcript(text: str) -> str:
+    """Normalize a transcript for comparison (case, whitespace and punctuation)."""
+    return re.sub(r"[\s\W_]+", "", text.lower())
+
+
+class SpeculativeGeneration:
+    """
+    LLM generation started on a stable partial transcript.
+
+    A worker thread streams the response into a queue while the user is still
+    speaking. If the final transcript matches, the buffered stream is replayed
+    and continued; otherwise the generation is cancelled, which drops it from
+    the scheduler queue or closes its connection at once.
+    """
+
+    def __init__(self, ollama_service: OllamaService, messages: Union[List[Dict[str, Any]], bytes], transcript: str,
+                 base_length: int = 0, stream_options: Optional[Dict[str, Any]] = None):
+        self.ollama_service = ollama_service  # OllamaService or a RequestScheduler in front of it
+        self.messages = messages
+        self._cancel = StreamCancel()
+        # Extra chat_stream arguments, e.g. scheduler priority
+        self.stream_options = dict(stream_options or {}, cancel=self._cancel)
+        self.transcript = transcript
+        self.base_length = base_length  # Session length the speculation was started from
+        self.key = normalize_transcript(transcript)
+        self.started_at = time.perf_counter()
+        self.first_chunk_at = None
+        self._chunks = queue.Queue()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        stream = self.ollama_service.chat_stream(self.messages, **self.stream_options)
+        try:
+            for response_data in stream:
+                if self._cancelled.is_set():
+                    break
+                if self.first_chunk_at is None:
+                    self.first_chunk_at = time.perf_counter()
+                self._chunks.put(response_data)
+                if response_data.get("done"):
+                    break
+        except Exception as e:
+            self._chunks.put(e)
+        finally:
+            stream.close()
+            self._chunks.put(_END)
+
+    def matches(self, transcript: str) -> bool:
+        """Check whether the final transcript is the one this generation was started on."""
+        return self.key == normalize_transcript(transcript)
+
+    def head_start(self, committed_at: float) -> float:
+        """
+        Latency saved by speculating, in seconds.
+
+        Without speculation the first token would arrive one time-to-first-token
+        after the commit; with it, it arrives at most that long after the start.
+        """
+        lead = committed_at - self.started_at
+        if self.first_chunk_at is not None:
+            return max(0.0, min(lead, self.first_chunk_at - self.started_at))
+        return max(0.0, lead)
+
+    def stream(self) -> Generator[Dict[str, Any], None, None]:
+        """Yield the buffered and remaining response chunks."""
+        try:
+            while True:
+                item = self._chunks.get()
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self.cancel()
+
+    def cancel(self):
+        """Stop the generation now, without waiting for the backend's next chunk."""
+        self._cancelled.set()
+        self._cancel.cancel()
@@ -1,11 +1,14 @@
 import os
 import threading
 import configparser
-import speech_recognition as sr
+from typing import Optional
 from models.config import SpeechConfig
-from models.silero_vad_audio_recorder import SileroVadAudioRecorder
-from models.webrtc_vad_audio_recorder import WebrtcVadAudioRecorder
-from models.ten_vad_audio_recorder import TenVadAudioRecorder
+
+# Audio backends (speech_recognition, pyaudio, torch, webrtcvad, ten_vad) are
+# imported where they are first used, so text mode never loads them
+
+# Separators stripped around the trigger word in one-shot transcripts
+_TRANSCRIPT_PUNCTUATION = " \t,.!?;:，。！？；：、"
 
 class SpeechService:
     """
@@ -13,13 +16,62 @@ class SpeechService:
     Uses different languages for trigger detection (English) and speech input (Chinese).
     """
     
-    def __init__(self, config: SpeechConfig):
-        """Initialize speech service with configuration."""
+    def __init__(self, config: SpeechConfig, input_mode: Optional[str] = None):
+        """
+        Initialize speech service with configuration.
+        
+        Args:
+            input_mode: Overrides [INPUT] input_mode; 'text' never touches audio devices
+        """
         self.config = config
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        self._recognizer = None
+        self._microphone = None
         self.vad_recorder = None
+        self.vad_worker = None
+        self._vad_worker_lock = threading.Lock()
+        self.asr_pool = None
+        self._asr_pool_lock = threading.Lock()
         self.vad_config = self._load_vad_config()
+        if input_mode:
+            self.vad_config['input_mode'] = input_mode
+        self.noise_floor = None
+        self.keyword_spotter = None
+        self.vad_metrics = None
+        self.duty_cycler = None  # Idle mode of the VAD recorders, shared so it persists across recordings
+        self._one_shot_query = ""  # Query spoken together with the trigger word (one-shot mode)
+        if self.get_input_mode().lower() != 'text':
+            from models.vad_metrics import VadMetrics
+            self.vad_metrics = VadMetrics(
+                sample_rate=self.vad_config['sample_rate'],
+                log_interval=self.vad_config['metrics_log_interval']
+            )
+            from models.noise_floor import NoiseFloorEstimator
+            self.noise_floor = NoiseFloorEstimator(
+                sample_rate=self.vad_config['sample_rate'],
+                margin_db=self.vad_config['noise_margin_db'],
+                rise_time=self.vad_config['noise_rise_time'],
+                fall_time=self.vad_config['noise_fall_time'],
+                min_threshold=self.vad_config['noise_min_threshold']
+            )
+            self.keyword_spotter = self._create_keyword_spotter()
+            if self.vad_config['chunked_asr'] and self.vad_config['end_silence'] <= self.vad_config['chunk_pause']:
+                print("⚠️ 分段辨識需要 end_silence 大於 chunk_pause，語句中的停頓會直接結束錄音")
+    
+    @property
+    def recognizer(self):
+        """speech_recognition Recognizer, created on first use."""
+        if self._recognizer is None:
+            import speech_recognition as sr
+            self._recognizer = sr.Recognizer()
+        return self._recognizer
+    
+    @property
+    def microphone(self):
+        """speech_recognition Microphone, created on first use (opens PortAudio)."""
+        if self._microphone is None:
+            import speech_recognition as sr
+            self._microphone = sr.Microphone()
+        return self._microphone
     
     def _load_vad_config(self):
         """Load VAD configuration from config.ini file."""
@@ -29,6 +81,9 @@ class SpeechService:
         # Default values
         default_config = {
             'input_mode': 'voice',
+            'barge_in': False,
+            'speculative_prefill': False,
+            'partial_interval': 0.6,
             'vad_type': 'silero',
             'webrtc_aggressiveness': 3,
             'webrtc_frame_size': 320,
@@ -36,18 +91,56 @@ class SpeechService:
             'tenvad_min_speech_duration': 0.25,
             'tenvad_frame_size': 512,
             'sample_rate': 16000,
+            'capture_rate': 0,
+            'callback_capture': False,
+            'callback_buffer': 2.0,
             'threshold': 0.5,
-            'no_speech_timeout': 8.0
+            'no_speech_timeout': 8.0,
+            'end_silence': 0.0,
+            'vad_process': False,
+            'vad_cascade': True,
+            'cascade_webrtc': False,
+            'cascade_margin_db': 6.0,
+            'cascade_lookback': 0.3,
+            'metrics_log_interval': 0.0,
+            'idle_after': 5.0,
+            'idle_stride': 4,
+            'idle_subsample': 4,
+            'noise_margin_db': 10.0,
+            'noise_rise_time': 5.0,
+            'noise_fall_time': 0.3,
+            'noise_min_threshold': 50.0,
+            'wake_mode': 'kws',
+            'kws_template_dir': 'keyword_templates',
+            'kws_sensitivity': 1.2,
+            'one_shot': False,
+            'chunked_asr': False,
+            'asr_workers': 3,
+            'chunk_pause': 0.3,
+            'min_chunk_seconds': 2.0,
+            'asr_timeout': 15.0
         }
         
         try:
             config.read(config_path)
+            
+            # A tuned profile (see tune_vad.py) overrides the [VAD] settings
+            profile = config.get('VAD', 'vad_profile', fallback='').strip()
+            if profile:
+                if not os.path.isabs(profile):
+                    profile = os.path.join(os.path.dirname(config_path), profile)
+                if not config.read(profile):
+                    print(f"⚠️ 找不到 VAD 設定檔: {profile}")
+            
             result_config = default_config.copy()
             
             # Load INPUT section
             if 'INPUT' in config:
                 input_section = config['INPUT']
                 result_config['input_mode'] = input_section.get('input_mode', default_config['input_mode'])
+                result_config['barge_in'] = input_section.getboolean('barge_in', default_config['barge_in'])
+                result_config['speculative_prefill'] = input_section.getboolean('speculative_prefill', default_config['speculative_prefill'])
+                result_config['partial_interval'] = input_section.getfloat('partial_interval', default_config['partial_interval'])
             
             # Load VAD section
             if 'VAD' in config:
@@ -60,8 +153,46 @@ class SpeechService:
                     'tenvad_min_speech_duration': vad_section.getfloat('tenvad_min_speech_duration', default_config['tenvad_min_speech_duration']),
                     'tenvad_frame_size': vad_section.getint('tenvad_frame_size', default_config['tenvad_frame_size']),
                     'sample_rate': vad_section.getint('sample_rate', default_config['sample_rate']),
+                    'capture_rate': vad_section.getint('capture_rate', default_config['capture_rate']),
+                    'callback_capture': vad_section.getboolean('callback_capture', default_config['callback_capture']),
+                    'callback_buffer': vad_section.getfloat('callback_buffer', default_config['callback_buffer']),
                     'threshold': vad_section.getfloat('threshold', default_config['threshold']),
-                    'no_speech_timeout': vad_section.getfloat('no_speech_timeout', default_config['no_speech_timeout'])
+                    'no_speech_timeout': vad_section.getfloat('no_speech_timeout', default_config['no_speech_timeout']),
+                    'end_silence': vad_section.getfloat('end_silence', default_config['end_silence']),
+                    'vad_process': vad_section.getboolean('vad_process', default_config['vad_process']),
+                    'vad_cascade': vad_section.getboolean('vad_cascade', default_config['vad_cascade']),
+                    'cascade_webrtc': vad_section.getboolean('cascade_webrtc', default_config['cascade_webrtc']),
+                    'cascade_margin_db': vad_section.getfloat('cascade_margin_db', default_config['cascade_margin_db']),
+                    'cascade_lookback': vad_section.getfloat('cascade_lookback', default_config['cascade_lookback']),
+                    'metrics_log_interval': vad_section.getfloat('metrics_log_interval', default_config['metrics_log_interval']),
+                    'idle_after': vad_section.getfloat('idle_after', default_config['idle_after']),
+                    'idle_stride': vad_section.getint('idle_stride', default_config['idle_stride']),
+                    'idle_subsample': vad_section.getint('idle_subsample', default_config['idle_subsample']),
+                    'noise_margin_db': vad_section.getfloat('noise_margin_db', default_config['noise_margin_db']),
+                    'noise_rise_time': vad_section.getfloat('noise_rise_time', default_config['noise_rise_time']),
+                    'noise_fall_time': vad_section.getfloat('noise_fall_time', default_config['noise_fall_time']),
+                    'noise_min_threshold': vad_section.getfloat('noise_min_threshold', default_config['noise_min_threshold'])
+                })
+            
+            # Load WAKE section
+            if 'WAKE' in config:
+                wake_section = config['WAKE']
+                result_config.update({
+                    'wake_mode': wake_section.get('wake_mode', default_config['wake_mode']),
+                    'kws_template_dir': wake_section.get('kws_template_dir', default_config['kws_template_dir']),
+                    'kws_sensitivity': wake_section.getfloat('kws_sensitivity', default_config['kws_sensitivity']),
+                    'one_shot': wake_section.getboolean('one_shot', default_config['one_shot'])
+                })
+            
+            # Load ASR section
+            if 'ASR' in config:
+                asr_section = config['ASR']
+                result_config.update({
+                    'chunked_asr': asr_section.getboolean('chunked', default_config['chunked_asr']),
+                    'asr_workers': asr_section.getint('workers', default_config['asr_workers']),
+                    'chunk_pause': asr_section.getfloat('chunk_pause', default_config['chunk_pause']),
+                    'min_chunk_seconds': asr_section.getfloat('min_chunk_seconds', default_config['min_chunk_seconds']),
+                    'asr_timeout': asr_section.getfloat('timeout', default_config['asr_timeout'])
                 })
             
             return result_config
@@ -70,20 +201,24 @@ class SpeechService:
         
         return default_config
     
-    def _create_vad_recorder(self, on_speech_end_callback):
+    def _create_vad_recorder(self, on_speech_end_callback, on_speech_start_callback=None):
         """Create VAD recorder based on configuration."""
         vad_type = self.vad_config['vad_type'].lower()
         
         if vad_type == 'webrtc':
+            from models.webrtc_vad_audio_recorder import WebrtcVadAudioRecorder
             print(f"🔧 使用 WebRTC VAD (敏感度: {self.vad_config['webrtc_aggressiveness']})")
             return WebrtcVadAudioRecorder(
                 sample_rate=self.vad_config['sample_rate'],
                 frame_size=self.vad_config['webrtc_frame_size'],
                 threshold=self.vad_config['threshold'],
                 on_speech_end=on_speech_end_callback,
-                aggressiveness=self.vad_config['webrtc_aggressiveness']
+                aggressiveness=self.vad_config['webrtc_aggressiveness'],
+                noise_floor=self.noise_floor,
+                on_speech_start=on_speech_start_callback
             )
         elif vad_type == 'tenvad':
+            from models.ten_vad_audio_recorder import TenVadAudioRecorder
             print("🔧 使用 TEN-VAD")
             return TenVadAudioRecorder(
                 sample_rate=self.vad_config['sample_rate'],
@@ -91,27 +226,179 @@ class SpeechService:
                 threshold=self.vad_config['threshold'],
                 on_speech_end=on_speech_end_callback,
                 min_silence_duration=self.vad_config['tenvad_min_silence_duration'],
-                min_speech_duration=self.vad_config['tenvad_min_speech_duration']
+                min_speech_duration=self.vad_config['tenvad_min_speech_duration'],
+                noise_floor=self.noise_floor,
+                on_speech_start=on_speech_start_callback
             )
         else:  # Default to silero
+            from models.silero_vad_audio_recorder import SileroVadAudioRecorder
             print("🔧 使用 Silero VAD")
+            if self.vad_config['vad_process']:
+                self._ensure_vad_worker()
             return SileroVadAudioRecorder(
                 sample_rate=self.vad_config['sample_rate'],
                 frame_size=512,  # Silero uses its own frame size
                 threshold=self.vad_config['threshold'],
-                on_speech_end=on_speech_end_callback
+                on_speech_end=on_speech_end_callback,
+                noise_floor=self.noise_floor,
+                on_speech_start=on_speech_start_callback,
+                vad_worker=self.vad_worker
             )
     
+    def _create_vad_cascade(self, recorder):
+        """Energy / WebRTC pre-filter for the recorder's scorer, or None when disabled."""
+        if not self.vad_config['vad_cascade']:
+            return None
+        from models.vad_cascade import VadCascade
+        use_webrtc = self.vad_config['cascade_webrtc'] and self.vad_config['vad_type'].lower() != 'webrtc'
+        return VadCascade(
+            sample_rate=self.vad_config['sample_rate'],
+            frame_size=recorder.frame_size,
+            noise_floor=self.noise_floor,
+            gate_margin_db=self.vad_config['cascade_margin_db'],
+            lookback=self.vad_config['cascade_lookback'],
+            webrtc_aggressiveness=self.vad_config['webrtc_aggressiveness'] if use_webrtc else None
+        )
+    
+    def _create_duty_cycler(self, frame_size, energy_threshold=300.0):
+        """Idle mode for a listening loop, or None when idle_after is 0."""
+        if self.vad_config['idle_after'] <= 0:
+            return None
+        from models.duty_cycler import DutyCycler
+        return DutyCycler(
+            sample_rate=self.vad_config['sample_rate'],
+            frame_size=frame_size,
+            noise_floor=self.noise_floor,
+            idle_after=self.vad_config['idle_after'],
+            stride=self.vad_config['idle_stride'],
+            subsample=self.vad_config['idle_subsample'],
+            energy_threshold=energy_threshold
+        )
+    
+    def _ensure_vad_worker(self):
+        """Start the Silero worker process unless one is already running."""
+        with self._vad_worker_lock:
+            if self.vad_worker is None or not self.vad_worker.is_alive():
+                # One worker process is kept for the lifetime of the service
+                from models.vad_worker import VadWorkerProcess
+                self.vad_worker = VadWorkerProcess(sample_rate=self.vad_config['sample_rate'], frame_size=512)
+        return self.vad_worker
+    
+    def _ensure_asr_pool(self):
+        """Start the recognition worker threads unless they are already running."""
+        with self._asr_pool_lock:
+            if self.asr_pool is None:
+                from services.asr_pool import AsrWorkerPool
+                self.asr_pool = AsrWorkerPool(self._recognize_chunk, workers=self.vad_config['asr_workers'])
+        return self.asr_pool
+    
+    def _recognize_chunk(self, pcm) -> str:
+        """Recognize one piece of an utterance (runs on an ASR worker); empty if it holds no words."""
+        import speech_recognition as sr
+        audio = sr.AudioData(pcm, self.vad_config['sample_rate'], 2)
+        try:
+            return self.recognizer.recognize_google(audio, language=self.config.input_language)
+        except sr.UnknownValueError:
+            return ""
+    
+    def warm_up_vad(self) -> str:
+        """
+        Load the configured VAD backend ahead of the first utterance.
+        
+        Returns:
+            str: Name of the loaded backend
+        """
+        vad_type = self.vad_config['vad_type'].lower()
+        if vad_type == 'webrtc':
+            import models.webrtc_vad_audio_recorder
+            return "WebRTC VAD"
+        if vad_type == 'tenvad':
+            from models.ten_vad_audio_recorder import TEN_VAD_AVAILABLE
+            if not TEN_VAD_AVAILABLE:
+                raise ImportError("找不到 ten_vad.py")
+            return "TEN-VAD"
+        if self.vad_config['vad_process']:
+            self._ensure_vad_worker()
+            return "Silero VAD (worker process)"
+        
+        from models.silero_vad_audio_recorder import get_vad_model
+        get_vad_model()  # Includes the slow first forward pass
+        return "Silero VAD"
+    
+    def warm_up_asr(self) -> str:
+        """
+        Prepare speech recognition ahead of the first utterance.
+        
+        recognize_google is an online service, so there is no local model to
+        load; the first-call cost is importing speech_recognition and locating
+        and starting the FLAC encoder, which is done here once.
+        """
+        import speech_recognition as sr
+        self.recognizer  # Created on first access
+        sr.AudioData(bytes(3200), self.vad_config['sample_rate'], 2).get_flac_data()
+        return "Google Speech Recognition"
+    
+    def _create_keyword_spotter(self):
+        """Create the local keyword spotter when wake_mode is 'kws'."""
+        if self.vad_config['wake_mode'].lower() != 'kws':
+            return None
+        
+        from models.keyword_spotter import KeywordSpotter
+        template_dir = self.vad_config['kws_template_dir']
+        if not os.path.isabs(template_dir):
+            template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), template_dir)
+        
+        spotter = KeywordSpotter(
+            keyword=self.config.trigger_word,
+            template_dir=template_dir,
+            sample_rate=self.vad_config['sample_rate'],
+            sensitivity=self.vad_config['kws_sensitivity'],
+            noise_floor=self.noise_floor
+        )
+        spotter.capture_rate = self.vad_config['capture_rate']
+        spotter.duty_cycler = self._create_duty_cycler(spotter.frame_size, spotter.energy_threshold)
+        if not spotter.has_templates():
+            print(f"⚠️ 尚未錄製喚醒詞 '{self.config.trigger_word}' 的範本，改用線上語音辨識 (執行 enroll_trigger.py 進行錄製)")
+            return None
+        return spotter
+    
     def listen_for_trigger(self) -> str:
         """
-        Listen for English trigger word using traditional speech recognition.
+        Listen for the trigger word.
+        
+        Uses the local keyword spotter when templates are enrolled, so no audio
+        leaves the machine until the device is woken. Falls back to traditional
+        speech recognition otherwise.
+        
+        In one-shot mode a question spoken right after the trigger word is
+        recognized from the same utterance and kept for take_one_shot_query().
+        With the keyword spotter only the audio after the aligned keyword is
+        sent for recognition. With online recognition the trigger is still
+        detected in trigger_language; only when words follow the trigger word
+        is the same audio recognized again in input_language, and the text
+        after the trigger word is the query.
         
         Returns:
             str: Recognized text in lowercase, empty string if recognition fails
         """
+        one_shot = self.vad_config['one_shot']
+        self._one_shot_query = ""
+        if self.keyword_spotter:
+            print(f"🎙️ 說 '{self.config.trigger_word}' 來喚醒 AI")
+            keyword = self.keyword_spotter.wait_for_keyword(capture_query=one_shot).lower()
+            if keyword and self.keyword_spotter.query_pcm:
+                self._one_shot_query = self._recognize_pcm(self.keyword_spotter.query_pcm)
+            return keyword
+        
+        import speech_recognition as sr
         with self.microphone as source:
             print(f"🎙️ 說 '{self.config.trigger_word}' 來喚醒 AI")
-            self.recognizer.adjust_for_ambient_noise(source)
+            if self.noise_floor.is_primed():
+                # Reuse the continuously tracked threshold instead of a blocking calibration
+                self.recognizer.energy_threshold = self.noise_floor.energy_threshold
+            else:
+                self.recognizer.adjust_for_ambient_noise(source, duration=0.3)
+                self.noise_floor.seed(self.recognizer.energy_threshold)
             audio = self.recognizer.listen(source)
         
         try:
@@ -120,6 +407,13 @@ class SpeechService:
                 language=self.config.trigger_language
             ).lower()
             print(f"🗣️ 偵測到: {text}")
+            if one_shot and self._query_after_trigger(text):
+                # Wake detection stays in trigger_language; the question needs input_language
+                try:
+                    full_text = self.recognizer.recognize_google(audio, language=self.config.input_language)
+                    self._one_shot_query = self._query_after_trigger(full_text)
+                except (sr.UnknownValueError, sr.RequestError):
+                    pass  # Still awake; the question is recorded separately
             return text
         except sr.UnknownValueError:
             print("😅 沒聽清楚，請再試一次。")
@@ -128,18 +422,97 @@ class SpeechService:
             print("⚠️ 語音辨識服務錯誤")
             return ""
     
-    def listen_for_speech_input(self) -> str:
+    def _recognize_pcm(self, pcm) -> str:
+        """Recognize captured PCM16 audio in the input language; empty string on failure."""
+        import speech_recognition as sr
+        try:
+            audio = sr.AudioData(pcm, self.vad_config['sample_rate'], 2)
+            text = self.recognizer.recognize_google(audio, language=self.config.input_language)
+            print(f"📝 識別文字: {text}")
+            return text
+        except sr.UnknownValueError:
+            print("❌ 無法識別喚醒詞後的語音內容")
+        except sr.RequestError as e:
+            print(f"⚠️ 語音辨識服務錯誤: {e}")
+        return ""
+    
+    def _query_after_trigger(self, text: str) -> str:
+        """
+        Split a transcript that starts with the trigger word.
+        
+        Returns:
+            str: The text following the trigger word, empty if the transcript
+                does not start with it or nothing follows
+        """
+        trigger = self.config.trigger_word.lower()
+        stripped = text.lower().lstrip(_TRANSCRIPT_PUNCTUATION)
+        if not stripped.startswith(trigger):
+            return ""
+        return stripped[len(trigger):].strip(_TRANSCRIPT_PUNCTUATION)
+    
+    def take_one_shot_query(self) -> str:
+        """Return the query recognized together with the last trigger word, once."""
+        query, self._one_shot_query = self._one_shot_query, ""
+        return query
+    
+    def _partial_speech_recognizer(self, on_partial_transcript):
+        """
+        Build a partial-speech listener that recognizes in-progress utterances.
+        
+        Recognition runs on a background thread; partials arriving while the
+        previous one is still being recognized are skipped.
+        """
+        import speech_recognition as sr
+        busy = threading.Lock()
+        
+        def on_partial_speech(pcm):
+            if not busy.acquire(blocking=False):
+                return
+            
+            def recognize():
+                try:
+                    audio = sr.AudioData(pcm, self.vad_config['sample_rate'], 2)
+                    text = self.recognizer.recognize_google(audio, language=self.config.input_language)
+                    if text:
+                        on_partial_transcript(text)
+                except (sr.UnknownValueError, sr.RequestError):
+                    pass
+                finally:
+                    busy.release()
+            
+            threading.Thread(target=recognize, daemon=True).start()
+        
+        return on_partial_speech
+    
+    def listen_for_speech_input(self, on_speech_start=None, stop_event=None, on_partial_transcript=None) -> str:
         """
         Use VAD for speech input and convert to text using callback mechanism.
         
+        Args:
+            on_speech_start: Optional callback fired when speech onset is detected
+            stop_event: Optional threading.Event; when set before speech starts,
+                recording is stopped and an empty string is returned
+            on_partial_transcript: Optional callback receiving partial transcripts
+                while the user is still speaking
+        
         Returns:
             str: Recognized Chinese text, empty string if recognition fails
         """
+        import speech_recognition as sr
         speech_result = {"text": "", "file": None}
+        transcript = None
+        if self.vad_config['chunked_asr']:
+            # Pieces cut at internal pauses are recognized while the user keeps speaking
+            from services.asr_pool import ChunkedTranscript
+            separator = "" if self.config.input_language.split('-')[0] in ('zh', 'ja', 'ko') else " "
+            transcript = ChunkedTranscript(self._ensure_asr_pool(), separator)
         
         def on_speech_end_callback(speech_file):
             """Callback function called when speech ends."""
             speech_result["file"] = speech_file
+            if transcript is not None:
+                # Recognition is already running on the ASR workers; the recorder is not held up
+                return
             try:
                 # Convert audio file to text using Chinese speech recognition
                 with sr.AudioFile(speech_file) as source:
@@ -162,14 +535,53 @@ class SpeechService:
                 speech_result["text"] = ""
         
         # Create VAD recorder with callback based on configuration
-        self.vad_recorder = self._create_vad_recorder(on_speech_end_callback)
+        self.vad_recorder = self._create_vad_recorder(on_speech_end_callback, on_speech_start)
+        self.vad_recorder.no_speech_timeout = self.vad_config['no_speech_timeout']
+        self.vad_recorder.capture_rate = self.vad_config['capture_rate']
+        if self.vad_config['callback_capture']:
+            self.vad_recorder.callback_buffer = self.vad_config['callback_buffer']
+        self.vad_recorder.vad_cascade = self._create_vad_cascade(self.vad_recorder)
+        self.vad_recorder.vad_metrics = self.vad_metrics
+        if self.duty_cycler is None or self.duty_cycler.frame_size != self.vad_recorder.frame_size:
+            self.duty_cycler = self._create_duty_cycler(self.vad_recorder.frame_size)
+        self.vad_recorder.duty_cycler = self.duty_cycler
+        self.vad_recorder.end_silence = self.vad_config['end_silence']
+        if transcript is not None:
+            self.vad_recorder.set_speech_chunk_listener(
+                transcript.add_chunk,
+                self.vad_config['chunk_pause'],
+                self.vad_config['min_chunk_seconds']
+            )
+        if on_partial_transcript:
+            self.vad_recorder.set_partial_speech_listener(
+                self._partial_speech_recognizer(on_partial_transcript),
+                self.vad_config['partial_interval']
+            )
         
         # Start VAD recording in separate thread
         recording_thread = threading.Thread(target=self.vad_recorder.start_recording)
         recording_thread.start()
         
         # Wait for speech to end (VAD will auto-stop)
-        recording_thread.join()
+        if stop_event is None:
+            recording_thread.join()
+        else:
+            # Keep re-applying the stop request until the recorder exits, so a stop
+            # issued while the recorder is still starting up is not lost
+            while recording_thread.is_alive():
+                recording_thread.join(0.05)
+                if stop_event.is_set() and not self.vad_recorder.is_speaking:
+                    self.vad_recorder.stop_recording()
+        
+        if transcript is not None and transcript.jobs:
+            speech_result["text"] = transcript.result(self.vad_config['asr_timeout'])
+            if speech_result["text"]:
+                print(f"📝 識別文字: {speech_result['text']}")
+                print(f"⏱️ 語音結束到文字 {transcript.latency() * 1000:.0f} ms ({len(transcript.jobs)} 段並行辨識)")
+            elif transcript.errors:
+                print(f"⚠️ 語音辨識服務錯誤: {transcript.errors[0]}")
+            else:
+                print("❌ 無法識別語音內容")
         
         # Clean up temporary audio file and resources
         try:
@@ -183,6 +595,24 @@ class SpeechService:
         
         return speech_result["text"]
     
+    def cleanup(self):
+        """Release long-lived audio resources such as the VAD worker process."""
+        if self.vad_worker is not None:
+            self.vad_worker.shutdown()
+            self.vad_worker = None
+        if self.asr_pool is not None:
+            self.asr_pool.shutdown()
+            self.asr_pool = None
+        if self.keyword_spotter:
+            if self.keyword_spotter.duty_cycler is not None:
+                self.keyword_spotter.duty_cycler.log()
+            self.keyword_spotter.cleanup()
+        if self.duty_cycler is not None:
+            self.duty_cycler.log()
+        # Also in text mode: TTS playback shares the PyAudio instance
+        from models.audio_device import release_pyaudio
+        release_pyaudio()
+    
     def get_text_input(self) -> str:
         """
         Get text input directly from user keyboard input.
@@ -204,6 +634,27 @@ class SpeechService:
         """Get the configured input mode (voice or text)."""
         return self.vad_config.get('input_mode', 'voice')
     
+    def get_vad_metrics(self) -> dict:
+        """Snapshot of VAD inference time, capture queue depth and input overflows (empty in text mode)."""
+        return self.vad_metrics.snapshot() if self.vad_metrics else {}
+    
+    def get_idle_metrics(self) -> dict:
+        """Idle-mode counters and CPU saved, per listening loop (empty when idle mode is off)."""
+        metrics = {}
+        if self.keyword_spotter is not None and self.keyword_spotter.duty_cycler is not None:
+            metrics['keyword_spotter'] = self.keyword_spotter.duty_cycler.snapshot()
+        if self.duty_cycler is not None:
+            metrics['vad_recorder'] = self.duty_cycler.snapshot()
+        return metrics
+    
+    def is_barge_in_enabled(self) -> bool:
+        """Check whether speech may interrupt a streaming response (full-duplex mode)."""
+        return self.vad_config.get('barge_in', False)
+    
+    def is_speculative_prefill_enabled(self) -> bool:
+        """Check whether generation may start on stable partial transcripts."""
+        return self.vad_config.get('speculative_prefill', False)
+    
     def is_trigger_detected(self, text: str) -> bool:
         """Check if trigger word is present in recognized text."""
         return self.config.trigger_word.lower() in text.lower()
@@ -0,0 +1,95 @@
+import time
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class ComponentStatus:
+    """Readiness of one startup component."""
+    name: str
+    state: str = "pending"  # pending, ready, failed or skipped
+    seconds: float = 0.0
+    detail: str = ""
+
+
+class StartupOrchestrator:
+    """
+    Warms up independent components concurrently.
+
+    Each component runs on its own daemon thread, so model loads, network
+    round trips and device probing overlap instead of adding up, and a slow
+    component never blocks shutdown. Components that are still loading when
+    they are first needed are simply waited for by their own lazy loaders.
+    """
+
+    def __init__(self, on_update: Optional[Callable[[ComponentStatus], None]] = None):
+        self.on_update = on_update
+        self._tasks: Dict[str, Callable[[], Optional[str]]] = {}
+        self._statuses: Dict[str, ComponentStatus] = {}
+        self._done: Dict[str, threading.Event] = {}
+        self._started_at = None
+
+    def add(self, name: str, task: Callable[[], Optional[str]]):
+        """
+        Register a warm-up task.
+
+        Args:
+            name: Component name shown in the readiness report
+            task: Callable doing the warm-up; may return a short detail string
+        """
+        self._tasks[name] = task
+        self._statuses[name] = ComponentStatus(name)
+        self._done[name] = threading.Event()
+
+    def skip(self, name: str, reason: str = ""):
+        """Register a component that is not needed in the current configuration."""
+        self._statuses[name] = ComponentStatus(name, state="skipped", detail=reason)
+        self._done[name] = threading.Event()
+        self._done[name].set()
+
+    def _run(self, name: str):
+        status = self._statuses[name]
+        start = time.perf_counter()
+        try:
+            status.detail = self._tasks[name]() or ""
+            status.state = "ready"
+        except Exception as e:
+            status.detail = str(e)
+            status.state = "failed"
+        status.seconds = time.perf_counter() - start
+        self._done[name].set()
+        if self.on_update:
+            self.on_update(status)
+
+    def start(self):
+        """Start all registered tasks; returns immediately."""
+        self._started_at = time.perf_counter()
+        for name in self._tasks:
+            threading.Thread(target=self._run, args=(name,), daemon=True, name=f"warm-up-{name}").start()
+
+    def wait_for(self, name: str, timeout: Optional[float] = None) -> bool:
+        """Wait until a component has finished warming up; True if it is ready."""
+        if name not in self._done or not self._done[name].wait(timeout):
+            return False
+        return self._statuses[name].state == "ready"
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for all components; True if every one of them finished in time."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for event in self._done.values():
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not event.wait(remaining):
+                return False
+        return True
+
+    def statuses(self) -> List[ComponentStatus]:
+        return list(self._statuses.values())
+
+    def is_ready(self, name: str) -> bool:
+        status = self._statuses.get(name)
+        return status is not None and status.state == "ready"
+
+    def elapsed(self) -> float:
+        """Seconds since start(), i.e. the wall time of the slowest finished component."""
+        return 0.0 if self._started_at is None else time.perf_counter() - self._started_at
@@ -0,0 +1,264 @@
+import io
+import os
+import json
+import time
+import random
+import itertools
+import contextlib
+import configparser
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from models.wav_file_source import WavFileSource
+
+# Candidate values for every tunable vad_config.ini parameter, per backend
+PARAMETER_GRID = {
+    'silero': {
+        'threshold': [0.3, 0.4, 0.5, 0.6, 0.7],
+        'no_speech_timeout': [4.0, 8.0],
+    },
+    'webrtc': {
+        'webrtc_aggressiveness': [0, 1, 2, 3],
+        'webrtc_frame_size': [160, 320, 480],
+        'no_speech_timeout': [4.0, 8.0],
+    },
+    'tenvad': {
+        'threshold': [0.3, 0.5, 0.7],
+        'tenvad_min_silence_duration': [0.2, 0.3, 0.5, 0.8],
+        'tenvad_min_speech_duration': [0.1, 0.25, 0.4],
+        'no_speech_timeout': [4.0, 8.0],
+    },
+}
+
+
+@dataclass
+class LabelledClip:
+    """One corpus recording and its labelled speech segments in seconds (empty for no speech)."""
+    path: str
+    segments: List[Tuple[float, float]]
+
+
+@dataclass
+class TrialResult:
+    """Accuracy and latency of one backend/parameter combination over the corpus."""
+    backend: str
+    params: Dict[str, float]
+    clips: int = 0
+    clipped: int = 0
+    false_triggers: int = 0
+    missed: int = 0
+    delays: List[float] = field(default_factory=list)
+    audio_seconds: float = 0.0
+    replay_seconds: float = 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return (self.clipped + self.false_triggers + self.missed) / max(self.clips, 1)
+
+    @property
+    def mean_delay(self) -> float:
+        return sum(self.delays) / len(self.delays) if self.delays else float("inf")
+
+    @property
+    def p90_delay(self) -> float:
+        if not self.delays:
+            return float("inf")
+        ordered = sorted(self.delays)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+
+    @property
+    def speedup(self) -> float:
+        """How many times faster than real time the corpus was replayed."""
+        return self.audio_seconds / max(self.replay_seconds, 1e-9)
+
+
+def load_corpus(corpus_dir: str) -> List[LabelledClip]:
+    """
+    Load a labelled corpus.
+
+    The directory holds 16 kHz mono WAV files and a labels.json mapping each
+    file name to a list of [start, end] speech segments in seconds; files with
+    an empty list contain no speech and measure false triggers.
+    """
+    with open(os.path.join(corpus_dir, "labels.json"), encoding="utf-8") as f:
+        labels = json.load(f)
+    return [
+        LabelledClip(os.path.join(corpus_dir, name), [tuple(segment) for segment in segments])
+        for name, segments in sorted(labels.items())
+    ]
+
+
+def pareto_front(results: List[TrialResult]) -> List[TrialResult]:
+    """Results not dominated on (error rate, mean endpoint delay), sorted by delay."""
+    front = []
+    for candidate in results:
+        dominated = any(
+            other.error_rate <= candidate.error_rate
+            and other.mean_delay <= candidate.mean_delay
+            and (other.error_rate < candidate.error_rate or other.mean_delay < candidate.mean_delay)
+            for other in results
+        )
+        if not dominated:
+            front.append(candidate)
+    return sorted(front, key=lambda r: (r.mean_delay, r.error_rate))
+
+
+class VadTuner:
+    """
+    Replays a labelled corpus through the VAD recorders to tune vad_config.ini.
+
+    Each recorder reads from a WavFileSource instead of the microphone and runs
+    on the audio clock, so the corpus is replayed faster than real time with
+    exactly the state machine used live.
+    """
+
+    def __init__(self, corpus: List[LabelledClip], sample_rate=16000, tolerance=0.1):
+        self.corpus = corpus
+        self.sample_rate = sample_rate
+        self.tolerance = tolerance
+        self._source = None
+        self._onset = None
+        self._end = None
+
+    def _on_speech_start(self):
+        self._onset = self._source.position
+
+    def _on_speech_end(self, speech_file):
+        self._end = self._source.position
+
+    def _build_recorder(self, backend, params):
+        common = dict(
+            sample_rate=self.sample_rate,
+            on_speech_end=self._on_speech_end,
+            on_speech_start=self._on_speech_start
+        )
+        if backend == 'webrtc':
+            from models.webrtc_vad_audio_recorder import WebrtcVadAudioRecorder
+            recorder = WebrtcVadAudioRecorder(
+                frame_size=params['webrtc_frame_size'],
+                aggressiveness=params['webrtc_aggressiveness'],
+                **common
+            )
+        elif backend == 'tenvad':
+            from models.ten_vad_audio_recorder import TenVadAudioRecorder
+            recorder = TenVadAudioRecorder(
+                frame_size=512,
+                threshold=params['threshold'],
+                min_silence_duration=params['tenvad_min_silence_duration'],
+                min_speech_duration=params['tenvad_min_speech_duration'],
+                **common
+            )
+        else:
+            from models.silero_vad_audio_recorder import SileroVadAudioRecorder
+            recorder = SileroVadAudioRecorder(frame_size=512, threshold=params['threshold'], **common)
+        recorder.no_speech_timeout = params['no_speech_timeout']
+        return recorder
+
+    def _replay(self, recorder, clip):
+        """Run one recording session over a clip and return (onset, end) or None."""
+        self._source = WavFileSource(clip.path, self.sample_rate, on_exhausted=recorder.stop_recording)
+        self._onset = None
+        self._end = None
+        recorder.audio_source = self._source
+        # Recorders narrate every session; keep the tuner output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            recorder.start_recording()
+        if recorder.speech_file and os.path.exists(recorder.speech_file):
+            os.remove(recorder.speech_file)
+        recorder.speech_file = None
+        if self._end is None:
+            return None
+        return self._onset, self._end
+
+    def _score_clip(self, result, clip, detection):
+        result.clips += 1
+        if not clip.segments:
+            if detection is not None:
+                result.false_triggers += 1
+            return
+        if detection is None:
+            result.missed += 1
+            return
+
+        label_start, label_end = clip.segments[0][0], clip.segments[-1][1]
+        onset, end = detection
+        if end < label_start:
+            # Fired on noise before the user spoke
+            result.false_triggers += 1
+        elif end < label_end - self.tolerance or onset > label_start + self.tolerance + 0.5:
+            # Endpointed before the user finished, or caught only the tail
+            result.clipped += 1
+        else:
+            result.delays.append(max(0.0, end - label_end))
+
+    def evaluate(self, backend: str, params: Dict[str, float]) -> TrialResult:
+        """Replay the whole corpus with one parameter combination."""
+        result = TrialResult(backend, dict(params))
+        recorder = self._build_recorder(backend, params)
+        start = time.perf_counter()
+        try:
+            for clip in self.corpus:
+                detection = self._replay(recorder, clip)
+                result.audio_seconds += self._source.position
+                self._score_clip(result, clip, detection)
+        finally:
+            recorder.cleanup()
+        result.replay_seconds = time.perf_counter() - start
+        return result
+
+    def search(self, backends: List[str], max_trials: Optional[int] = None, seed: int = 0) -> List[TrialResult]:
+        """
+        Grid search over PARAMETER_GRID for the given backends.
+
+        Args:
+            backends: Backend names (silero, webrtc, tenvad)
+            max_trials: Optional cap per backend; a random subset of the grid is tried
+
+        Returns:
+            list: One TrialResult per combination tried
+        """
+        rng = random.Random(seed)
+        results = []
+        for backend in backends:
+            grid = PARAMETER_GRID[backend]
+            names = list(grid)
+            combos = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+            if max_trials and len(combos) > max_trials:
+                combos = rng.sample(combos, max_trials)
+            print(f"🔍 {backend}: 測試 {len(combos)} 組參數")
+            for params in combos:
+                try:
+                    result = self.evaluate(backend, params)
+                except ImportError as e:
+                    print(f"⚠️ 略過 {backend}: {e}")
+                    break
+                results.append(result)
+                print(
+                    f"   {params} → 錯誤率 {result.error_rate:.1%}，"
+                    f"平均延遲 {result.mean_delay * 1000:.0f} ms，{result.speedup:.0f}x 即時"
+                )
+        return results
+
+
+def choose(front: List[TrialResult], max_error: Optional[float] = None) -> TrialResult:
+    """Lowest-delay point within max_error, or the most accurate point if none is given."""
+    if max_error is not None:
+        within = [r for r in front if r.error_rate <= max_error]
+        if within:
+            return min(within, key=lambda r: r.mean_delay)
+    return min(front, key=lambda r: (r.error_rate, r.mean_delay))
+
+
+def write_profile(result: TrialResult, path: str):
+    """Write the chosen settings as a [VAD] ini profile that vad_config.ini can load via vad_profile."""
+    profile = configparser.ConfigParser()
+    profile['VAD'] = {'vad_type': result.backend}
+    for name, value in result.params.items():
+        profile['VAD'][name] = str(value)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(
+            f"# Tuned by tune_vad.py: error rate {result.error_rate:.1%}, "
+            f"mean endpoint delay {result.mean_delay * 1000:.0f} ms\n"
+        )
+        profile.write(f)
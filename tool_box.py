@@ -1,7 +1,11 @@
+import time
 import requests
 import datetime
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Callable
+from typing import Dict, Any, Callable, Tuple
+
+WEATHER_CACHE_TTL = 600  # Seconds a fetched weather report is reused
+_weather_cache: Dict[str, Tuple[float, str]] = {}
 
 
 class ToolService:
@@ -28,6 +32,10 @@ class ToolService:
     
     def get_available_tools(self) -> Dict[str, Callable]:
         return self.tools.copy()
+    
+    def prime_cache(self, city: str = "Taipei") -> str:
+        """Fetch the default city's weather ahead of time so the first weather question is answered from cache."""
+        return ToolBox.get_weather(city)
 
 
 class ToolBox:
@@ -49,12 +57,16 @@ class ToolBox:
     @staticmethod
     def get_weather(city="Taipei"):
         """
-        使用 wttr.in 取得即時天氣
+        使用 wttr.in 取得即時天氣 (結果快取 WEATHER_CACHE_TTL 秒)
         """
+        cached = _weather_cache.get(city)
+        if cached and time.time() - cached[0] < WEATHER_CACHE_TTL:
+            return cached[1]
         try:
             url = f"https://wttr.in/{city}?format=3"
-            resp = requests.get(url)
+            resp = requests.get(url, timeout=10)
             if resp.status_code == 200:
+                _weather_cache[city] = (time.time(), resp.text)
                 return resp.text
             else:
                 return f"無法取得天氣 (HTTP {resp.status_code})"
@@ -0,0 +1,46 @@
+import os
+import argparse
+
+from services.vad_tuner import VadTuner, load_corpus, pareto_front, choose, write_profile
+
+
+def main():
+    """Tune VAD parameters against a labelled WAV corpus and write an ini profile."""
+    parser = argparse.ArgumentParser(description="VAD 參數自動調校")
+    parser.add_argument("corpus", help="含 WAV 檔與 labels.json 的目錄")
+    parser.add_argument("--backends", default="silero,webrtc,tenvad", help="要測試的 VAD 後端，以逗號分隔")
+    parser.add_argument("--max-trials", type=int, default=None, help="每個後端最多測試的參數組數")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="判定截斷的容許誤差（秒）")
+    parser.add_argument("--max-error", type=float, default=None, help="可接受的最大錯誤率，在此範圍內選擇延遲最低者")
+    parser.add_argument("--profile", default="vad_profiles/tuned.ini", help="輸出設定檔路徑")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    print(f"📂 載入 {len(corpus)} 個標註音檔")
+
+    tuner = VadTuner(corpus, tolerance=args.tolerance)
+    results = tuner.search([b.strip() for b in args.backends.split(",") if b.strip()], args.max_trials)
+    if not results:
+        print("❌ 沒有可用的測試結果")
+        return
+
+    front = pareto_front(results)
+    print("\n📈 延遲 / 準確度 Pareto 前緣:")
+    print(f"{'後端':<8}{'錯誤率':>8}{'截斷':>6}{'誤觸發':>8}{'漏偵測':>8}{'平均延遲':>10}{'P90延遲':>10}  參數")
+    for r in front:
+        print(
+            f"{r.backend:<8}{r.error_rate:>8.1%}{r.clipped:>6}{r.false_triggers:>8}{r.missed:>8}"
+            f"{r.mean_delay * 1000:>8.0f}ms{r.p90_delay * 1000:>8.0f}ms  {r.params}"
+        )
+
+    best = choose(front, args.max_error)
+    profile = args.profile
+    if not os.path.isabs(profile):
+        profile = os.path.join(os.path.dirname(os.path.abspath(__file__)), profile)
+    write_profile(best, profile)
+    print(f"\n✅ 已選擇 {best.backend} {best.params}")
+    print(f"💾 設定檔已寫入: {profile}（在 vad_config.ini 的 [VAD] 設定 vad_profile 以啟用）")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,18 @@
-from typing import Generator
+import time
+import threading
+from typing import Generator, Optional
 from models.chat_session import ChatSession
+from models.chat_store import ChatStore
 from models.message import Message, MessageRole, ToolCall
 from models.config import AppConfig
-from services.ollama_service import OllamaService
+from services.ollama_service import OllamaService, ChatStreamError, TRUNCATED_DONE_REASONS
 from services.speech_service import SpeechService
+from services.speculative_generation import SpeculativeGeneration, normalize_transcript
+from services.startup_orchestrator import StartupOrchestrator
+from services.session_capture import SessionCapture
+from services.request_scheduler import RequestScheduler, RequestPriority, RequestDropped
+from services.intent_matcher import IntentMatcher
+from services.model_router import ModelRouter
 from tool_box import ToolService
 
 
@@ -13,22 +22,185 @@ class ChatViewModel:
     Coordinates between speech service, LLaMA service, and chat session management.
     """
     
-    def __init__(self, config: AppConfig):
-        """Initialize ViewModel with all required services."""
+    def __init__(self, config: AppConfig, ollama_service: Optional[OllamaService] = None,
+                 scheduler: Optional[RequestScheduler] = None, router: Optional[ModelRouter] = None,
+                 speech_service: Optional[SpeechService] = None, tool_service: Optional[ToolService] = None,
+                 scheduler_session: str = "console", priority: RequestPriority = RequestPriority.INTERACTIVE):
+        """
+        Initialize ViewModel with all required services.
+        
+        Services that are passed in are shared instead of created, e.g. by the
+        batch runner, which drives one ViewModel per session over a single
+        scheduler and an audio-free speech service.
+        """
         self.config = config
-        self.chat_session = ChatSession()
-        self.ollama_service = OllamaService(config.ollama)
-        self.speech_service = SpeechService(config.speech)
-        self.tool_service = ToolService()
+        self.chat_store = ChatStore(config.session.db_path) if config.session.db_path else None
+        self.chat_session = self._open_session()
+        self.ollama_service = ollama_service or OllamaService(config.ollama)
+        self.scheduler = scheduler or RequestScheduler(self.ollama_service, max_in_flight=config.ollama.max_in_flight)
+        self.scheduler_session = scheduler_session  # Fairness and staleness key of this chat
+        self.priority = priority  # Scheduling class of this chat's requests
+        if router is None and config.router.enabled:
+            router = ModelRouter(self.scheduler, config.router, config.ollama.model)
+        self.router = router
+        self.speech_service = speech_service or SpeechService(config.speech)
+        self.tool_service = tool_service or ToolService()
+        self.intent_matcher = IntentMatcher(config.startup.weather_city) if config.intent.enabled else None
+        self.intent_stats = {"hits": 0, "misses": 0}
+        self.barge_in_event = None
+        self._barge_in_thread = None
+        self._barge_in_stop = None
+        self._barge_in_query = ""
+        self.speculation = None
+        self._speculation_lock = threading.Lock()
+        self._last_partial = ""
+        self._accepting_partials = False
+        self.speculation_stats = {"hits": 0, "misses": 0, "saved_ms": 0.0}
+        self.startup = None
+        self.capture = SessionCapture(config.session.capture_path) if config.session.capture_path else None
+        self._captured_query = None
+        self._asked_at = 0.0
+        self.turn_error = ""  # Why the last generate_response ended early; empty when the answer is complete
+    
+    def _open_session(self) -> ChatSession:
+        """Resume the stored session or start a new one."""
+        if self.chat_store is None:
+            return ChatSession()
+        if self.config.session.resume:
+            return ChatSession.open(self.chat_store, self.config.session.history_window)
+        return ChatSession(store=self.chat_store)
+    
+    def start_warm_up(self, on_update=None) -> Optional[StartupOrchestrator]:
+        """
+        Warm up models, devices and caches concurrently in the background.
+        
+        Args:
+            on_update: Called with a ComponentStatus as each component finishes
+        
+        Returns:
+            StartupOrchestrator: The running orchestrator, or None if warm-up is disabled
+        """
+        if not self.config.startup.warm_up:
+            return None
+        
+        orchestrator = StartupOrchestrator(on_update)
+        if self.get_input_mode().lower() == 'text':
+            for name in ("VAD 模型", "語音辨識"):
+                orchestrator.skip(name, "文字模式")
+        else:
+            # The input device is not warmed up: the trigger listener opens it right
+            # away, and PortAudio must not be used from two threads at once
+            orchestrator.add("VAD 模型", self.speech_service.warm_up_vad)
+            orchestrator.add("語音辨識", self.speech_service.warm_up_asr)
+        if self.router is None:
+            orchestrator.add("Ollama 模型", self.ollama_service.warm_up)
+        else:
+            # Each model is loaded with its own keep_alive, so the small one stays resident
+            orchestrator.add("Ollama 大模型", lambda: self.router.warm_up("large"))
+            orchestrator.add("Ollama 小模型", lambda: self.router.warm_up("small"))
+        orchestrator.add("工具快取", lambda: self.tool_service.prime_cache(self.config.startup.weather_city))
+        orchestrator.start()
+        self.startup = orchestrator
+        return orchestrator
     
     def listen_for_trigger(self) -> str:
         """Listen for English trigger word through speech service."""
         return self.speech_service.listen_for_trigger()
     
+    def take_one_shot_query(self) -> str:
+        """Get the question spoken together with the trigger word, empty if there was none."""
+        return self.speech_service.take_one_shot_query()
+    
     def listen_for_speech_input(self) -> str:
         """Use VAD for Chinese speech input through speech service."""
+        if self.speech_service.is_speculative_prefill_enabled():
+            self._last_partial = ""
+            self._accepting_partials = True
+            try:
+                return self.speech_service.listen_for_speech_input(on_partial_transcript=self.on_partial_transcript)
+            finally:
+                # Late partials must not start a speculation for the next turn
+                with self._speculation_lock:
+                    self._accepting_partials = False
         return self.speech_service.listen_for_speech_input()
     
+    def on_partial_transcript(self, text: str):
+        """
+        Start a speculative generation once a partial transcript is stable.
+        
+        A partial counts as stable when two consecutive partial recognitions
+        agree. A speculation on a different transcript is cancelled first.
+        """
+        key = normalize_transcript(text)
+        with self._speculation_lock:
+            if not self._accepting_partials:
+                return
+            stable = bool(key) and key == self._last_partial
+            self._last_partial = key
+            if not stable or (self.speculation and self.speculation.key == key):
+                return
+            if self.speculation:
+                self.speculation.cancel()
+            # An older speculation still waiting for a backend slot is dropped
+            generation = self.scheduler.bump_generation(self.scheduler_session)
+            messages = self.chat_session.get_encoded_messages(
+                extra=[Message(role=MessageRole.USER, content=text)]
+            )
+            stream_options = {
+                "session_id": self.scheduler_session,
+                "priority": self.priority,
+                "generation": generation
+            }
+            if self.router is not None:
+                stream_options["decision"] = self.router.route(text, len(self.chat_session.messages) + 1)
+            self.speculation = SpeculativeGeneration(
+                self.router or self.scheduler, messages, text, base_length=len(self.chat_session.messages),
+                stream_options=stream_options
+            )
+            print(f"🔮 預先生成回應: {text}")
+    
+    def _take_speculation(self):
+        """
+        Commit or discard the pending speculation for the turn about to start.
+        
+        Returns:
+            SpeculativeGeneration: The matching speculation, or None on a miss
+        """
+        with self._speculation_lock:
+            speculation, self.speculation = self.speculation, None
+        if speculation is None:
+            return None
+        
+        last = self.chat_session.messages[-1]
+        hit = (
+            len(self.chat_session.messages) == speculation.base_length + 1
+            and last.role == MessageRole.USER
+            and speculation.matches(last.content)
+        )
+        if hit:
+            saved = speculation.head_start(time.perf_counter())
+            self.speculation_stats["hits"] += 1
+            self.speculation_stats["saved_ms"] += saved * 1000
+        else:
+            speculation.cancel()
+            # Drop it from the scheduler queue even if it has not started, so the real turn is not behind it
+            self.scheduler.bump_generation(self.scheduler_session)
+            self.speculation_stats["misses"] += 1
+        
+        stats = self.speculation_stats
+        total = stats["hits"] + stats["misses"]
+        outcome = f"命中，節省 {saved * 1000:.0f} ms" if hit else "未命中，重新生成"
+        print(f"📊 預先生成{outcome} (命中率 {stats['hits']}/{total}，累計節省 {stats['saved_ms']:.0f} ms)")
+        return speculation if hit else None
+    
+    def get_speculation_stats(self) -> dict:
+        """Get speculative prefill hit/miss counts and total latency saved."""
+        return dict(self.speculation_stats)
+    
+    def get_vad_metrics(self) -> dict:
+        """Get VAD inference timing, capture queue depth and overflow counters."""
+        return self.speech_service.get_vad_metrics()
+    
     def get_text_input(self) -> str:
         """Get text input directly from user through speech service."""
         return self.speech_service.get_text_input()
@@ -50,6 +222,57 @@ class ChatViewModel:
         else:
             return self.listen_for_speech_input()
     
+    def is_barge_in_enabled(self) -> bool:
+        """Check whether full-duplex barge-in is enabled."""
+        return self.get_input_mode().lower() != 'text' and self.speech_service.is_barge_in_enabled()
+    
+    def start_barge_in_listener(self) -> threading.Event:
+        """
+        Keep VAD capture running while a response is being rendered.
+        
+        Returns:
+            threading.Event: Set as soon as the user starts speaking; pass it to
+            generate_response so the stream is cancelled
+        """
+        self.barge_in_event = threading.Event()
+        self._barge_in_stop = threading.Event()
+        self._barge_in_query = ""
+        
+        def listen():
+            # The recorder times out after a stretch of silence, so restart it
+            # until the user speaks or the response finishes
+            while not self._barge_in_stop.is_set() and not self.barge_in_event.is_set():
+                text = self.speech_service.listen_for_speech_input(
+                    on_speech_start=self._on_barge_in,
+                    stop_event=self._barge_in_stop
+                )
+                if self.barge_in_event.is_set():
+                    self._barge_in_query = text
+        
+        self._barge_in_thread = threading.Thread(target=listen, daemon=True)
+        self._barge_in_thread.start()
+        return self.barge_in_event
+    
+    def _on_barge_in(self):
+        """The user spoke during a response: cancel it, and drop it if it is still queued."""
+        self.barge_in_event.set()
+        self.scheduler.bump_generation(self.scheduler_session)
+    
+    def finish_barge_in_listener(self) -> str:
+        """
+        Stop barge-in capture once the response is done or interrupted.
+        
+        Returns:
+            str: The new query captured during the response, empty if the user
+            did not interrupt
+        """
+        if self._barge_in_thread is None:
+            return ""
+        self._barge_in_stop.set()
+        self._barge_in_thread.join()
+        self._barge_in_thread = None
+        return self._barge_in_query
+    
     def is_trigger_detected(self, text: str) -> bool:
         """Check if trigger word was detected in the text."""
         return self.speech_service.is_trigger_detected(text)
@@ -61,52 +284,173 @@ class ChatViewModel:
     def add_user_message(self, content: str):
         """Add user message to the chat session."""
         self.chat_session.add_user_message(content)
+        self._captured_query = content
+        self._asked_at = time.time()
     
-    def generate_response(self) -> Generator[str, None, None]:
+    def generate_response(self, cancel_event: Optional[threading.Event] = None) -> Generator[str, None, None]:
         """
         Generate AI response using LLaMA model.
         
+        Args:
+            cancel_event: Optional event; once set, the stream is closed and
+                the partial response is kept in the chat session
+        
         Yields:
             str: Individual characters of the AI response for streaming display
         """
-        messages = self.chat_session.get_messages_as_dict()
         ai_content = ""
+        self.turn_error = ""
+        requested_at = time.perf_counter()
+        first_token_at = None
+        tool_calls = []
+        local_answer = self._answer_locally()
+        if local_answer is not None:
+            answer, tool_call = local_answer
+            yield from answer
+            self._record_turn([tool_call], len(answer), requested_at, requested_at)
+            return
+        speculation = self._take_speculation()
+        if speculation:
+            stream = speculation.stream()
+        else:
+            messages = self.chat_session.get_encoded_messages()
+            options = {"session_id": self.scheduler_session, "priority": self.priority}
+            if self.router is not None:
+                decision = self.router.route(self.chat_session.messages[-1].content, len(self.chat_session.messages))
+                stream = self.router.chat_stream(messages, decision, **options)
+            else:
+                stream = self.scheduler.chat_stream(messages, **options)
         
-        # Stream response from LLaMA model
-        for response_data in self.ollama_service.chat_stream(messages):
-            # Handle any tool calls in the response
-            if "message" in response_data and "tool_calls" in response_data["message"]:
-                self._handle_tool_calls(response_data["message"]["tool_calls"])
-            
-            # Yield each character for streaming display
-            content = response_data.get("message", {}).get("content", "")
-            for char in content:
-                ai_content += char
-                yield char
-            
-            if response_data.get("done"):
-                break
+        try:
+            # Stream response from LLaMA model
+            for response_data in stream:
+                # Handle any tool calls in the response
+                if "message" in response_data and "tool_calls" in response_data["message"]:
+                    tool_calls.extend(response_data["message"]["tool_calls"])
+                    self._handle_tool_calls(response_data["message"]["tool_calls"])
+                
+                # Yield each character for streaming display
+                content = response_data.get("message", {}).get("content", "")
+                if content and first_token_at is None:
+                    first_token_at = time.perf_counter()
+                for char in content:
+                    if cancel_event is not None and cancel_event.is_set():
+                        break
+                    ai_content += char
+                    yield char
+                
+                if response_data.get("done_reason") in TRUNCATED_DONE_REASONS:
+                    self.turn_error = response_data["done_reason"]
+                    print(f"\n⚠️ 模型回應中斷 ({response_data['done_reason']})，保留目前的回答")
+                if response_data.get("done") or (cancel_event is not None and cancel_event.is_set()):
+                    break
+        except RequestDropped as e:
+            # The user spoke again before the request reached the backend
+            self.turn_error = e.reason
+        except ChatStreamError as e:
+            self.turn_error = str(e) or "no answer"
+            print(f"\n⚠️ 模型沒有回應: {e}")
+        finally:
+            # Stop the backend from generating tokens nobody will read
+            stream.close()
         
-        # Save complete AI response to chat session
+        # Save complete (or interrupted partial) AI response to chat session
         if ai_content:
             self.chat_session.add_assistant_message(ai_content)
+        
+        self._record_turn(tool_calls, len(ai_content), requested_at, first_token_at)
+    
+    def _record_turn(self, tool_calls, response_chars, requested_at, first_token_at):
+        """Append the finished turn and its timings to the session capture, if enabled."""
+        if self.capture and self._captured_query is not None:
+            finished_at = time.perf_counter()
+            self.capture.record(
+                user=self._captured_query,
+                asked_at=self._asked_at,
+                tool_calls=tool_calls,
+                response_chars=response_chars,
+                ttft=(first_token_at or finished_at) - requested_at,
+                latency=finished_at - requested_at
+            )
+            self.capture.mark_answer_end()
+            self._captured_query = None
+    
+    def _answer_locally(self):
+        """
+        Answer the latest user message from a tool when the intent matcher recognizes it.
+        
+        The tool result and the templated answer are added to the chat session
+        like an LLM turn, so later questions keep the context.
+        
+        Returns:
+            tuple: (answer text, tool call dict), or None to use the LLM
+        """
+        if self.intent_matcher is None or not self.chat_session.messages:
+            return None
+        last = self.chat_session.messages[-1]
+        if last.role != MessageRole.USER:
+            return None
+        
+        started = time.perf_counter()
+        intent = self.intent_matcher.match(last.content)
+        result = self.tool_service.execute_tool(intent.tool, intent.args) if intent else ""
+        if intent is None or self.intent_matcher.is_error(result):
+            self.intent_stats["misses"] += 1
+            return None
+        
+        with self._speculation_lock:
+            speculation, self.speculation = self.speculation, None
+        if speculation is not None:
+            speculation.cancel()
+        answer = intent.render(result)
+        self.chat_session.add_tool_message(f"{intent.tool} 回傳: {result}")
+        self.chat_session.add_assistant_message(answer)
+        
+        stats = self.intent_stats
+        stats["hits"] += 1
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"⚡ 本地快速回答 {intent.tool} ({elapsed_ms:.1f} ms，命中率 {stats['hits']}/{stats['hits'] + stats['misses']})")
+        return answer, {"name": intent.tool, "arguments": intent.args}
+    
+    def get_intent_stats(self) -> dict:
+        """Get local fast-path hit/miss counts and the hit rate."""
+        stats = dict(self.intent_stats)
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / total if total else 0.0
+        return stats
+    
+    def get_router_metrics(self) -> dict:
+        """Get model routing decisions, escalations and per-model latency, empty if routing is off."""
+        return self.router.get_metrics() if self.router is not None else {}
     
     def _handle_tool_calls(self, tool_calls):
         """
-        Handle tool calls from AI response.
+        Run the tools called in an AI response and add their results to the chat session.
         
         Args:
-            tool_calls: List of tool calls from AI response
+            tool_calls: List of tool calls from AI response, either flat
+                ({"name", "arguments"}) or in Ollama's {"function": {...}} form
         """
         for tool_call in tool_calls:
-            tool_name = tool_call["name"]
-            args = tool_call.get("arguments", {})
+            function = tool_call.get("function", tool_call)
+            tool_name = function["name"]
+            args = function.get("arguments") or {}
             
             # Execute the tool and save result to chat session
             result = self.tool_service.execute_tool(tool_name, args)
             self.chat_session.add_tool_message(f"{tool_name} 回傳: {result}")
-            
-            yield ("tool_usage", tool_name, args)
+            print(f"\n🔧 使用工具: {tool_name}({args})")
+    
+    def cleanup(self):
+        """Release service resources on shutdown."""
+        stats = self.get_intent_stats()
+        if stats["hits"]:
+            print(f"⚡ 本地快速回答命中率: {stats['hits']}/{stats['hits'] + stats['misses']} ({stats['hit_rate']:.0%})")
+        if self.router is not None:
+            self.router.log()
+        self.speech_service.cleanup()
+        if self.chat_store is not None:
+            self.chat_store.close()
     
     def clear_session(self):
         """Clear the current chat session."""
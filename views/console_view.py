@@ -58,9 +58,17 @@ class ConsoleView(BaseView):
         print(char, end="", flush=True)
         time.sleep(0.01)
     
+    def display_ai_response_interrupted(self):
+        print(" ⏹️ （已中斷）", end="", flush=True)
+    
     def display_ai_response_end(self):
         print()
     
+    def display_startup_status(self, status):
+        icons = {"ready": "✅", "failed": "⚠️", "skipped": "⏭️"}
+        detail = f" - {status.detail}" if status.detail else ""
+        print(f"{icons.get(status.state, '⏳')} {status.name} ({status.seconds * 1000:.0f} ms){detail}")
+    
     def display_speech_error(self, error_type: str):
         if error_type == "unknown_value":
             print("😅 沒聽清楚，請再試一次。")
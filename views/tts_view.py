@@ -0,0 +1,299 @@
+import io
+import os
+import queue
+import shutil
+import tempfile
+import subprocess
+import threading
+import time
+import wave
+from typing import Optional, Tuple
+
+from models.audio_device import get_pyaudio
+from models.config import TtsConfig
+from .console_view import BaseView
+
+_END = object()
+
+# Characters that close a sentence in English and Chinese text
+_SENTENCE_ENDINGS = set(".!?;。！？；\n")
+
+
+class SentenceSegmenter:
+    """Split a character stream into sentences as soon as each one is complete."""
+
+    def __init__(self, min_length: int = 4):
+        self.min_length = min_length
+        self.buffer = []
+
+    def feed(self, char: str) -> Optional[str]:
+        """Add one character; return a finished sentence or None."""
+        self.buffer.append(char)
+        if char in _SENTENCE_ENDINGS and len(self.buffer) >= self.min_length:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[str]:
+        """Return whatever text is buffered."""
+        sentence = "".join(self.buffer).strip()
+        self.buffer = []
+        return sentence or None
+
+
+class EspeakTtsEngine:
+    """Local synthesis through the espeak-ng (or espeak) command line tool."""
+
+    def __init__(self, voice: str = "zh", rate: int = 175):
+        self.voice = voice
+        self.rate = rate
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+        if self.binary is None:
+            raise RuntimeError("找不到 espeak-ng，請先安裝")
+
+    def synthesize(self, text: str) -> Tuple[bytes, int]:
+        """Return (PCM16 mono bytes, sample rate) for the text."""
+        wav_bytes = subprocess.run(
+            [self.binary, "-v", self.voice, "-s", str(self.rate), "--stdout", text],
+            capture_output=True,
+            check=True
+        ).stdout
+        with wave.open(io.BytesIO(wav_bytes), 'rb') as wav_file:
+            return wav_file.readframes(wav_file.getnframes()), wav_file.getframerate()
+
+
+class Pyttsx3TtsEngine:
+    """Local synthesis through pyttsx3 (SAPI5 / NSSpeechSynthesizer / espeak drivers)."""
+
+    def __init__(self, voice: str = "", rate: int = 175):
+        import pyttsx3
+        self.engine = pyttsx3.init()
+        self.engine.setProperty('rate', rate)
+        if voice:
+            self.engine.setProperty('voice', voice)
+
+    def synthesize(self, text: str) -> Tuple[bytes, int]:
+        """Return (PCM16 mono bytes, sample rate) for the text."""
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+            with wave.open(path, 'rb') as wav_file:
+                return wav_file.readframes(wav_file.getnframes()), wav_file.getframerate()
+        finally:
+            os.remove(path)
+
+
+class PyAudioSink:
+    """Play synthesized audio on the default output device."""
+
+    def __init__(self):
+        import pyaudio
+        self._pyaudio = pyaudio
+        self.audio = get_pyaudio()  # Shared instance, terminated on application shutdown
+        self.stream = None
+        self.sample_rate = None
+
+    def write(self, pcm: bytes, sample_rate: int):
+        if self.stream is None or sample_rate != self.sample_rate:
+            self.close()
+            self.stream = self.audio.open(
+                format=self._pyaudio.paInt16,
+                channels=1,
+                rate=sample_rate,
+                output=True
+            )
+            self.sample_rate = sample_rate
+        self.stream.write(pcm)
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+
+
+class WavFileSink:
+    """Write synthesized audio to a WAV file instead of a speaker (for testing)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.wav_file = None
+
+    def write(self, pcm: bytes, sample_rate: int):
+        if self.wav_file is None:
+            self.wav_file = wave.open(self.path, 'wb')
+            self.wav_file.setnchannels(1)
+            self.wav_file.setsampwidth(2)
+            self.wav_file.setframerate(sample_rate)
+        self.wav_file.writeframes(pcm)
+
+    def close(self):
+        if self.wav_file is not None:
+            self.wav_file.close()
+            self.wav_file = None
+
+
+def create_tts_engine(config: TtsConfig):
+    """Create the configured local TTS engine."""
+    if config.engine.lower() == "pyttsx3":
+        return Pyttsx3TtsEngine(config.voice, config.rate)
+    return EspeakTtsEngine(config.voice, config.rate)
+
+
+class TtsView(BaseView):
+    """
+    Speaks AI responses with a local TTS engine.
+
+    Characters from generate_response are segmented into sentences. A synthesis
+    worker turns each sentence into audio while later sentences are still being
+    generated, and a playback worker plays them from a two-slot queue, so
+    time-to-first-audio tracks the first sentence rather than the whole answer.
+
+    pyttsx3 is not thread-safe, so one long-lived synthesis thread creates the
+    engine and serves every response; only the playback worker is started per
+    response.
+    """
+
+    def __init__(self, config: TtsConfig, engine=None, sink=None):
+        self.config = config
+        self.engine = engine
+        self.sink = sink
+        self.segmenter = SentenceSegmenter()
+        self._sentences = None
+        self._audio = None
+        self._workers = []
+        self._jobs = queue.Queue()  # (sentences, audio, cancelled) per response, for the synthesis thread
+        self._synthesis_thread = None
+        self._cancelled = threading.Event()
+        self._response_started_at = None
+        self.first_audio_ms = None
+
+    def _ensure_outputs(self):
+        if self.sink is None:
+            self.sink = WavFileSink(self.config.output_wav) if self.config.output_wav else PyAudioSink()
+
+    # ----- workers -----
+
+    def _synthesis_worker(self):
+        # The engine is created and used only on this thread
+        engine = self.engine
+        if engine is None:
+            try:
+                engine = create_tts_engine(self.config)
+            except Exception as e:
+                print(f"\n⚠️ 無法初始化語音合成引擎: {e}")
+        while True:
+            job = self._jobs.get()
+            if job is _END:
+                return
+            sentences, audio, cancelled = job
+            while engine is not None:
+                sentence = sentences.get()
+                if sentence is _END or cancelled.is_set():
+                    break
+                try:
+                    audio.put(engine.synthesize(sentence))
+                except Exception as e:
+                    print(f"\n⚠️ 語音合成錯誤: {e}")
+            audio.put(_END)
+
+    def _playback_worker(self, audio, cancelled):
+        while True:
+            item = audio.get()
+            if item is _END:
+                break
+            if cancelled.is_set():
+                continue
+            pcm, sample_rate = item
+            if self.first_audio_ms is None and self._response_started_at is not None:
+                self.first_audio_ms = (time.perf_counter() - self._response_started_at) * 1000
+            self.sink.write(pcm, sample_rate)
+
+    def _speak(self, text: str):
+        """Queue text outside of a streamed response (welcome/goodbye messages)."""
+        self.display_ai_response_start()
+        self._sentences.put(text)
+        self.display_ai_response_end()
+        self.wait_until_done()
+
+    # ----- BaseView -----
+
+    def display_message(self, message: str):
+        self._speak(message)
+
+    def get_user_input(self, prompt: str) -> str:
+        return input(prompt).strip()
+
+    def display_welcome_message(self, trigger_word: str = "hello"):
+        self._speak(f"說 {trigger_word} 來喚醒我")
+
+    def display_goodbye_message(self):
+        self._speak("再見")
+
+    # ----- streamed responses -----
+
+    def display_ai_response_start(self):
+        """Hand a new response to the synthesis thread and start its playback worker."""
+        self._ensure_outputs()
+        if self._synthesis_thread is None:
+            self._synthesis_thread = threading.Thread(target=self._synthesis_worker, daemon=True)
+            self._synthesis_thread.start()
+        # A fresh event per response, so a cancelled one cannot resume when the next starts
+        self._cancelled = threading.Event()
+        self.segmenter = SentenceSegmenter()
+        self._sentences = queue.Queue()
+        self._audio = queue.Queue(maxsize=2)  # Double buffer: one sentence playing, one ready
+        self._response_started_at = time.perf_counter()
+        self.first_audio_ms = None
+        self._jobs.put((self._sentences, self._audio, self._cancelled))
+        self._workers = [
+            threading.Thread(target=self._playback_worker, args=(self._audio, self._cancelled), daemon=True),
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def display_ai_character(self, char: str):
+        sentence = self.segmenter.feed(char)
+        if sentence:
+            self._sentences.put(sentence)
+
+    def display_ai_response_end(self):
+        """Queue the remaining text; playback continues in the background."""
+        sentence = self.segmenter.flush()
+        if sentence:
+            self._sentences.put(sentence)
+        self._sentences.put(_END)
+
+    def display_ai_response_interrupted(self):
+        self.cancel()
+
+    def wait_until_done(self, cancel_event: Optional[threading.Event] = None):
+        """
+        Block until the response has been spoken.
+
+        Args:
+            cancel_event: Optional event that stops playback early (barge-in)
+        """
+        for worker in self._workers:
+            while worker.is_alive():
+                worker.join(0.05)
+                if cancel_event is not None and cancel_event.is_set():
+                    self.cancel()
+        if self.first_audio_ms is not None:
+            print(f"🔊 首段語音延遲: {self.first_audio_ms:.0f} ms")
+            self.first_audio_ms = None
+
+    def cancel(self):
+        """Drop queued sentences and stop playback after the current chunk."""
+        self._cancelled.set()
+        if self._sentences is not None:
+            self._sentences.put(_END)
+
+    def cleanup(self):
+        self.cancel()
+        if self._synthesis_thread is not None:
+            self._jobs.put(_END)
+            self._synthesis_thread = None
+        if self.sink is not None:
+            self.sink.close()